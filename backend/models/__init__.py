@@ -1,5 +1,6 @@
-from .wallet import Wallet, Transaction
+from .wallet import Wallet, Transaction, TransactionHistory
 from .cards import CreditCard
-from .expenses import MonthlyExpense
+from .expenses import MonthlyExpense, MonthSummary, RecurringExpense
+from .money import Money
 
-__all__ = ['Wallet', 'Transaction', 'CreditCard', 'MonthlyExpense']
\ No newline at end of file
+__all__ = ['Wallet', 'Transaction', 'TransactionHistory', 'CreditCard', 'MonthlyExpense', 'MonthSummary', 'RecurringExpense', 'Money']
\ No newline at end of file
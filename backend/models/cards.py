@@ -1,33 +1,145 @@
+import re
+import unicodedata
 from dataclasses import dataclass
-from typing import Optional, List
+from typing import Dict, Iterable, Optional, List, Tuple
 from datetime import datetime
+from .money import Money
+
+def card_id(name: str) -> str:
+    """ID determinístico a partir do nome: 'Itaú Black' -> 'itau-black'"""
+    ascii_name = unicodedata.normalize('NFKD', name).encode('ascii', 'ignore').decode('ascii')
+    return re.sub(r'[^a-z0-9]+', '-', ascii_name.lower()).strip('-') or "cartao"
 
 @dataclass
 class CreditCard:
     name: str
-    limit: float
-    used: float = 0.0
+    limit: Money
+    used: Money = Money(0)
     due_date: str = ""
     id: Optional[str] = None
-    available: float = 0.0  # Novo campo para limite disponível personalizado
+    available: Money = Money(0)  # Novo campo para limite disponível personalizado
     
     def __post_init__(self):
+        self.limit = Money.of(self.limit)
+        self.used = Money.of(self.used)
+        self.available = Money.of(self.available)
         if self.id is None:
-            self.id = f"{self.name}_{id(self)}"
-        if self.available == 0.0:
+            self.id = card_id(self.name)
+        if not self.available:
             self.available = self.limit - self.used
     
     @property
-    def calculated_available(self) -> float:
+    def calculated_available(self) -> Money:
         return self.limit - self.used
 
+def add_months(month_year: str, months: int) -> str:
+    year, month = month_year.split('-')
+    index = int(year) * 12 + int(month) - 1 + months
+    return f"{index // 12:04d}-{index % 12 + 1:02d}"
+
+def months_between(start: str, end: str) -> int:
+    """Quantos meses end está depois de start (negativo se antes)"""
+    return (int(end[:4]) - int(start[:4])) * 12 + int(end[5:7]) - int(start[5:7])
+
+def _month_of_date(date: str) -> str:
+    """'dd/mm/aaaa' (ou 'aaaa-mm-dd') -> 'aaaa-mm'; data inválida conta como mês atual"""
+    try:
+        if date[4:5] == '-':
+            return datetime.strptime(date[:10], "%Y-%m-%d").strftime("%Y-%m")
+        return datetime.strptime(date[:10], "%d/%m/%Y").strftime("%Y-%m")
+    except (TypeError, ValueError):
+        return datetime.now().strftime("%Y-%m")
+
 @dataclass
 class Installment:
     """Representa uma compra parcelada"""
     description: str
-    total_amount: float
+    total_amount: Money
     installments: int
     current_installment: int
-    installment_value: float
+    installment_value: Money
     purchase_date: str
-    card_name: str
\ No newline at end of file
+    card_name: str
+    first_month: Optional[str] = None  # Mês da 1ª parcela ('aaaa-mm'); as demais seguem mês a mês
+    
+    def __post_init__(self):
+        self.total_amount = Money.of(self.total_amount)
+        self.installment_value = Money.of(self.installment_value)
+        if self.first_month is None:
+            self.first_month = _month_of_date(self.purchase_date)
+    
+    def value_of(self, number: int) -> Money:
+        """Valor da parcela 'number' (1..installments); as parcelas somam exatamente o total"""
+        # Mesma divisão de Money.split: os centavos que sobram vão para as primeiras
+        base, remainder = divmod(self.total_amount.cents, self.installments)
+        return Money(base + 1 if number <= remainder else base)
+    
+    def month_of(self, number: int) -> str:
+        return add_months(self.first_month, number - 1)
+    
+    @property
+    def last_month(self) -> str:
+        return self.month_of(self.installments)
+    
+    def due_by(self, month_year: str) -> int:
+        """Número de parcelas que já venceram até o mês (0..installments)"""
+        return max(0, min(self.installments, months_between(self.first_month, month_year) + 1))
+    
+    def schedule(self) -> List[Tuple[str, int, Money]]:
+        """Tabela completa: (mês, número da parcela, valor)"""
+        return [(self.month_of(number), number, self.value_of(number))
+                for number in range(1, self.installments + 1)]
+
+class InstallmentSchedule:
+    """Parcelas de todas as compras indexadas por cartão e mês.
+
+    Responde "o que cai no cartão X no mês M" com uma consulta a dicionário;
+    os totais por (cartão, mês) ficam em centavos e são mantidos a cada
+    inclusão ou remoção de compra.
+    """
+
+    def __init__(self, installments: Iterable[Installment] = ()):
+        self._charges: Dict[Tuple[str, str], List[Tuple[Installment, int]]] = {}
+        self._totals: Dict[Tuple[str, str], int] = {}
+        self._card_months: Dict[str, set] = {}
+        for installment in installments:
+            self.add(installment)
+
+    def add(self, installment: Installment):
+        months = self._card_months.setdefault(installment.card_name, set())
+        for month_year, number, value in installment.schedule():
+            key = (installment.card_name, month_year)
+            self._charges.setdefault(key, []).append((installment, number))
+            self._totals[key] = self._totals.get(key, 0) + value.cents
+            months.add(month_year)
+
+    def remove(self, installment: Installment):
+        for month_year, number, value in installment.schedule():
+            key = (installment.card_name, month_year)
+            charges = [charge for charge in self._charges.get(key, ()) if charge[0] is not installment]
+            if charges:
+                self._charges[key] = charges
+                self._totals[key] -= value.cents
+            else:
+                self._charges.pop(key, None)
+                self._totals.pop(key, None)
+                self._card_months[installment.card_name].discard(month_year)
+
+    def charges(self, card_name: str, month_year: str) -> List[Tuple[Installment, int]]:
+        """Parcelas (compra, número) que caem no cartão no mês"""
+        return list(self._charges.get((card_name, month_year), ()))
+
+    def total(self, card_name: str, month_year: str) -> Money:
+        return Money(self._totals.get((card_name, month_year), 0))
+
+    def card_names(self) -> List[str]:
+        return [name for name, months in self._card_months.items() if months]
+
+    def months(self, card_name: str) -> List[str]:
+        """Meses com parcelas no cartão, em ordem"""
+        return sorted(self._card_months.get(card_name, ()))
+
+    def table(self, card_name: str) -> List[Tuple[str, Money, List[Tuple[Installment, int]]]]:
+        """Tabela de amortização do cartão: (mês, total do mês, parcelas)"""
+        return [(month_year, self.total(card_name, month_year), self.charges(card_name, month_year))
+                for month_year in self.months(card_name)]
\ No newline at end of file
@@ -1,11 +1,85 @@
 from dataclasses import dataclass
-from typing import Optional
+from typing import Optional, List
+from .money import Money
+from .cards import add_months, months_between
 
 @dataclass
 class MonthlyExpense:
     description: str
-    amount: float
+    amount: Money
     due_date: str
     paid: bool = False
     recurring: bool = False  # Nova: se repete automaticamente
-    end_date: Optional[str] = None  # Nova: até quando se repete
\ No newline at end of file
+    end_date: Optional[str] = None  # Nova: até quando se repete
+    
+    def __post_init__(self):
+        self.amount = Money.of(self.amount)
+
+@dataclass
+class RecurringExpense:
+    """Regra de despesa recorrente, materializada mês a mês sob demanda"""
+    description: str
+    amount: Money
+    due_date: str
+    start_month: str
+    end_date: Optional[str] = None
+    skipped_months: List[str] = None
+    
+    def __post_init__(self):
+        self.amount = Money.of(self.amount)
+        if self.skipped_months is None:
+            self.skipped_months = []
+    
+    @property
+    def last_month(self) -> str:
+        # Sem data final, a despesa se repete por um ano a partir do início
+        if self.end_date:
+            return self.end_date
+        year, month = self.start_month.split('-')
+        return f"{int(year) + 1}-{month}"
+    
+    def applies_to(self, month_year: str) -> bool:
+        return (self.start_month <= month_year <= self.last_month
+                and month_year not in self.skipped_months)
+    
+    def months(self) -> List[str]:
+        """Meses em que a regra cria uma cópia"""
+        months = (add_months(self.start_month, i)
+                  for i in range(months_between(self.start_month, self.last_month) + 1))
+        return [month_year for month_year in months if month_year not in self.skipped_months]
+    
+    def create_expense(self) -> MonthlyExpense:
+        return MonthlyExpense(
+            description=self.description,
+            amount=self.amount,
+            due_date=self.due_date,
+            recurring=True,
+            end_date=self.end_date
+        )
+    
+    def matches(self, expense: MonthlyExpense) -> bool:
+        """Indica se a cópia do mês continua igual à regra (sem alterações a gravar)"""
+        return (not expense.paid and expense.amount == self.amount
+                and expense.due_date == self.due_date)
+
+
+@dataclass
+class MonthSummary:
+    """Totais de um mês mantidos incrementalmente pelo FinanceService"""
+    paid: Money = Money(0)
+    unpaid: Money = Money(0)
+    count: int = 0
+    card_invoices: Money = Money(0)
+    
+    @property
+    def total(self) -> Money:
+        return self.paid + self.unpaid
+    
+    def include(self, expense: MonthlyExpense, sign: int = 1):
+        if expense.paid:
+            self.paid += sign * expense.amount
+        else:
+            self.unpaid += sign * expense.amount
+        self.count += sign
+        if expense.description.startswith("Fatura "):
+            self.card_invoices += sign * expense.amount
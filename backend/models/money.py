@@ -0,0 +1,112 @@
+import operator
+from decimal import Decimal, ROUND_HALF_UP
+from typing import List, Union
+
+_CENT = Decimal('0.01')
+
+class Money:
+    """Valor monetário em centavos inteiros (somas e comparações exatas).
+
+    Nos arquivos continua gravado como número com duas casas: cents / 100 é o
+    float mais próximo do valor decimal e volta exatamente aos mesmos centavos.
+    """
+    __slots__ = ('cents',)
+
+    def __init__(self, cents: int = 0):
+        self.cents = cents
+
+    @classmethod
+    def of(cls, value: Union['Money', int, float, str, Decimal]) -> 'Money':
+        """Converte um valor em reais (float da GUI/arquivo, texto, Decimal)"""
+        if isinstance(value, Money):
+            return value
+        if isinstance(value, int):
+            return cls(value * 100)
+        if isinstance(value, float):
+            # Caso comum: o float já representa um valor com duas casas
+            scaled = value * 100
+            cents = round(scaled)
+            if abs(scaled - cents) < 1e-6:
+                return cls(int(cents))
+            value = repr(value)
+        return cls(int(Decimal(value).quantize(_CENT, rounding=ROUND_HALF_UP).scaleb(2)))
+
+    def split(self, parts: int) -> List['Money']:
+        """Divide em partes que somam exatamente o total; os centavos que sobram vão para as primeiras"""
+        base, remainder = divmod(self.cents, parts)
+        return [Money(base + 1 if i < remainder else base) for i in range(parts)]
+
+    def __add__(self, other):
+        if isinstance(other, Money):
+            return Money(self.cents + other.cents)
+        if isinstance(other, (int, float)):
+            return Money(self.cents + Money.of(other).cents)
+        return NotImplemented
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        if isinstance(other, Money):
+            return Money(self.cents - other.cents)
+        if isinstance(other, (int, float)):
+            return Money(self.cents - Money.of(other).cents)
+        return NotImplemented
+
+    def __rsub__(self, other):
+        if isinstance(other, (int, float)):
+            return Money(Money.of(other).cents - self.cents)
+        return NotImplemented
+
+    def __mul__(self, factor):
+        if isinstance(factor, int):
+            return Money(self.cents * factor)
+        return NotImplemented
+
+    __rmul__ = __mul__
+
+    def __neg__(self):
+        return Money(-self.cents)
+
+    def __abs__(self):
+        return Money(abs(self.cents))
+
+    def __bool__(self):
+        return self.cents != 0
+
+    def __float__(self):
+        return self.cents / 100
+
+    def _compare(self, other, op):
+        if isinstance(other, Money):
+            return op(self.cents, other.cents)
+        if isinstance(other, (int, float)):
+            return op(self.cents / 100, other)
+        return NotImplemented
+
+    def __eq__(self, other):
+        return self._compare(other, operator.eq)
+
+    def __hash__(self):
+        # Compatível com a igualdade com números: Money.of(12.34) == 12.34
+        return hash(self.cents / 100)
+
+    def __lt__(self, other):
+        return self._compare(other, operator.lt)
+
+    def __le__(self, other):
+        return self._compare(other, operator.le)
+
+    def __gt__(self, other):
+        return self._compare(other, operator.gt)
+
+    def __ge__(self, other):
+        return self._compare(other, operator.ge)
+
+    def __format__(self, spec: str) -> str:
+        return format(self.cents / 100, spec or '.2f')
+
+    def __str__(self) -> str:
+        return f"{self.cents / 100:.2f}"
+
+    def __repr__(self) -> str:
+        return f"Money('{self}')"
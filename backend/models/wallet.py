@@ -1,91 +1,468 @@
-from dataclasses import dataclass
+from array import array
+from bisect import bisect_left
+from collections.abc import MutableSequence
+from dataclasses import dataclass, field
 from datetime import datetime
-from typing import List
+from functools import lru_cache
+from typing import Any, List, Dict, Iterable, Iterator, Optional, Sequence, Tuple, Union
+from .money import Money
+
+DATE_FORMAT = "%d/%m/%Y %H:%M"
+_EPOCH_ORDINAL = datetime(1970, 1, 1).toordinal()
+_MIN_TIMESTAMP, _MAX_TIMESTAMP = -(1 << 62), 1 << 62
 
 @dataclass
 class Bank:
     name: str
-    balance: float = 0.0
+    balance: Money = Money(0)
+    
+    def __post_init__(self):
+        self.balance = Money.of(self.balance)
 
 @dataclass
 class Transaction:
     date: str
     type: str
-    amount: float
+    amount: Money
     description: str
     bank: str = "Geral"  # Novo campo para identificar o banco
+    timestamp: Optional[int] = None  # Segundos desde 1970, para ordenar e filtrar por período
+
+    def __post_init__(self):
+        if not isinstance(self.amount, Money):
+            self.amount = Money.of(self.amount)
+        if self.timestamp is None:
+            self.timestamp = parse_timestamp(self.date)
+            self.date = format_timestamp(self.timestamp)
+        elif not self.date:
+            self.date = format_timestamp(self.timestamp)
+
+@lru_cache(maxsize=4096)
+def _parse_day(text: str) -> int:
+    if text[4] == '-':
+        return datetime.strptime(text, "%Y-%m-%d").toordinal() - _EPOCH_ORDINAL
+    return datetime.strptime(text, "%d/%m/%Y").toordinal() - _EPOCH_ORDINAL
+
+@lru_cache(maxsize=4096)
+def _format_day(day: int) -> str:
+    return datetime.fromordinal(day + _EPOCH_ORDINAL).strftime("%d/%m/%Y")
+
+@lru_cache(maxsize=4096)
+def _format_iso_day(day: int) -> str:
+    return datetime.fromordinal(day + _EPOCH_ORDINAL).strftime("%Y-%m-%d")
+
+def to_timestamp(moment: datetime) -> int:
+    """Segundos desde 1970 contando a data como horário local, sem fuso"""
+    return ((moment.toordinal() - _EPOCH_ORDINAL) * 86400 + moment.hour * 3600
+            + moment.minute * 60 + moment.second)
+
+def parse_timestamp(date: Union[str, int, float]) -> int:
+    """Aceita ISO ('aaaa-mm-ddTHH:MM'), o formato antigo 'dd/mm/aaaa HH:MM' ou um número"""
+    if isinstance(date, (int, float)):
+        return int(date)
+    if len(date) == 16 and date[13] == ':':
+        try:
+            return _parse_day(date[:10]) * 86400 + int(date[11:13]) * 3600 + int(date[14:16]) * 60
+        except ValueError:
+            pass
+    if date[4:5] == '-':
+        return to_timestamp(datetime.fromisoformat(date))
+    return to_timestamp(datetime.strptime(date, DATE_FORMAT))
+
+def format_timestamp(timestamp: int) -> str:
+    day, seconds = divmod(timestamp, 86400)
+    return f"{_format_day(day)} {seconds // 3600:02d}:{seconds % 3600 // 60:02d}"
+
+def format_iso_timestamp(timestamp: int) -> str:
+    day, seconds = divmod(timestamp, 86400)
+    return f"{_format_iso_day(day)}T{seconds // 3600:02d}:{seconds % 3600 // 60:02d}"
+
+class _NamePool:
+    """Tabela de nomes repetidos (tipo, banco) referenciados por código"""
+    __slots__ = ('names', 'codes')
+
+    def __init__(self, names: Iterable[str] = ()):
+        self.names: List[str] = []
+        self.codes: Dict[str, int] = {}
+        for name in names:
+            self.code(name)
+
+    def copy(self) -> '_NamePool':
+        clone = _NamePool()
+        clone.names = list(self.names)
+        clone.codes = dict(self.codes)
+        return clone
+
+    def code(self, name: str) -> int:
+        code = self.codes.get(name)
+        if code is None:
+            code = self.codes[name] = len(self.names)
+            self.names.append(name)
+        return code
+
+class TransactionHistory(MutableSequence):
+    """Histórico de transações armazenado em colunas.
+
+    Valores em centavos e datas em segundos desde 1970 (horário local) ficam em
+    arrays de inteiros de 64 bits ('q'); tipo e banco são códigos ('B' e 'I') de
+    uma tabela de nomes e as descrições, uma lista de str. O acesso por índice
+    monta uma Transaction na hora: alterar essa cópia não altera o histórico,
+    use history[i] = transaction.
+
+    Na gravação (to_dicts) as datas saem em ISO, 'aaaa-mm-ddTHH:MM', e os valores
+    em reais com duas casas; a leitura aceita também o formato antigo
+    'dd/mm/aaaa HH:MM'.
+
+    Enquanto as datas estiverem em ordem de inserção (o caso comum), consultas por
+    período fazem bisseção direto na coluna de datas; caso contrário, um índice
+    ordenado é montado sob demanda e descartado na próxima alteração.
+    """
+    __slots__ = ('_timestamps', '_amounts', '_types', '_banks', '_descriptions',
+                 '_type_pool', '_bank_pool', '_in_order', '_order', '_order_keys')
+
+    def __init__(self, transactions: Iterable[Transaction] = ()):
+        self._timestamps = array('q')
+        self._amounts = array('q')
+        self._types = array('B')
+        self._banks = array('I')
+        self._descriptions: List[str] = []
+        self._type_pool = _NamePool(("Entrada", "Saída"))
+        self._bank_pool = _NamePool(("Geral",))
+        self._in_order = True
+        self._order: Optional[array] = None
+        self._order_keys: Optional[array] = None
+        self.extend(transactions)
+
+    def __len__(self) -> int:
+        return len(self._amounts)
+
+    def copy(self) -> 'TransactionHistory':
+        """Cópia independente: as colunas são copiadas em bloco, sem montar transações"""
+        clone = TransactionHistory()
+        clone._timestamps = self._timestamps[:]
+        clone._amounts = self._amounts[:]
+        clone._types = self._types[:]
+        clone._banks = self._banks[:]
+        clone._descriptions = list(self._descriptions)
+        clone._type_pool = self._type_pool.copy()
+        clone._bank_pool = self._bank_pool.copy()
+        clone._in_order = self._in_order
+        return clone
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._row(i) for i in range(*index.indices(len(self)))]
+        return self._row(range(len(self))[index])
+
+    def __setitem__(self, index: int, transaction: Transaction):
+        index = range(len(self))[index]
+        self._timestamps[index] = transaction.timestamp
+        self._check_order(index)
+        self._check_order(index + 1)
+        self._amounts[index] = transaction.amount.cents
+        self._types[index] = self._type_pool.code(transaction.type)
+        self._banks[index] = self._bank_pool.code(transaction.bank)
+        self._descriptions[index] = transaction.description
+        self._order = None
+
+    def __delitem__(self, index: int):
+        index = range(len(self))[index]
+        for column in (self._timestamps, self._amounts, self._types, self._banks, self._descriptions):
+            del column[index]
+        self._order = None
+
+    def __iter__(self) -> Iterator[Transaction]:
+        types, banks = self._type_pool.names, self._bank_pool.names
+        for timestamp, kind, amount, description, bank in zip(
+                self._timestamps, self._types, self._amounts, self._descriptions, self._banks):
+            yield Transaction(format_timestamp(timestamp), types[kind], Money(amount), description, banks[bank],
+                              timestamp)
+
+    def insert(self, index: int, transaction: Transaction):
+        self._insert(index, transaction.timestamp, transaction.type, transaction.amount.cents,
+                     transaction.description, transaction.bank)
+
+    def append(self, transaction: Transaction):
+        self.insert(len(self), transaction)
+
+    def clear(self):
+        for column in (self._timestamps, self._amounts, self._types, self._banks, self._descriptions):
+            del column[:]
+        self._in_order = True
+        self._order = None
+
+    def extend_dicts(self, records: Iterable[Dict[str, Any]]):
+        """Acrescenta transações no formato do arquivo de dados sem criar objetos intermediários"""
+        type_code, bank_code = self._type_pool.code, self._bank_pool.code
+        start = len(self)
+        for record in records:
+            self._timestamps.append(parse_timestamp(record['date']))
+            self._amounts.append(Money.of(record['amount']).cents)
+            self._types.append(type_code(record['type']))
+            self._banks.append(bank_code(record.get('bank', "Geral")))
+            self._descriptions.append(record['description'])
+        if self._in_order:
+            timestamps = self._timestamps
+            self._in_order = all(timestamps[i - 1] <= timestamps[i] for i in range(max(start, 1), len(timestamps)))
+        self._order = None
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        types, banks = self._type_pool.names, self._bank_pool.names
+        return [{
+            'date': format_iso_timestamp(timestamp),
+            'type': types[kind],
+            'amount': amount / 100,
+            'description': description,
+            'bank': banks[bank]
+        } for timestamp, kind, amount, description, bank in zip(
+            self._timestamps, self._types, self._amounts, self._descriptions, self._banks)]
+
+    def columns(self) -> Dict[str, Any]:
+        """Colunas internas e tabelas de nomes, para leitura em análises vetorizadas (não alterar)"""
+        return {
+            'timestamps': self._timestamps,
+            'amounts': self._amounts,
+            'types': self._types,
+            'banks': self._banks,
+            'descriptions': self._descriptions,
+            'type_names': list(self._type_pool.names),
+            'bank_names': list(self._bank_pool.names)
+        }
+
+    def replace_bank(self, old_bank: str, new_bank: str) -> List[int]:
+        """Troca o banco das transações; retorna os índices alterados"""
+        old_code = self._bank_pool.codes.get(old_bank)
+        if old_code is None:
+            return []
+        moved = [i for i, code in enumerate(self._banks) if code == old_code]
+        if new_bank not in self._bank_pool.codes:
+            # Nome novo: basta renomear a entrada da tabela
+            del self._bank_pool.codes[old_bank]
+            self._bank_pool.codes[new_bank] = old_code
+            self._bank_pool.names[old_code] = new_bank
+        else:
+            new_code = self._bank_pool.codes[new_bank]
+            for i in moved:
+                self._banks[i] = new_code
+        return moved
+
+    def totals(self) -> Dict[Tuple[str, str], Money]:
+        """Soma dos valores agrupada por (tipo, banco) em uma única passagem"""
+        sums: Dict[Tuple[int, int], int] = {}
+        for key, amount in zip(zip(self._types, self._banks), self._amounts):
+            sums[key] = sums.get(key, 0) + amount
+        types, banks = self._type_pool.names, self._bank_pool.names
+        return {(types[kind], banks[bank]): Money(total) for (kind, bank), total in sums.items()}
+
+    def indices_between(self, start: int, end: int) -> Sequence[int]:
+        """Posições das transações com data em [start, end), em ordem cronológica"""
+        if self._in_order:
+            return range(bisect_left(self._timestamps, start), bisect_left(self._timestamps, end))
+        if self._order is None:
+            self._order = array('q', sorted(range(len(self)), key=self._timestamps.__getitem__))
+            self._order_keys = array('q', (self._timestamps[i] for i in self._order))
+        return self._order[bisect_left(self._order_keys, start):bisect_left(self._order_keys, end)]
+
+    def select(self, start: Optional[int] = None, end: Optional[int] = None, transaction_type: Optional[str] = None,
+               bank: Optional[str] = None, text: Optional[str] = None) -> Sequence[int]:
+        """Posições das transações que atendem aos filtros, em ordem cronológica.
+
+        Sem filtros de tipo, banco ou texto o resultado é um range (ou fatia do
+        índice ordenado), sem percorrer o histórico.
+        """
+        indices = self.indices_between(_MIN_TIMESTAMP if start is None else start,
+                                       _MAX_TIMESTAMP if end is None else end)
+        if transaction_type is not None:
+            code = self._type_pool.codes.get(transaction_type)
+            types = self._types
+            indices = [i for i in indices if types[i] == code]
+        if bank is not None:
+            code = self._bank_pool.codes.get(bank)
+            banks = self._banks
+            indices = [i for i in indices if banks[i] == code]
+        if text:
+            needle = text.casefold()
+            descriptions = self._descriptions
+            indices = [i for i in indices if needle in descriptions[i].casefold()]
+        return indices
+
+    def sort_indices(self, indices: Sequence[int], sort_by: str = 'date', descending: bool = False) -> Sequence[int]:
+        """Ordena posições já filtradas por 'date', 'type', 'amount', 'description' ou 'bank'"""
+        if sort_by == 'date':
+            # select já devolve em ordem cronológica; inverter um range é O(1)
+            return indices[::-1] if descending else indices
+        if sort_by == 'amount':
+            key = self._amounts.__getitem__
+        elif sort_by == 'description':
+            descriptions = self._descriptions
+            key = lambda i: descriptions[i].casefold()
+        elif sort_by == 'type':
+            types, names = self._types, self._type_pool.names
+            key = lambda i: names[types[i]]
+        elif sort_by == 'bank':
+            banks, names = self._banks, self._bank_pool.names
+            key = lambda i: names[banks[i]].casefold()
+        else:
+            raise ValueError(f"Coluna de ordenação inválida: {sort_by}")
+        return sorted(indices, key=key, reverse=descending)
+
+    def _row(self, index: int) -> Transaction:
+        timestamp = self._timestamps[index]
+        return Transaction(
+            date=format_timestamp(timestamp),
+            type=self._type_pool.names[self._types[index]],
+            amount=Money(self._amounts[index]),
+            description=self._descriptions[index],
+            bank=self._bank_pool.names[self._banks[index]],
+            timestamp=timestamp
+        )
+
+    def _check_order(self, index: int):
+        # A posição index ainda respeita a ordem em relação à anterior?
+        if self._in_order and 0 < index < len(self._timestamps):
+            self._in_order = self._timestamps[index - 1] <= self._timestamps[index]
+
+    def _insert(self, index: int, timestamp: int, kind: str, cents: int, description: str, bank: str):
+        self._timestamps.insert(index, timestamp)
+        self._check_order(index)
+        self._check_order(index + 1)
+        self._order = None
+        self._amounts.insert(index, cents)
+        self._types.insert(index, self._type_pool.code(kind))
+        self._banks.insert(index, self._bank_pool.code(bank))
+        self._descriptions.insert(index, description)
 
 @dataclass
 class Wallet:
-    balance: float = 0.0
-    history: List[Transaction] = None
+    balance: Money = Money(0)
+    history: TransactionHistory = None
     banks: List[Bank] = None
+    _bank_index: Dict[str, Bank] = field(default=None, init=False, repr=False, compare=False)
     
     def __post_init__(self):
-        if self.history is None:
-            self.history = []
+        self.balance = Money.of(self.balance)
+        if not isinstance(self.history, TransactionHistory):
+            self.history = TransactionHistory(self.history or [])
         if self.banks is None:
             self.banks = [Bank(name="Geral")]
+        self._bank_index = {bank.name: bank for bank in self.banks}
     
     def add_transaction(self, transaction: Transaction):
+        self._apply(transaction, 1)
+        self.history.append(transaction)
+    
+    def delete_transaction(self, transaction_index: int) -> bool:
+        """Remove a transação desfazendo apenas o efeito dela nos saldos"""
+        if 0 <= transaction_index < len(self.history):
+            self._apply(self.history[transaction_index], -1)
+            del self.history[transaction_index]
+            return True
+        return False
+    
+    def recompute_balances(self) -> bool:
+        """Recalcula os saldos a partir do histórico em uma única passagem.
+        
+        Retorna True se os saldos armazenados já estavam consistentes.
+        """
+        balance = Money(0)
+        bank_balances = {name: Money(0) for name in self._bank_index}
+        for (kind, bank), total in self.history.totals().items():
+            signed = total if kind == "Entrada" else -total
+            balance += signed
+            if bank in bank_balances and (kind == "Entrada" or bank != "Geral"):
+                bank_balances[bank] += signed
+        
+        consistent = self.balance == balance and all(
+            self._bank_index[name].balance == value for name, value in bank_balances.items()
+        )
+        self.balance = balance
+        for name, value in bank_balances.items():
+            self._bank_index[name].balance = value
+        return consistent
+    
+    def _apply(self, transaction: Transaction, sign: int):
+        bank = self._bank_index.get(transaction.bank)
         if transaction.type == "Entrada":
-            self.balance += transaction.amount
+            self.balance += sign * transaction.amount
             # Atualiza saldo do banco específico
-            for bank in self.banks:
-                if bank.name == transaction.bank:
-                    bank.balance += transaction.amount
-                    break
+            if bank is not None:
+                bank.balance += sign * transaction.amount
         else:
-            self.balance -= transaction.amount
+            self.balance -= sign * transaction.amount
             # Deduz do banco geral ou específico
-            if transaction.bank != "Geral":
-                for bank in self.banks:
-                    if bank.name == transaction.bank:
-                        bank.balance -= transaction.amount
-                        break
-        self.history.append(transaction)
+            if transaction.bank != "Geral" and bank is not None:
+                bank.balance -= sign * transaction.amount
+    
+    def history_between(self, start: Union[datetime, int], end: Union[datetime, int]) -> List[Transaction]:
+        """Transações com data em [start, end), em ordem cronológica"""
+        if isinstance(start, datetime):
+            start = to_timestamp(start)
+        if isinstance(end, datetime):
+            end = to_timestamp(end)
+        return [self.history[i] for i in self.history.indices_between(start, end)]
+    
+    def history_for_month(self, month_year: str) -> List[Transaction]:
+        year, month = map(int, month_year.split('-'))
+        return self.history_between(datetime(year, month, 1), datetime(year + month // 12, month % 12 + 1, 1))
+    
+    def get_bank(self, bank_name: str) -> Optional[Bank]:
+        return self._bank_index.get(bank_name)
     
-    def get_bank_balance(self, bank_name: str) -> float:
-        for bank in self.banks:
-            if bank.name == bank_name:
-                return bank.balance
-        return 0.0
+    def get_bank_balance(self, bank_name: str) -> Money:
+        bank = self._bank_index.get(bank_name)
+        return bank.balance if bank is not None else Money(0)
     
     def add_bank(self, bank_name: str):
-        if not any(bank.name == bank_name for bank in self.banks):
-            self.banks.append(Bank(name=bank_name))
+        if bank_name not in self._bank_index:
+            bank = Bank(name=bank_name)
+            self.banks.append(bank)
+            self._bank_index[bank_name] = bank
     
-    def edit_transaction(self, transaction_index: int, new_amount: float, new_description: str, new_bank: str):
+    def remove_bank(self, bank_name: str) -> List[int]:
+        """Remove o banco e move suas transações para 'Geral'; retorna os índices movidos.
+        
+        As entradas movidas passam a contar no saldo do 'Geral', como se tivessem
+        sido feitas nele (saídas do 'Geral' só reduzem o saldo total).
+        """
+        bank = self._bank_index.pop(bank_name, None)
+        if bank is None:
+            return []
+        self.banks.remove(bank)
+        moved = self.history.replace_bank(bank_name, "Geral")
+        general = self._bank_index.get("Geral")
+        if general is not None:
+            for index in moved:
+                transaction = self.history[index]
+                if transaction.type == "Entrada":
+                    general.balance += transaction.amount
+        return moved
+    
+    def rename_bank(self, old_name: str, new_name: str) -> List[int]:
+        """Renomeia o banco e suas transações; retorna os índices alterados"""
+        if old_name not in self._bank_index or new_name in self._bank_index:
+            return []
+        bank = self._bank_index.pop(old_name)
+        bank.name = new_name
+        self._bank_index[new_name] = bank
+        return self.history.replace_bank(old_name, new_name)
+    
+    def edit_transaction(self, transaction_index: int, new_amount: Money, new_description: str, new_bank: str):
         """Edita uma transação existente"""
         if 0 <= transaction_index < len(self.history):
             old_transaction = self.history[transaction_index]
             
             # Reverte transação antiga
-            if old_transaction.type == "Entrada":
-                self.balance -= old_transaction.amount
-                for bank in self.banks:
-                    if bank.name == old_transaction.bank:
-                        bank.balance -= old_transaction.amount
-                        break
-            else:
-                self.balance += old_transaction.amount
+            self._apply(old_transaction, -1)
             
             # Aplica nova transação
             new_transaction = Transaction(
                 date=old_transaction.date,
+                timestamp=old_transaction.timestamp,
                 type=old_transaction.type,
                 amount=new_amount,
                 description=new_description,
                 bank=new_bank
             )
             
-            if new_transaction.type == "Entrada":
-                self.balance += new_amount
-                for bank in self.banks:
-                    if bank.name == new_bank:
-                        bank.balance += new_amount
-                        break
-            else:
-                self.balance -= new_amount
-            
+            self._apply(new_transaction, 1)
             self.history[transaction_index] = new_transaction
\ No newline at end of file
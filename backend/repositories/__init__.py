@@ -1,3 +1,5 @@
 from .json_repository import JSONRepository
+from .journal_repository import JournalRepository
+from .sqlite_repository import SQLiteRepository
 
-__all__ = ['JSONRepository']
\ No newline at end of file
+__all__ = ['JSONRepository', 'JournalRepository', 'SQLiteRepository']
\ No newline at end of file
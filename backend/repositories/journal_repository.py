@@ -0,0 +1,146 @@
+import json
+import os
+import threading
+from typing import Dict, Any, List, Iterator, Optional
+from .json_repository import JSONRepository
+
+class JournalRepository(JSONRepository):
+    """Snapshot JSON + journal append-only com as alterações de cada operação.
+
+    Cada mutação acrescenta registros compactos ao journal, com custo independente
+    do tamanho do histórico. Quando o journal cresce, uma thread em segundo plano
+    incorpora os registros ao snapshot (compactação).
+    """
+
+    def __init__(self, data_file: str = "data/finance_data.json", compact_threshold: int = 500):
+        super().__init__(data_file)
+        self.journal_file = os.path.splitext(data_file)[0] + ".journal"
+        self.compacting_file = self.journal_file + ".compacting"
+        self.compact_threshold = compact_threshold
+        self._lock = threading.Lock()
+        self._compaction: Optional[threading.Thread] = None
+        self._seq = 0
+        self._journal_records = 0
+
+    def load_data(self) -> Dict[str, Any]:
+        self._wait_compaction()
+        data = self._read_snapshot()
+        applied = data.pop('_journal_seq', 0)
+
+        self._journal_records = 0
+        for path in (self.compacting_file, self.journal_file):
+            for change in self._read_journal(path):
+                if path == self.journal_file:
+                    self._journal_records += 1
+                if change['seq'] > applied:
+                    _apply_change(data, change)
+                    applied = change['seq']
+
+        self._seq = applied
+        return data
+
+    def save_data(self, data: Dict[str, Any]):
+        """Grava um snapshot completo e descarta o journal já incorporado"""
+        self._wait_compaction()
+        with self._lock:
+            self._write_snapshot(dict(data, _journal_seq=self._seq))
+            for path in (self.compacting_file, self.journal_file):
+                if os.path.exists(path):
+                    os.remove(path)
+            self._journal_records = 0
+
+    def append_changes(self, changes: List[Dict[str, Any]]):
+        with self._lock:
+            lines = []
+            for change in changes:
+                self._seq += 1
+                lines.append(json.dumps(dict(change, seq=self._seq), ensure_ascii=False,
+                                        separators=(',', ':')))
+            created = not os.path.exists(self.journal_file)
+            with open(self.journal_file, 'a', encoding='utf-8') as f:
+                f.write('\n'.join(lines) + '\n')
+                # Um fsync por chamada: as alterações de uma operação (ou de um batch) juntas
+                f.flush()
+                os.fsync(f.fileno())
+            if created:
+                self._sync_directory(self.journal_file)
+            self._journal_records += len(lines)
+
+            compacting = self._compaction is not None and self._compaction.is_alive()
+            if self._journal_records >= self.compact_threshold and not compacting:
+                self._rotate_journal()
+                self._compaction = threading.Thread(target=self._compact_rotated, daemon=True)
+                self._compaction.start()
+
+    def compact(self):
+        """Incorpora imediatamente todo o journal ao snapshot"""
+        self._wait_compaction()
+        with self._lock:
+            self._rotate_journal()
+        self._compact_rotated()
+
+    def close(self):
+        self._wait_compaction()
+        super().close()
+
+    def _rotate_journal(self):
+        # Um journal em compactação que sobrou de uma execução interrompida
+        # é processado antes de rotacionar o atual
+        if os.path.exists(self.compacting_file):
+            return
+        if os.path.exists(self.journal_file):
+            os.replace(self.journal_file, self.compacting_file)
+            self._journal_records = 0
+
+    def _compact_rotated(self):
+        data = self._read_snapshot()
+        applied = data.pop('_journal_seq', 0)
+        for change in self._read_journal(self.compacting_file):
+            if change['seq'] > applied:
+                _apply_change(data, change)
+                applied = change['seq']
+        data['_journal_seq'] = applied
+        self._write_snapshot(data)
+        if os.path.exists(self.compacting_file):
+            os.remove(self.compacting_file)
+
+    def _wait_compaction(self):
+        if self._compaction is not None:
+            self._compaction.join()
+            self._compaction = None
+
+    def _read_snapshot(self) -> Dict[str, Any]:
+        return super().load_data()
+
+    def _write_snapshot(self, data: Dict[str, Any]):
+        payload = json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        self._write_atomic(self.data_file, payload)
+
+    @staticmethod
+    def _read_journal(path: str) -> Iterator[Dict[str, Any]]:
+        if not os.path.exists(path):
+            return
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    # Última linha incompleta de uma gravação interrompida
+                    return
+
+def _apply_change(data: Dict[str, Any], change: Dict[str, Any]):
+    *parents, key = change['path']
+    target = data
+    for part in parents:
+        target = target[part] if isinstance(target, list) else target.setdefault(part, {})
+
+    op = change['op']
+    if op == 'set':
+        target[key] = change['value']
+    elif op == 'append':
+        target.setdefault(key, []).append(change['value'])
+    elif op == 'delete':
+        if isinstance(target, list):
+            del target[key]
+        else:
+            target.pop(key, None)
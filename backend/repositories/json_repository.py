@@ -1,26 +1,297 @@
+import atexit
 import json
 import os
-from typing import Dict, Any
+import threading
+import weakref
+from typing import Dict, Any, Optional, Callable, List, Tuple
 from datetime import datetime
+from .json_stream import JSONStreamReader
+
+# Repositórios abertos, gravados na saída do programa por um único hook do atexit
+_open_repositories: 'weakref.WeakSet' = weakref.WeakSet()
+
+def _flush_open_repositories():
+    errors = []
+    for repository in list(_open_repositories):
+        try:
+            repository.flush()
+        except Exception as error:
+            errors.append(error)
+    if errors:
+        raise errors[0]
+
+atexit.register(_flush_open_repositories)
+
+class _ChunkRejected(Exception):
+    """Erro de quem consome os blocos do histórico (não é corrupção do arquivo)"""
 
 class JSONRepository:
-    def __init__(self, data_file: str = "data/finance_data.json"):
+    def __init__(self, data_file: str = "data/finance_data.json", sync_delay: float = 1.0,
+                 streaming: bool = False, recent_months: Optional[int] = None):
         self.data_file = data_file
+        self.sync_delay = sync_delay
+        self.streaming = streaming
+        self.recent_months = recent_months
+        self._sync_lock = threading.Lock()
+        # Serializa as gravações: flush() só retorna depois da gravação pendente terminar
+        self._flush_lock = threading.Lock()
+        # Protege o arquivo e as posições dos meses adiados entre gravação e leitura
+        self._file_lock = threading.RLock()
+        self._sync_timer: Optional[threading.Timer] = None
+        # Última versão dos dados ainda não gravada e erro da última gravação pelo timer
+        self._pending: Optional[Dict[str, Any]] = None
+        self._write_error: Optional[Exception] = None
+        # Meses de despesas ainda não carregados: mês -> intervalo em bytes no arquivo
+        self._deferred_months: Dict[str, Tuple[int, int]] = {}
         os.makedirs(os.path.dirname(data_file), exist_ok=True)
-    
+        _open_repositories.add(self)
+
     def load_data(self) -> Dict[str, Any]:
+        self.flush()
         if os.path.exists(self.data_file):
             try:
                 with open(self.data_file, 'r', encoding='utf-8') as f:
                     return json.load(f)
-            except:
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                self._preserve_corrupt_file()
                 return self._get_default_data()
         return self._get_default_data()
-    
+
+    def load_data_streaming(self, on_history_chunk: Callable[[List[Dict[str, Any]]], None],
+                            chunk_size: int = 1000) -> Dict[str, Any]:
+        """Carrega os dados lendo o arquivo incrementalmente.
+
+        O histórico da carteira é entregue em blocos a on_history_chunk e não
+        aparece no dicionário retornado. Com recent_months, apenas os meses de
+        despesas a partir desse corte são lidos; os demais ficam no disco até
+        load_month ser chamado.
+
+        Se o arquivo estiver corrompido, volta o documento padrão, que traz
+        wallet.history: os blocos já entregues devem ser descartados. Erros
+        levantados por on_history_chunk são repassados sem tratar o arquivo
+        como corrompido.
+        """
+        self.flush()
+        self._deferred_months = {}
+        if not os.path.exists(self.data_file):
+            return self._get_default_data()
+
+        cutoff = self._recent_cutoff()
+        data: Dict[str, Any] = {}
+        try:
+            with open(self.data_file, 'rb') as f:
+                reader = JSONStreamReader(f)
+                for key in self._iter_keys(reader):
+                    if key == 'wallet':
+                        data['wallet'] = self._read_wallet(reader, on_history_chunk, chunk_size)
+                    elif key == 'expenses' and cutoff is not None:
+                        data['expenses'] = self._read_expenses(reader, cutoff)
+                    else:
+                        data[key] = reader.value()
+        except _ChunkRejected as rejected:
+            self._deferred_months = {}
+            raise rejected.__cause__
+        except (ValueError, UnicodeDecodeError):
+            self._deferred_months = {}
+            self._preserve_corrupt_file()
+            return self._get_default_data()
+        return data
+
+    def deferred_months(self) -> List[str]:
+        return list(self._deferred_months)
+
+    def load_month(self, month_year: str) -> List[Dict[str, Any]]:
+        with self._file_lock:
+            start, end = self._deferred_months[month_year]
+            with open(self.data_file, 'rb') as f:
+                f.seek(start)
+                return json.loads(f.read(end - start).decode('utf-8'))
+
+    def find_deferred_months(self, text: str) -> List[str]:
+        """Meses ainda no disco que contêm o texto como valor de string"""
+        needle = json.dumps(text, ensure_ascii=False).encode('utf-8')
+        found = []
+        with self._file_lock, open(self.data_file, 'rb') as f:
+            for month_year, (start, end) in self._deferred_months.items():
+                f.seek(start)
+                if needle in f.read(end - start):
+                    found.append(month_year)
+        return found
+
     def save_data(self, data: Dict[str, Any]):
-        with open(self.data_file, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
-    
+        """Grava de forma atômica e durável.
+
+        Gravações seguidas são agrupadas: a primeira agenda a escrita para daqui a
+        sync_delay segundos e as demais só trocam os dados pendentes, de modo que
+        apenas a última versão é escrita. flush() grava na hora (e roda ao sair).
+        Com sync_delay 0 a gravação é imediata.
+        """
+        if self.sync_delay <= 0:
+            self.flush()
+            self._write_data(data)
+            return
+        with self._sync_lock:
+            self._pending = data
+            if self._sync_timer is None:
+                self._sync_timer = threading.Timer(self.sync_delay, self._flush_from_timer)
+                self._sync_timer.daemon = True
+                self._sync_timer.start()
+            error, self._write_error = self._write_error, None
+        # A falha de uma gravação agendada aparece aqui; os dados seguem pendentes
+        if error is not None:
+            raise error
+
+    def _write_data(self, data: Dict[str, Any]):
+        with self._file_lock:
+            payload, deferred = self._serialize(data)
+            self._write_atomic(self.data_file, payload)
+            self._deferred_months = deferred
+
+    def _serialize(self, data: Dict[str, Any]) -> Tuple[bytes, Dict[str, Tuple[int, int]]]:
+        """Serializa os dados; retorna também a nova posição dos meses não carregados"""
+        expenses = data.get('expenses', {})
+        deferred = {month: span for month, span in self._deferred_months.items() if month not in expenses}
+        if not deferred:
+            return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8'), {}
+
+        # Meses não carregados são copiados do arquivo atual sem passar pelo parser
+        raw_months = {}
+        with open(self.data_file, 'rb') as f:
+            for month_year, (start, end) in deferred.items():
+                f.seek(start)
+                raw_months[month_year] = f.read(end - start)
+
+        def dumps(value: Any) -> bytes:
+            return json.dumps(value, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+        new_offsets: Dict[str, Tuple[int, int]] = {}
+        parts = [b'{']
+        size = 1
+        for key, value in data.items():
+            if key != 'expenses':
+                part = dumps(key) + b':' + dumps(value) + b','
+                parts.append(part)
+                size += len(part)
+
+        month_parts = [dumps(month) + b':' + dumps(items) for month, items in expenses.items()]
+        part = b'"expenses":{' + b','.join(month_parts)
+        parts.append(part)
+        size += len(part)
+        for month_year, raw in raw_months.items():
+            part = (b',' if month_parts else b'') + dumps(month_year) + b':'
+            parts.append(part)
+            size += len(part)
+            new_offsets[month_year] = (size, size + len(raw))
+            parts.append(raw)
+            size += len(raw)
+            month_parts.append(raw)
+        parts.append(b'}}')
+        return b''.join(parts), new_offsets
+
+    @staticmethod
+    def _iter_keys(reader: JSONStreamReader):
+        reader.expect('{')
+        if reader.consume('}'):
+            return
+        while True:
+            key = reader.value()
+            reader.expect(':')
+            yield key
+            if not reader.consume(','):
+                reader.expect('}')
+                return
+
+    def _read_wallet(self, reader: JSONStreamReader, on_history_chunk, chunk_size: int) -> Dict[str, Any]:
+        wallet: Dict[str, Any] = {}
+        for key in self._iter_keys(reader):
+            if key != 'history':
+                wallet[key] = reader.value()
+                continue
+            for chunk in reader.iter_array_chunks(chunk_size):
+                try:
+                    on_history_chunk(chunk)
+                except Exception as error:
+                    raise _ChunkRejected() from error
+        return wallet
+
+    def _read_expenses(self, reader: JSONStreamReader, cutoff: str) -> Dict[str, Any]:
+        expenses: Dict[str, Any] = {}
+        for month_year in self._iter_keys(reader):
+            if month_year >= cutoff or reader.peek() != '[':
+                expenses[month_year] = reader.value()
+            else:
+                self._deferred_months[month_year] = reader.skip_value()
+        return expenses
+
+    def _recent_cutoff(self) -> Optional[str]:
+        if self.recent_months is None:
+            return None
+        now = datetime.now()
+        months = now.year * 12 + now.month - 1 - self.recent_months
+        return f"{months // 12:04d}-{months % 12 + 1:02d}"
+
+    def _preserve_corrupt_file(self):
+        # Preserva o arquivo corrompido para que a próxima gravação não apague os dados
+        corrupt_file = f"{self.data_file}.corrupt-{datetime.now().strftime('%Y%m%d%H%M%S')}"
+        os.replace(self.data_file, corrupt_file)
+
+    def export_pretty(self, data: Dict[str, Any], export_file: str):
+        """Exporta uma cópia legível (indentada) dos dados"""
+        payload = json.dumps(data, ensure_ascii=False, indent=2).encode('utf-8')
+        self._write_atomic(export_file, payload)
+
+    def flush(self):
+        """Grava agora os dados pendentes"""
+        with self._flush_lock:
+            with self._sync_lock:
+                if self._sync_timer is not None:
+                    self._sync_timer.cancel()
+                    self._sync_timer = None
+                data, self._pending = self._pending, None
+            if data is None:
+                return
+            try:
+                self._write_data(data)
+            except BaseException:
+                with self._sync_lock:
+                    if self._pending is None:
+                        self._pending = data
+                raise
+            with self._sync_lock:
+                self._write_error = None
+
+    def close(self):
+        """Grava os dados pendentes e deixa de ser gravado na saída do programa"""
+        self.flush()
+        _open_repositories.discard(self)
+
+    def _flush_from_timer(self):
+        try:
+            self.flush()
+        except Exception as error:
+            self._write_error = error
+
+    def _write_atomic(self, path: str, payload: bytes):
+        """Arquivo temporário com fsync, rename e fsync da pasta: o arquivo final
+        é sempre a versão anterior completa ou a nova completa"""
+        tmp_file = path + ".tmp"
+        with open(tmp_file, 'wb') as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, path)
+        self._sync_directory(path)
+
+    @staticmethod
+    def _sync_directory(path: str):
+        if os.name != 'posix':
+            return
+        fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
     def _get_default_data(self) -> Dict[str, Any]:
         current_month = datetime.now().strftime("%Y-%m")
         return {
@@ -34,4 +305,4 @@ class JSONRepository:
             'expenses': {
                 current_month: []
             }
-        }
\ No newline at end of file
+        }
@@ -0,0 +1,176 @@
+import codecs
+import json
+import re
+from typing import Any, BinaryIO, Iterator, List, Tuple
+
+_WHITESPACE = re.compile(r'\s*')
+_SEPARATOR = re.compile(r'\s*([,\]])')
+# Separador seguido do espaço até o próximo elemento (uma busca por elemento)
+_SEPARATOR_WS = re.compile(r'\s*([,\]])\s*')
+# Strings (possivelmente cortadas no fim do buffer) e delimitadores de estrutura
+_TOKEN = re.compile(r'"(?:[^"\\]|\\.)*"?|[\[\]{}]', re.DOTALL)
+_DECODER = json.JSONDecoder()
+
+class JSONStreamReader:
+    """Leitor incremental de JSON para percorrer o arquivo de dados sem carregá-lo inteiro.
+
+    Mantém apenas um buffer com a parte ainda não consumida do arquivo e conhece
+    a posição em bytes do cursor, para permitir reler trechos depois via seek.
+    """
+
+    def __init__(self, f: BinaryIO, chunk_size: int = 1 << 16):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buffer = ""
+        self.pos = 0
+        self.base_offset = 0
+        self.eof = False
+        self._decoder = codecs.getincrementaldecoder('utf-8')()
+
+    def peek(self) -> str:
+        self._skip_whitespace()
+        return self.buffer[self.pos] if self.pos < len(self.buffer) else ""
+
+    def expect(self, char: str):
+        if self.peek() != char:
+            raise ValueError(f"Esperado '{char}' na posição {self.offset()}")
+        self.pos += 1
+
+    def consume(self, char: str) -> bool:
+        if self.peek() == char:
+            self.pos += 1
+            return True
+        return False
+
+    def value(self) -> Any:
+        """Decodifica o próximo valor JSON completo"""
+        self._skip_whitespace()
+        while True:
+            try:
+                value, end = _DECODER.raw_decode(self.buffer, self.pos)
+                # Um número no fim do buffer pode continuar no próximo bloco
+                if end < len(self.buffer) or self.eof:
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            self._fill(max(self.chunk_size, len(self.buffer) - self.pos))
+
+    def iter_array(self) -> Iterator[Any]:
+        """Percorre os elementos de um array, decodificando um de cada vez"""
+        self.expect('[')
+        if self.consume(']'):
+            return
+        scan = _DECODER.scan_once
+        while True:
+            buffer, pos = self.buffer, self.pos
+            while True:
+                pos = _WHITESPACE.match(buffer, pos).end()
+                try:
+                    value, end = scan(buffer, pos)
+                except (StopIteration, json.JSONDecodeError):
+                    break
+                separator = _SEPARATOR.match(buffer, end)
+                if separator is None:
+                    break
+                pos = separator.end()
+                self.pos = pos
+                yield value
+                if separator.group(1) == ']':
+                    return
+            # Elemento cortado no fim do buffer: lê mais e tenta de novo
+            if self.eof:
+                raise ValueError(f"Array inválido na posição {self.offset()}")
+            self._fill(max(self.chunk_size, len(self.buffer) - self.pos))
+
+    def iter_array_chunks(self, size: int) -> Iterator[List[Any]]:
+        """Como iter_array, mas entrega listas de elementos (cerca de size por lista).
+
+        A parte do buffer até a última vírgula entre elementos é decodificada de
+        uma vez pelo parser em C, como um array. Se a vírgula escolhida estiver
+        dentro de uma string ou de um elemento, esse array fica incompleto e a
+        decodificação falha; aí os elementos são lidos um a um.
+        """
+        self.expect('[')
+        if self.consume(']'):
+            return
+        scan = _DECODER.scan_once
+        chunk: List[Any] = []
+        while True:
+            buffer = self.buffer
+            pos = _WHITESPACE.match(buffer, self.pos).end()
+            comma = buffer.rfind('},', pos)
+            comma = comma + 1 if comma >= 0 else buffer.rfind(',', pos)
+            if comma > pos:
+                try:
+                    chunk.extend(_DECODER.decode('[' + buffer[pos:comma] + ']'))
+                    pos = _WHITESPACE.match(buffer, comma + 1).end()
+                except json.JSONDecodeError:
+                    pass
+            while True:
+                try:
+                    value, end = scan(buffer, pos)
+                except (StopIteration, json.JSONDecodeError):
+                    break
+                separator = _SEPARATOR_WS.match(buffer, end)
+                if separator is None:
+                    break
+                chunk.append(value)
+                pos = separator.end()
+                if separator.group(1) == ']':
+                    self.pos = pos
+                    yield chunk
+                    return
+            self.pos = pos
+            if len(chunk) >= size:
+                yield chunk
+                chunk = []
+            # Elemento cortado no fim do buffer: lê mais e tenta de novo
+            if self.eof:
+                raise ValueError(f"Array inválido na posição {self.offset()}")
+            self._fill(max(self.chunk_size, len(self.buffer) - self.pos))
+
+    def skip_value(self) -> Tuple[int, int]:
+        """Pula um objeto/array sem construí-lo; retorna o intervalo em bytes"""
+        self._skip_whitespace()
+        start = self.offset()
+        depth = 0
+        i = self.pos
+        while True:
+            match = _TOKEN.search(self.buffer, i)
+            if match is None or (match.end() == len(self.buffer) and not self.eof):
+                if self.eof:
+                    raise ValueError("JSON incompleto")
+                i -= self._fill(self.chunk_size, keep_from=i)
+                continue
+            token = match.group()
+            i = match.end()
+            if token in '[{':
+                depth += 1
+            elif token in ']}':
+                depth -= 1
+            if depth == 0:
+                self.pos = i
+                return start, self.offset()
+
+    def offset(self) -> int:
+        return self.base_offset + len(self.buffer[:self.pos].encode('utf-8'))
+
+    def _skip_whitespace(self):
+        while True:
+            self.pos = _WHITESPACE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer) or self.eof:
+                return
+            self._fill(self.chunk_size)
+
+    def _fill(self, size: int, keep_from: int = None) -> int:
+        """Descarta o trecho já consumido e lê mais dados; retorna o deslocamento aplicado"""
+        keep_from = self.pos if keep_from is None else min(keep_from, self.pos)
+        discarded = self.buffer[:keep_from]
+        self.base_offset += len(discarded.encode('utf-8'))
+        data = self.f.read(size)
+        self.eof = not data
+        self.buffer = self.buffer[keep_from:] + self._decoder.decode(data, final=self.eof)
+        self.pos -= keep_from
+        return keep_from
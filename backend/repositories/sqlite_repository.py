@@ -0,0 +1,386 @@
+import json
+import os
+import sqlite3
+import threading
+from array import array
+from datetime import datetime
+from typing import Dict, Any, List, Callable, Optional, Set
+from ..models.cards import add_months
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value REAL
+);
+CREATE TABLE IF NOT EXISTS transactions (
+    pos INTEGER NOT NULL,
+    date TEXT NOT NULL,
+    type TEXT NOT NULL,
+    amount REAL NOT NULL,
+    description TEXT NOT NULL,
+    bank TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_transactions_pos ON transactions(pos);
+CREATE TABLE IF NOT EXISTS banks (
+    name TEXT PRIMARY KEY,
+    balance REAL NOT NULL,
+    pos INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS cards (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    credit_limit REAL NOT NULL,
+    used REAL NOT NULL,
+    due_date TEXT NOT NULL,
+    available REAL NOT NULL,
+    pos INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_cards_name ON cards(name);
+CREATE TABLE IF NOT EXISTS expenses (
+    month TEXT NOT NULL,
+    pos INTEGER NOT NULL,
+    description TEXT NOT NULL,
+    amount REAL NOT NULL,
+    due_date TEXT NOT NULL,
+    paid INTEGER NOT NULL,
+    recurring INTEGER NOT NULL,
+    end_date TEXT,
+    PRIMARY KEY (month, pos)
+);
+CREATE INDEX IF NOT EXISTS idx_expenses_description ON expenses(description);
+CREATE TABLE IF NOT EXISTS installments (
+    pos INTEGER PRIMARY KEY,
+    description TEXT NOT NULL,
+    total_amount REAL NOT NULL,
+    installments INTEGER NOT NULL,
+    current_installment INTEGER NOT NULL,
+    installment_value REAL NOT NULL,
+    purchase_date TEXT NOT NULL,
+    card_name TEXT NOT NULL,
+    first_month TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_installments_card ON installments(card_name);
+CREATE TABLE IF NOT EXISTS recurring_expenses (
+    pos INTEGER PRIMARY KEY,
+    description TEXT NOT NULL,
+    amount REAL NOT NULL,
+    due_date TEXT NOT NULL,
+    start_month TEXT NOT NULL,
+    end_date TEXT,
+    skipped_months TEXT NOT NULL
+);
+"""
+
+class SQLiteRepository:
+    """Persistência em SQLite com gravação por linha em vez do documento inteiro.
+
+    Abre pelo mesmo protocolo de carga incremental do JSONRepository: o
+    histórico sai em blocos e, com recent_months, os meses de despesas antigos
+    só são lidos (pelo índice de expenses) quando o FinanceService pede.
+    """
+
+    streaming = True
+
+    def __init__(self, data_file: str = "data/finance_data.db", recent_months: Optional[int] = None):
+        self.data_file = data_file
+        self.recent_months = recent_months
+        self._deferred_months: Set[str] = set()
+        # rowid de cada transação na ordem do histórico: a posição usada pelo
+        # serviço vira a chave da linha sem varrer a tabela (None: ler do banco)
+        self._rowids: Optional[array] = None
+        os.makedirs(os.path.dirname(data_file), exist_ok=True)
+        # A conexão pode ser usada pela thread de gravação; o lock serializa o acesso
+        self.connection = sqlite3.connect(data_file, check_same_thread=False)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.executescript(_SCHEMA)
+        self._migrate_schema()
+        self._lock = threading.RLock()
+
+    def _migrate_schema(self):
+        # Bancos criados antes de first_month existir: sem a coluna, o mês da
+        # 1ª parcela volta a ser derivado da data da compra
+        columns = {row['name'] for row in self.connection.execute("PRAGMA table_info(installments)")}
+        if 'first_month' not in columns:
+            with self.connection as db:
+                db.execute("ALTER TABLE installments ADD COLUMN first_month TEXT")
+        # Índices de consultas do histórico que o serviço não faz (o histórico fica em memória)
+        self.connection.execute("DROP INDEX IF EXISTS idx_transactions_bank")
+        self.connection.execute("DROP INDEX IF EXISTS idx_transactions_description")
+
+    def load_data(self) -> Dict[str, Any]:
+        history: List[Dict[str, Any]] = []
+        with self._lock:
+            data = self._read(history.extend, 1000, None)
+        data['wallet']['history'] = history
+        return data
+
+    def load_data_streaming(self, on_history_chunk: Callable[[List[Dict[str, Any]]], None],
+                            chunk_size: int = 1000) -> Dict[str, Any]:
+        """Carrega os dados com o histórico entregue em blocos a on_history_chunk.
+
+        O histórico não aparece no dicionário retornado. Com recent_months,
+        apenas os meses de despesas a partir do corte são lidos; os demais ficam
+        no banco até load_month ser chamado.
+        """
+        with self._lock:
+            return self._read(on_history_chunk, chunk_size, self._recent_cutoff())
+
+    def _read(self, on_history_chunk: Callable[[List[Dict[str, Any]]], None], chunk_size: int,
+              cutoff: Optional[str]) -> Dict[str, Any]:
+        db = self.connection
+        balance = db.execute("SELECT value FROM meta WHERE key = 'balance'").fetchone()
+
+        rowids = array('q')
+        rows = db.execute("SELECT rowid, * FROM transactions ORDER BY pos")
+        while True:
+            chunk = rows.fetchmany(chunk_size)
+            if not chunk:
+                break
+            rowids.extend(row['rowid'] for row in chunk)
+            on_history_chunk([self._transaction_from_row(row) for row in chunk])
+        self._rowids = rowids
+
+        expenses: Dict[str, List[Dict[str, Any]]] = {}
+        for row in db.execute("SELECT * FROM expenses WHERE month >= ? ORDER BY month, pos", (cutoff or "",)):
+            expenses.setdefault(row['month'], []).append(self._expense_from_row(row))
+        self._deferred_months = {row['month'] for row in db.execute(
+            "SELECT DISTINCT month FROM expenses WHERE month < ?", (cutoff or "",))}
+
+        return {
+            'wallet': {
+                'balance': balance['value'] if balance else 0.0,
+                'banks': [{'name': row['name'], 'balance': row['balance']} for row in
+                          db.execute("SELECT * FROM banks ORDER BY pos")]
+            },
+            'cards': [{
+                'id': row['id'],
+                'name': row['name'],
+                'limit': row['credit_limit'],
+                'used': row['used'],
+                'due_date': row['due_date'],
+                'available': row['available']
+            } for row in db.execute("SELECT * FROM cards ORDER BY pos")],
+            'expenses': expenses,
+            'installments': [{
+                'description': row['description'],
+                'total_amount': row['total_amount'],
+                'installments': row['installments'],
+                'current_installment': row['current_installment'],
+                'installment_value': row['installment_value'],
+                'purchase_date': row['purchase_date'],
+                'card_name': row['card_name'],
+                'first_month': row['first_month']
+            } for row in db.execute("SELECT * FROM installments ORDER BY pos")],
+            'recurring': [{
+                'description': row['description'],
+                'amount': row['amount'],
+                'due_date': row['due_date'],
+                'start_month': row['start_month'],
+                'end_date': row['end_date'],
+                'skipped_months': json.loads(row['skipped_months'])
+            } for row in db.execute("SELECT * FROM recurring_expenses ORDER BY pos")]
+        }
+
+    def deferred_months(self) -> List[str]:
+        return sorted(self._deferred_months)
+
+    def load_month(self, month_year: str) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self.connection.execute(
+                "SELECT * FROM expenses WHERE month = ? ORDER BY pos", (month_year,))
+            return [self._expense_from_row(row) for row in rows]
+
+    def find_deferred_months(self, text: str) -> List[str]:
+        """Meses ainda no banco com uma despesa de descrição igual ao texto"""
+        with self._lock:
+            rows = self.connection.execute(
+                "SELECT DISTINCT month FROM expenses WHERE description = ? ORDER BY month", (text,))
+            return [row['month'] for row in rows if row['month'] in self._deferred_months]
+
+    def save_data(self, data: Dict[str, Any]):
+        """Regrava todas as tabelas a partir do documento completo.
+
+        Meses adiados pela carga incremental que não vieram no documento são
+        mantidos como estão no banco.
+        """
+        wallet = data.get('wallet', {})
+        cards = data.get('cards', [])
+        expenses = data.get('expenses', {})
+        with self._lock, self.connection as db:
+            deferred = self._deferred_months - set(expenses)
+            db.execute("DELETE FROM transactions")
+            self._rowids = None
+            if deferred:
+                db.execute(f"DELETE FROM expenses WHERE month NOT IN ({','.join('?' * len(deferred))})",
+                           list(deferred))
+            else:
+                db.execute("DELETE FROM expenses")
+            self._set_balance(db, wallet.get('balance', 0.0))
+            self._insert_transactions(db, 0, wallet.get('history', []))
+            self._set_banks(db, wallet.get('banks', []))
+            self._set_cards(db, cards if isinstance(cards, list) else [])
+            for month, month_expenses in expenses.items():
+                self._set_month(db, month, month_expenses)
+            self._deferred_months = deferred
+            self._set_installments(db, data.get('installments', []))
+            self._set_recurring(db, data.get('recurring', []))
+
+    def append_changes(self, changes: List[Dict[str, Any]]):
+        """Aplica as alterações registradas pelo FinanceService linha a linha"""
+        with self._lock:
+            try:
+                with self.connection as db:
+                    for change in changes:
+                        self._apply_change(db, change)
+            except BaseException:
+                # A transação foi desfeita: as posições em memória podem não valer mais
+                self._rowids = None
+                raise
+
+    def close(self):
+        with self._lock:
+            self.connection.close()
+
+    def _apply_change(self, db: sqlite3.Connection, change: Dict[str, Any]):
+        path = change['path']
+        op = change['op']
+        value = change.get('value')
+
+        if path == ['wallet', 'balance']:
+            self._set_balance(db, value)
+        elif path == ['wallet', 'banks']:
+            self._set_banks(db, value)
+        elif path == ['wallet', 'history']:
+            if op == 'append':
+                rowids = self._history_rowids(db)
+                end = db.execute("SELECT COALESCE(MAX(pos) + 1, 0) FROM transactions").fetchone()[0]
+                cursor = db.execute(
+                    "INSERT INTO transactions (pos, date, type, amount, description, bank) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (end, value['date'], value['type'], value['amount'], value['description'],
+                     value.get('bank', "Geral")))
+                rowids.append(cursor.lastrowid)
+            else:
+                db.execute("DELETE FROM transactions")
+                self._insert_transactions(db, 0, value or [])
+                self._rowids = None
+        elif path[:2] == ['wallet', 'history']:
+            # pos só ordena as linhas: remoções deixam lacunas em vez de renumerar
+            # o restante da tabela; a linha é achada pelo rowid, pela chave primária
+            rowids = self._history_rowids(db)
+            index = path[2]
+            if not 0 <= index < len(rowids):
+                raise ValueError(f"Transação inexistente: {path}")
+            if op == 'delete':
+                db.execute("DELETE FROM transactions WHERE rowid = ?", (rowids[index],))
+                del rowids[index]
+            else:
+                db.execute("UPDATE transactions SET date = ?, type = ?, amount = ?, description = ?, "
+                           "bank = ? WHERE rowid = ?",
+                           (value['date'], value['type'], value['amount'], value['description'],
+                            value.get('bank', "Geral"), rowids[index]))
+        elif path == ['cards']:
+            self._set_cards(db, value)
+        elif path[0] == 'expenses' and len(path) == 2:
+            self._set_month(db, path[1], value if op != 'delete' else [])
+        elif path == ['installments']:
+            self._set_installments(db, value)
+        elif path == ['recurring']:
+            self._set_recurring(db, value)
+        else:
+            raise ValueError(f"Alteração não suportada: {path}")
+
+    def _recent_cutoff(self) -> Optional[str]:
+        if self.recent_months is None:
+            return None
+        now = datetime.now()
+        return add_months(f"{now.year:04d}-{now.month:02d}", -self.recent_months)
+
+    def _history_rowids(self, db: sqlite3.Connection) -> array:
+        if self._rowids is None:
+            self._rowids = array('q', (row[0] for row in db.execute(
+                "SELECT rowid FROM transactions ORDER BY pos")))
+        return self._rowids
+
+    @staticmethod
+    def _set_balance(db: sqlite3.Connection, balance: float):
+        db.execute("INSERT INTO meta (key, value) VALUES ('balance', ?) "
+                   "ON CONFLICT(key) DO UPDATE SET value = excluded.value", (balance,))
+
+    @staticmethod
+    def _insert_transactions(db: sqlite3.Connection, start: int, history: List[Dict[str, Any]]):
+        db.executemany(
+            "INSERT INTO transactions (pos, date, type, amount, description, bank) VALUES (?, ?, ?, ?, ?, ?)",
+            [(start + i, t['date'], t['type'], t['amount'], t['description'], t.get('bank', "Geral"))
+             for i, t in enumerate(history)])
+
+    @staticmethod
+    def _set_banks(db: sqlite3.Connection, banks: List[Dict[str, Any]]):
+        db.executemany(
+            "INSERT INTO banks (name, balance, pos) VALUES (?, ?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET balance = excluded.balance, pos = excluded.pos",
+            [(b['name'], b.get('balance', 0.0), i) for i, b in enumerate(banks)])
+        names = [b['name'] for b in banks]
+        db.execute(f"DELETE FROM banks WHERE name NOT IN ({','.join('?' * len(names))})", names)
+
+    @staticmethod
+    def _set_cards(db: sqlite3.Connection, cards: List[Dict[str, Any]]):
+        db.executemany(
+            "INSERT INTO cards (id, name, credit_limit, used, due_date, available, pos) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT(id) DO UPDATE SET name = excluded.name, credit_limit = excluded.credit_limit, "
+            "used = excluded.used, due_date = excluded.due_date, available = excluded.available, "
+            "pos = excluded.pos",
+            [(c['id'], c['name'], c['limit'], c.get('used', 0.0), c.get('due_date', ""),
+              c.get('available', 0.0), i) for i, c in enumerate(cards)])
+        ids = [c['id'] for c in cards]
+        db.execute(f"DELETE FROM cards WHERE id NOT IN ({','.join('?' * len(ids))})", ids)
+
+    @staticmethod
+    def _set_month(db: sqlite3.Connection, month_year: str, expenses: List[Dict[str, Any]]):
+        db.execute("DELETE FROM expenses WHERE month = ?", (month_year,))
+        db.executemany(
+            "INSERT INTO expenses (month, pos, description, amount, due_date, paid, recurring, end_date) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            [(month_year, i, e['description'], e['amount'], e['due_date'], int(e.get('paid', False)),
+              int(e.get('recurring', False)), e.get('end_date')) for i, e in enumerate(expenses)])
+
+    @staticmethod
+    def _set_installments(db: sqlite3.Connection, installments: List[Dict[str, Any]]):
+        db.execute("DELETE FROM installments")
+        db.executemany(
+            "INSERT INTO installments (pos, description, total_amount, installments, current_installment, "
+            "installment_value, purchase_date, card_name, first_month) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [(i, inst['description'], inst['total_amount'], inst['installments'],
+              inst['current_installment'], inst['installment_value'], inst['purchase_date'],
+              inst['card_name'], inst.get('first_month')) for i, inst in enumerate(installments)])
+
+    @staticmethod
+    def _set_recurring(db: sqlite3.Connection, rules: List[Dict[str, Any]]):
+        db.execute("DELETE FROM recurring_expenses")
+        db.executemany(
+            "INSERT INTO recurring_expenses (pos, description, amount, due_date, start_month, end_date, "
+            "skipped_months) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [(i, r['description'], r['amount'], r['due_date'], r['start_month'], r.get('end_date'),
+              json.dumps(r.get('skipped_months') or [])) for i, r in enumerate(rules)])
+
+    @staticmethod
+    def _transaction_from_row(row: sqlite3.Row) -> Dict[str, Any]:
+        return {
+            'date': row['date'],
+            'type': row['type'],
+            'amount': row['amount'],
+            'description': row['description'],
+            'bank': row['bank']
+        }
+
+    @staticmethod
+    def _expense_from_row(row: sqlite3.Row) -> Dict[str, Any]:
+        return {
+            'description': row['description'],
+            'amount': row['amount'],
+            'due_date': row['due_date'],
+            'paid': bool(row['paid']),
+            'recurring': bool(row['recurring']),
+            'end_date': row['end_date']
+        }
@@ -1,3 +1,16 @@
-from .finance_service import FinanceService
+from .finance_service import FinanceService, migrate_repository
+from .forecast_service import ForecastService
+from .events import (EventBus, ChangeEvent, TransactionAdded, TransactionEdited, TransactionRemoved,
+                     HistoryCleared, BankBalanceChanged, CardUpdated, ExpenseMonthChanged, InstallmentAdvanced,
+                     RecurringChanged)
 
-__all__ = ['FinanceService']
\ No newline at end of file
+__all__ = ['FinanceService', 'migrate_repository', 'AnalyticsService', 'ForecastService', 'EventBus',
+           'ChangeEvent', 'TransactionAdded', 'TransactionEdited', 'TransactionRemoved', 'HistoryCleared',
+           'BankBalanceChanged', 'CardUpdated', 'ExpenseMonthChanged', 'InstallmentAdvanced', 'RecurringChanged']
+
+def __getattr__(name):
+    # O NumPy só é importado quando os relatórios são usados (a CLI não paga esse custo)
+    if name == 'AnalyticsService':
+        from .analytics_service import AnalyticsService
+        return AnalyticsService
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,305 @@
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # NumPy é opcional: só os relatórios dependem dele
+    np = None
+
+from ..models.money import Money
+from ..models.wallet import TransactionHistory
+from .events import ChangeEvent
+from .export_service import read_columnar
+
+def month_index(month_year: str) -> int:
+    """'aaaa-mm' -> meses desde 1970-01"""
+    year, month = month_year.split('-')
+    return (int(year) - 1970) * 12 + int(month) - 1
+
+def month_label(index: int) -> str:
+    return f"{1970 + index // 12:04d}-{index % 12 + 1:02d}"
+
+def _require_numpy():
+    if np is None:
+        raise ImportError("Os relatórios precisam do NumPy (pip install numpy)")
+
+def _group_sum(codes, cents, size: int):
+    """Soma por código em centavos; float64 é exato até 2^53 centavos"""
+    return np.rint(np.bincount(codes, weights=cents, minlength=size)).astype(np.int64)
+
+@dataclass
+class MonthFlow:
+    month_year: str
+    inflow: Money
+    outflow: Money
+
+    @property
+    def net(self) -> Money:
+        return self.inflow - self.outflow
+
+@dataclass
+class BankFlow:
+    bank: str
+    inflow: Money
+    outflow: Money
+
+    @property
+    def net(self) -> Money:
+        return self.inflow - self.outflow
+
+@dataclass
+class CategoryTotal:
+    category: str
+    total: Money
+    count: int
+
+@dataclass
+class YearOverYear:
+    month_year: str
+    outflow: Money
+    previous_outflow: Money
+
+    @property
+    def delta(self) -> Money:
+        return self.outflow - self.previous_outflow
+
+    @property
+    def change(self) -> Optional[float]:
+        """Variação relativa ao mesmo mês do ano anterior (None sem base)"""
+        if not self.previous_outflow:
+            return None
+        return self.delta.cents / self.previous_outflow.cents
+
+class _Categories:
+    """Códigos de categoria por descrição normalizada (não há campo de categoria)"""
+
+    def __init__(self, descriptions: Sequence[str]):
+        self.names: List[str] = []
+        codes: Dict[str, int] = {}
+        names = self.names
+
+        def code(description: str) -> int:
+            key = description.strip().casefold()
+            value = codes.get(key)
+            if value is None:
+                value = codes[key] = len(names)
+                names.append(description.strip())
+            return value
+
+        self.codes = np.fromiter(map(code, descriptions), dtype=np.int64, count=len(descriptions))
+
+class TransactionFrame:
+    """Histórico e despesas mensais em arrays NumPy, agrupados sem laços em Python.
+
+    Valores em centavos (int64), mês como índice desde 1970-01 e banco/categoria
+    como códigos. As categorias são as descrições normalizadas, calculadas só na
+    primeira consulta que precisar delas.
+    """
+
+    def __init__(self, timestamps, amounts, inflow, banks, bank_names: List[str],
+                 descriptions: Sequence[str], expenses: Optional[Dict[str, Any]] = None):
+        _require_numpy()
+        self.timestamps = timestamps
+        self.amounts = amounts
+        self.inflow = inflow
+        self.banks = banks
+        self.bank_names = bank_names
+        self.descriptions = descriptions
+        days = timestamps // 86400
+        self.months = days.astype('datetime64[D]').astype('datetime64[M]').astype(np.int64)
+        self.expenses = expenses if expenses is not None else self._empty_expenses()
+        self._categories: Optional[_Categories] = None
+        self._expense_categories: Optional[_Categories] = None
+
+    @classmethod
+    def from_history(cls, history: TransactionHistory,
+                     expenses: Optional[Dict[str, List[Any]]] = None) -> 'TransactionFrame':
+        """Copia as colunas do histórico (e, opcionalmente, as despesas por mês)"""
+        _require_numpy()
+        columns = history.columns()
+        # np.array copia pelo buffer; uma view (frombuffer) impediria o histórico de crescer
+        timestamps = np.array(columns['timestamps'], dtype=np.int64)
+        amounts = np.array(columns['amounts'], dtype=np.int64)
+        types = np.array(columns['types'], dtype=np.uint8)
+        banks = np.array(columns['banks'], dtype=np.int64)
+        inflow = types == columns['type_names'].index("Entrada")
+        return cls(timestamps, amounts, inflow, banks, columns['bank_names'], list(columns['descriptions']),
+                   cls._expense_arrays(expenses) if expenses is not None else None)
+
+    @classmethod
+    def from_columnar(cls, path: str) -> 'TransactionFrame':
+        """Carrega o histórico de um arquivo gerado por Exporter.export_columnar"""
+        _require_numpy()
+        columns = read_columnar(path)
+        names = columns['description_names']
+        types = np.array(columns['types'], dtype=np.uint8)
+        return cls(np.array(columns['timestamps'], dtype=np.int64), np.array(columns['amounts'], dtype=np.int64),
+                   types == columns['type_names'].index("Entrada"), np.array(columns['banks'], dtype=np.int64),
+                   columns['bank_names'], [names[code] for code in columns['descriptions']])
+
+    @staticmethod
+    def _empty_expenses() -> Dict[str, Any]:
+        return {'months': np.zeros(0, np.int64), 'amounts': np.zeros(0, np.int64),
+                'paid': np.zeros(0, bool), 'descriptions': []}
+
+    @staticmethod
+    def _expense_arrays(expenses: Dict[str, List[Any]]) -> Dict[str, Any]:
+        months, amounts, paid, descriptions = [], [], [], []
+        for month_year, items in expenses.items():
+            index = month_index(month_year)
+            for expense in items:
+                months.append(index)
+                amounts.append(expense.amount.cents)
+                paid.append(expense.paid)
+                descriptions.append(expense.description)
+        return {'months': np.array(months, dtype=np.int64), 'amounts': np.array(amounts, dtype=np.int64),
+                'paid': np.array(paid, dtype=bool), 'descriptions': descriptions}
+
+    def _period_mask(self, months, start_month: Optional[str], end_month: Optional[str]):
+        mask = np.ones(len(months), dtype=bool)
+        if start_month is not None:
+            mask &= months >= month_index(start_month)
+        if end_month is not None:
+            mask &= months <= month_index(end_month)
+        return mask
+
+    def _month_range(self, months, start_month: Optional[str], end_month: Optional[str]) -> Tuple[int, int]:
+        """Intervalo contínuo de meses [first, last] coberto pelo filtro"""
+        first = month_index(start_month) if start_month is not None else (int(months.min()) if len(months) else 0)
+        last = month_index(end_month) if end_month is not None else (int(months.max()) if len(months) else first - 1)
+        return first, last
+
+    def monthly_series(self, start_month: Optional[str] = None,
+                       end_month: Optional[str] = None) -> Tuple[int, Any, Any]:
+        """Entradas e saídas por mês (centavos), sem buracos; retorna (primeiro mês, entradas, saídas)"""
+        first, last = self._month_range(self.months, start_month, end_month)
+        size = max(last - first + 1, 0)
+        mask = self._period_mask(self.months, start_month, end_month)
+        offsets = self.months[mask] - first
+        inflow = self.inflow[mask]
+        amounts = self.amounts[mask]
+        incoming = _group_sum(offsets[inflow], amounts[inflow], size)
+        outgoing = _group_sum(offsets[~inflow], amounts[~inflow], size)
+        return first, incoming, outgoing
+
+    def monthly_cash_flow(self, start_month: Optional[str] = None, end_month: Optional[str] = None) -> List[MonthFlow]:
+        first, incoming, outgoing = self.monthly_series(start_month, end_month)
+        return [MonthFlow(month_label(first + i), Money(int(inflow)), Money(int(outflow)))
+                for i, (inflow, outflow) in enumerate(zip(incoming.tolist(), outgoing.tolist()))]
+
+    def bank_flows(self, start_month: Optional[str] = None, end_month: Optional[str] = None) -> List[BankFlow]:
+        mask = self._period_mask(self.months, start_month, end_month)
+        banks = self.banks[mask]
+        inflow = self.inflow[mask]
+        amounts = self.amounts[mask]
+        size = len(self.bank_names)
+        incoming = _group_sum(banks[inflow], amounts[inflow], size).tolist()
+        outgoing = _group_sum(banks[~inflow], amounts[~inflow], size).tolist()
+        counts = np.bincount(banks, minlength=size).tolist()
+        return [BankFlow(name, Money(incoming[code]), Money(outgoing[code]))
+                for code, name in enumerate(self.bank_names) if counts[code]]
+
+    def category_breakdown(self, start_month: Optional[str] = None, end_month: Optional[str] = None,
+                           source: str = 'transactions', top: Optional[int] = None) -> List[CategoryTotal]:
+        """Total por categoria, do maior para o menor.
+
+        source='transactions' soma as saídas da carteira; source='expenses' soma
+        as despesas mensais (pagas ou não).
+        """
+        if source == 'transactions':
+            if self._categories is None:
+                self._categories = _Categories(self.descriptions)
+            categories = self._categories
+            mask = self._period_mask(self.months, start_month, end_month) & ~self.inflow
+            amounts = self.amounts[mask]
+        elif source == 'expenses':
+            if self._expense_categories is None:
+                self._expense_categories = _Categories(self.expenses['descriptions'])
+            categories = self._expense_categories
+            mask = self._period_mask(self.expenses['months'], start_month, end_month)
+            amounts = self.expenses['amounts'][mask]
+        else:
+            raise ValueError(f"Origem inválida: {source}")
+
+        codes = categories.codes[mask]
+        size = len(categories.names)
+        totals = _group_sum(codes, amounts, size)
+        counts = np.bincount(codes, minlength=size)
+        order = np.argsort(-totals, kind='stable')
+        order = order[counts[order] > 0]
+        if top is not None:
+            order = order[:top]
+        return [CategoryTotal(categories.names[code], Money(int(totals[code])), int(counts[code]))
+                for code in order.tolist()]
+
+    def rolling_average(self, window: int = 3, start_month: Optional[str] = None,
+                        end_month: Optional[str] = None, field: str = 'net') -> List[Tuple[str, Money]]:
+        """Média móvel de 'net', 'inflow' ou 'outflow' a partir do mês em que a janela fica completa"""
+        first, incoming, outgoing = self.monthly_series(start_month, end_month)
+        series = {'net': incoming - outgoing, 'inflow': incoming, 'outflow': outgoing}.get(field)
+        if series is None:
+            raise ValueError(f"Campo inválido: {field}")
+        if window < 1 or len(series) < window:
+            return []
+        cumulative = np.concatenate(([0], np.cumsum(series)))
+        sums = cumulative[window:] - cumulative[:-window]
+        averages = np.rint(sums / window).astype(np.int64).tolist()
+        return [(month_label(first + window - 1 + i), Money(value)) for i, value in enumerate(averages)]
+
+    def year_over_year(self, start_month: Optional[str] = None, end_month: Optional[str] = None) -> List[YearOverYear]:
+        """Saídas de cada mês comparadas ao mesmo mês do ano anterior"""
+        first, last = self._month_range(self.months, start_month, end_month)
+        # A série começa 12 meses antes para ter a base do primeiro mês pedido
+        _, _, outgoing = self.monthly_series(month_label(first - 12), month_label(last))
+        current, previous = outgoing[12:].tolist(), outgoing[:-12].tolist()
+        return [YearOverYear(month_label(first + i), Money(value), Money(base))
+                for i, (value, base) in enumerate(zip(current, previous))]
+
+class AnalyticsService:
+    """Relatórios de gastos sobre os dados do FinanceService.
+
+    Os arrays são montados na primeira consulta e descartados a cada evento de
+    alteração publicado pelo serviço.
+    """
+
+    def __init__(self, finance_service):
+        _require_numpy()
+        self.finance_service = finance_service
+        self._frame: Optional[TransactionFrame] = None
+        self._frame_history: Optional[TransactionHistory] = None
+        self._unsubscribe = finance_service.subscribe(self._invalidate, ChangeEvent)
+
+    def _invalidate(self, event: ChangeEvent):
+        self._frame = None
+
+    def close(self):
+        self._unsubscribe()
+
+    @property
+    def frame(self) -> TransactionFrame:
+        history = self.finance_service.get_transaction_history()
+        # Um batch() desfeito troca o histórico sem publicar eventos
+        if self._frame is None or self._frame_history is not history:
+            # Leitura sem efeitos: não cria as cópias recorrentes nem carrega os meses do disco
+            service = self.finance_service
+            expenses = {month: service.get_planned_expenses(month) for month in service.get_planned_months()}
+            self._frame = TransactionFrame.from_history(history, expenses)
+            self._frame_history = history
+        return self._frame
+
+    def monthly_cash_flow(self, start_month: Optional[str] = None, end_month: Optional[str] = None) -> List[MonthFlow]:
+        return self.frame.monthly_cash_flow(start_month, end_month)
+
+    def bank_flows(self, start_month: Optional[str] = None, end_month: Optional[str] = None) -> List[BankFlow]:
+        return self.frame.bank_flows(start_month, end_month)
+
+    def category_breakdown(self, start_month: Optional[str] = None, end_month: Optional[str] = None,
+                           source: str = 'transactions', top: Optional[int] = None) -> List[CategoryTotal]:
+        return self.frame.category_breakdown(start_month, end_month, source, top)
+
+    def rolling_average(self, window: int = 3, start_month: Optional[str] = None,
+                        end_month: Optional[str] = None, field: str = 'net') -> List[Tuple[str, Money]]:
+        return self.frame.rolling_average(window, start_month, end_month, field)
+
+    def year_over_year(self, start_month: Optional[str] = None, end_month: Optional[str] = None) -> List[YearOverYear]:
+        return self.frame.year_over_year(start_month, end_month)
@@ -0,0 +1,76 @@
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Type
+from ..models.wallet import Transaction
+
+@dataclass(frozen=True)
+class ChangeEvent:
+    """Base dos eventos publicados pelo FinanceService após cada alteração"""
+
+@dataclass(frozen=True)
+class TransactionAdded(ChangeEvent):
+    index: int
+    transaction: Transaction
+
+@dataclass(frozen=True)
+class TransactionEdited(ChangeEvent):
+    index: int
+    transaction: Transaction
+
+@dataclass(frozen=True)
+class TransactionRemoved(ChangeEvent):
+    index: int
+
+@dataclass(frozen=True)
+class HistoryCleared(ChangeEvent):
+    pass
+
+@dataclass(frozen=True)
+class BankBalanceChanged(ChangeEvent):
+    """Saldo total ou de bancos mudou (inclui criação e exclusão de bancos)"""
+
+@dataclass(frozen=True)
+class CardUpdated(ChangeEvent):
+    card_name: Optional[str] = None  # None: a lista de cartões mudou
+
+@dataclass(frozen=True)
+class ExpenseMonthChanged(ChangeEvent):
+    month_year: str
+
+@dataclass(frozen=True)
+class RecurringChanged(ChangeEvent):
+    """Regras de despesas recorrentes mudaram (afeta meses ainda não abertos)"""
+
+@dataclass(frozen=True)
+class InstallmentAdvanced(ChangeEvent):
+    description: str
+    card_name: str
+    current_installment: int
+    installments: int
+
+Subscriber = Callable[[ChangeEvent], None]
+
+class EventBus:
+    """Observadores simples por tipo de evento (ChangeEvent recebe todos)"""
+
+    def __init__(self):
+        self._subscribers: Dict[Type[ChangeEvent], List[Subscriber]] = {}
+
+    def subscribe(self, callback: Subscriber, *event_types: Type[ChangeEvent]) -> Callable[[], None]:
+        """Registra o callback; retorna uma função que cancela a inscrição"""
+        event_types = event_types or (ChangeEvent,)
+        for event_type in event_types:
+            self._subscribers.setdefault(event_type, []).append(callback)
+
+        def unsubscribe():
+            for event_type in event_types:
+                callbacks = self._subscribers.get(event_type, [])
+                if callback in callbacks:
+                    callbacks.remove(callback)
+        return unsubscribe
+
+    def publish(self, event: ChangeEvent):
+        for event_type in type(event).__mro__:
+            for callback in list(self._subscribers.get(event_type, ())):
+                callback(event)
+            if event_type is ChangeEvent:
+                break
@@ -0,0 +1,147 @@
+import csv
+import json
+import os
+import struct
+import sys
+from array import array
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Tuple
+
+from ..models.wallet import TransactionHistory, format_iso_timestamp
+
+# Formato colunar do histórico: cabeçalho + seções (nome de 4 bytes, tamanho, dados).
+# Números em little-endian; dicionários como lista JSON em UTF-8.
+COLUMNAR_MAGIC = b'FMCOL\x01'
+_HEADER = struct.Struct('<Q')   # Número de linhas
+_SECTION = struct.Struct('<4sQ')  # Nome e tamanho em bytes
+
+def iter_history_rows(history: TransactionHistory) -> Iterator[List[Any]]:
+    """Linhas do histórico para CSV, lidas direto das colunas"""
+    columns = history.columns()
+    types, banks = columns['type_names'], columns['bank_names']
+    for timestamp, kind, cents, description, bank in zip(columns['timestamps'], columns['types'],
+                                                         columns['amounts'], columns['descriptions'],
+                                                         columns['banks']):
+        yield [format_iso_timestamp(timestamp), types[kind], f"{cents / 100:.2f}", description, banks[bank]]
+
+def _write_section(f: BinaryIO, name: bytes, data: bytes):
+    f.write(_SECTION.pack(name, len(data)))
+    f.write(data)
+
+def _write_array(f: BinaryIO, name: bytes, values: array):
+    if sys.byteorder == 'big':
+        values = array(values.typecode, values)
+        values.byteswap()
+    _write_section(f, name, values.tobytes())
+
+def _encode(values: Iterable[str]) -> Tuple[array, List[str]]:
+    """Codifica por dicionário: (códigos uint32, valores distintos na ordem de aparição)"""
+    codes: Dict[str, int] = {}
+    encoded = array('I', (codes.setdefault(value, len(codes)) for value in values))
+    return encoded, list(codes)
+
+def read_columnar(path: str) -> Dict[str, Any]:
+    """Lê um arquivo colunar: arrays 'timestamps' e 'amounts' (int64, centavos),
+    'types'/'banks'/'descriptions' (códigos) e as listas '*_names' de cada dicionário."""
+    typecodes = {b'TIME': 'q', b'AMNT': 'q', b'TYPE': 'B', b'BANK': 'I', b'DESC': 'I'}
+    names = {b'TIME': 'timestamps', b'AMNT': 'amounts', b'TYPE': 'types', b'BANK': 'banks', b'DESC': 'descriptions',
+             b'TYPD': 'type_names', b'BNKD': 'bank_names', b'DSCD': 'description_names'}
+    result: Dict[str, Any] = {}
+    with open(path, 'rb') as f:
+        if f.read(len(COLUMNAR_MAGIC)) != COLUMNAR_MAGIC:
+            raise ValueError(f"{path} não é um arquivo colunar do gerenciador financeiro")
+        rows, = _HEADER.unpack(f.read(_HEADER.size))
+        while True:
+            header = f.read(_SECTION.size)
+            if not header:
+                break
+            name, size = _SECTION.unpack(header)
+            data = f.read(size)
+            if name in typecodes:
+                values = array(typecodes[name])
+                values.frombytes(data)
+                if sys.byteorder == 'big':
+                    values.byteswap()
+                if len(values) != rows:
+                    raise ValueError(f"Coluna {name.decode()} com {len(values)} linhas, esperado {rows}")
+                result[names[name]] = values
+            elif name in names:
+                result[names[name]] = json.loads(data.decode('utf-8'))
+    return result
+
+class Exporter:
+    """Exporta os dados do FinanceService sem montar tudo em memória.
+
+    CSV: cada arquivo é escrito a partir de geradores, linha a linha. O
+    histórico exportado usa as mesmas colunas aceitas pela importação de
+    extratos. Colunar: o histórico em arrays de largura fixa (datas e
+    centavos em int64) com banco e descrição codificados por dicionário,
+    para recarga rápida na análise (TransactionFrame.from_columnar).
+    """
+
+    CSV_FILES = ('historico.csv', 'despesas.csv', 'cartoes.csv', 'parcelas.csv')
+
+    def __init__(self, finance_service):
+        self.finance_service = finance_service
+
+    def export_csv(self, directory: str) -> List[str]:
+        """Grava os quatro CSVs na pasta; retorna os caminhos"""
+        os.makedirs(directory, exist_ok=True)
+        paths = [os.path.join(directory, name) for name in self.CSV_FILES]
+        self.export_history_csv(paths[0])
+        self.export_expenses_csv(paths[1])
+        self.export_cards_csv(paths[2])
+        self.export_installments_csv(paths[3])
+        return paths
+
+    @staticmethod
+    def _write_csv(path: str, header: List[str], rows: Iterator[List[Any]]):
+        tmp_file = path + ".tmp"
+        with open(tmp_file, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(header)
+            writer.writerows(rows)
+        os.replace(tmp_file, path)
+
+    def export_history_csv(self, path: str):
+        self._write_csv(path, ["data", "tipo", "valor", "descricao", "banco"],
+                        iter_history_rows(self.finance_service.get_transaction_history()))
+
+    def export_expenses_csv(self, path: str):
+        rows = ([month_year, expense.description, f"{expense.amount}", expense.due_date,
+                 int(expense.paid), int(expense.recurring), expense.end_date or ""]
+                for month_year, expense in self.finance_service.iter_expenses())
+        self._write_csv(path, ["mes", "descricao", "valor", "vencimento", "paga", "recorrente", "ate"], rows)
+
+    def export_cards_csv(self, path: str):
+        rows = ([card.id, card.name, f"{card.limit}", f"{card.used}", f"{card.available}", card.due_date]
+                for card in self.finance_service.get_cards())
+        self._write_csv(path, ["id", "nome", "limite", "usado", "disponivel", "vencimento"], rows)
+
+    def export_installments_csv(self, path: str):
+        """Uma linha por parcela (tabela completa de cada compra)"""
+        rows = ([installment.card_name, installment.description, installment.purchase_date, month_year,
+                 number, installment.installments, f"{value}", int(number <= installment.current_installment)]
+                for installment in self.finance_service.installments
+                for month_year, number, value in installment.schedule())
+        self._write_csv(path, ["cartao", "descricao", "data_compra", "mes", "parcela", "parcelas", "valor",
+                               "lancada"], rows)
+
+    def export_columnar(self, path: str):
+        history = self.finance_service.get_transaction_history()
+        columns = history.columns()
+        # Banco e tipo já são códigos de dicionário no histórico; só a descrição precisa ser codificada
+        descriptions, description_names = _encode(columns['descriptions'])
+
+        tmp_file = path + ".tmp"
+        with open(tmp_file, 'wb') as f:
+            f.write(COLUMNAR_MAGIC)
+            f.write(_HEADER.pack(len(history)))
+            _write_array(f, b'TIME', columns['timestamps'])
+            _write_array(f, b'AMNT', columns['amounts'])
+            _write_array(f, b'TYPE', columns['types'])
+            _write_section(f, b'TYPD', json.dumps(columns['type_names'], ensure_ascii=False).encode('utf-8'))
+            _write_array(f, b'BANK', columns['banks'])
+            _write_section(f, b'BNKD', json.dumps(columns['bank_names'], ensure_ascii=False).encode('utf-8'))
+            _write_array(f, b'DESC', descriptions)
+            _write_section(f, b'DSCD', json.dumps(description_names, ensure_ascii=False).encode('utf-8'))
+        os.replace(tmp_file, path)
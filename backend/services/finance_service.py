@@ -1,28 +1,62 @@
+import copy
+from contextlib import contextmanager
 from datetime import datetime, timedelta
-from typing import List, Dict, Any
-from tkinter import messagebox
-from ..models.wallet import Wallet, Transaction, Bank
-from ..models.cards import CreditCard, Installment
-from ..models.expenses import MonthlyExpense
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Sequence, Set, Tuple
+from ..models.wallet import Wallet, Transaction, TransactionHistory, Bank, format_iso_timestamp, to_timestamp
+from ..models.cards import CreditCard, Installment, InstallmentSchedule, card_id
+from ..models.expenses import MonthlyExpense, MonthSummary, RecurringExpense
+from ..models.money import Money
 from ..repositories.json_repository import JSONRepository
+from .persistence import PersistenceWorker
+from .events import (EventBus, ChangeEvent, TransactionAdded, TransactionEdited, TransactionRemoved,
+                     HistoryCleared, BankBalanceChanged, CardUpdated, ExpenseMonthChanged, InstallmentAdvanced,
+                     RecurringChanged)
 
 class FinanceService:
-    def __init__(self):
-        self.repository = JSONRepository()
+    def __init__(self, repository=None, background_save: bool = False):
+        self.repository = repository if repository is not None else JSONRepository()
+        # Com background_save as gravações saem da thread que chamou (ex.: mainloop do Tk)
+        self._writer = PersistenceWorker(self.repository) if background_save else None
         self.installments: List[Installment] = []
+        self.installment_schedule = InstallmentSchedule()
+        self._cards_by_id: Dict[str, CreditCard] = {}
+        self._cards_by_name: Dict[str, CreditCard] = {}
+        self._changes: List[Dict[str, Any]] = []
+        self._batch_depth = 0
+        self._batch_pending = False
+        self._full_save = False
+        self.events = EventBus()
+        self._pending_events: List[ChangeEvent] = []
+        self._month_summaries: Dict[str, MonthSummary] = {}
+        self._expense_index: Dict[str, Dict[str, MonthlyExpense]] = {}
+        self._invoice_months: Dict[str, Set[str]] = {}
+        self._recurring_index: Dict[str, List[RecurringExpense]] = {}
+        self._materialized: Set[str] = set()
+        self._deferred_months: Set[str] = set()
         self._load_data()
     
     def _load_data(self):
-        data = self.repository.load_data()
+        history = TransactionHistory()
+        if getattr(self.repository, 'streaming', False):
+            # O histórico chega em blocos e os meses antigos de despesas ficam no disco
+            streamed = TransactionHistory()
+            data = self.repository.load_data_streaming(streamed.extend_dicts)
+            self._deferred_months = set(self.repository.deferred_months())
+            # Com wallet.history no retorno (arquivo corrompido) os blocos lidos não valem
+            if 'history' not in data.get('wallet', {}):
+                history = streamed
+        else:
+            data = self.repository.load_data()
         
         # Load wallet
         wallet_data = data.get('wallet', {})
+        history.extend_dicts(wallet_data.get('history', []))
         banks_data = wallet_data.get('banks', [])
         banks = [Bank(**b) for b in banks_data] if banks_data else [Bank(name="Geral")]
         
         self.wallet = Wallet(
             balance=wallet_data.get('balance', 0.0),
-            history=[Transaction(**t) for t in wallet_data.get('history', [])],
+            history=history,
             banks=banks
         )
         
@@ -33,11 +67,10 @@ class FinanceService:
         if isinstance(cards_data, list):
             for card_data in cards_data:
                 if isinstance(card_data, dict):
-                    if 'id' not in card_data:
-                        card_data['id'] = f"{card_data['name']}_{datetime.now().timestamp()}"
                     self.cards.append(CreditCard(**card_data))
         elif isinstance(cards_data, dict):
             self._migrate_old_cards_format(cards_data)
+        self._rebuild_card_index()
         
         # Load expenses
         self.expenses: Dict[str, List[MonthlyExpense]] = {}
@@ -48,6 +81,12 @@ class FinanceService:
         
         # Load installments
         self.installments = [Installment(**i) for i in data.get('installments', [])]
+        self.installment_schedule = InstallmentSchedule(self.installments)
+        
+        # Load recurring expense rules
+        self.recurring = [RecurringExpense(**r) for r in data.get('recurring', [])]
+        
+        self._rebuild_expense_indexes()
     
     def _migrate_old_cards_format(self, old_cards_data: Dict[str, List[Dict]]):
         """Migra do formato antigo (cartões por mês) para o novo (cartões fixos)"""
@@ -62,68 +101,241 @@ class FinanceService:
                             all_cards[card_name] = card_data
         
         for card_data in all_cards.values():
-            if 'id' not in card_data:
-                card_data['id'] = f"{card_data['name']}_{datetime.now().timestamp()}"
             if 'available' not in card_data:
                 card_data['available'] = card_data.get('limit', 0) - card_data.get('used', 0)
             self.cards.append(CreditCard(**card_data))
     
     def save_data(self):
-        data = {
+        """Persiste as alterações registradas; sem registros, grava o estado completo"""
+        if self._batch_depth:
+            self._batch_pending = True
+            return
+        
+        changes, self._changes = self._changes, []
+        full_save, self._full_save = self._full_save, False
+        incremental = bool(changes) and not full_save and hasattr(self.repository, 'append_changes')
+        if self._writer is None:
+            if incremental:
+                self.repository.append_changes(changes)
+            else:
+                self.repository.save_data(self._to_dict())
+        elif incremental and not self._writer.needs_snapshot:
+            self._writer.save_changes(changes)
+        else:
+            # Depois de uma falha o journal pode estar incompleto: grava tudo
+            self._writer.save_snapshot(self._snapshot())
+    
+    def compact(self):
+        """Grava o estado completo em vez das alterações; num repositório com
+        journal, o snapshot novo o substitui. Dentro de batch() fica para o fim do bloco."""
+        self._full_save = True
+        self.save_data()
+    
+    def flush(self):
+        """Espera as gravações em segundo plano e força a sincronização com o disco"""
+        if self._writer is not None:
+            self._writer.flush()
+        if hasattr(self.repository, 'flush'):
+            self.repository.flush()
+    
+    def pop_save_errors(self) -> List[Exception]:
+        return self._writer.pop_errors() if self._writer is not None else []
+    
+    @contextmanager
+    def batch(self):
+        """Adia as gravações até o fim do bloco e persiste uma única vez.
+        
+        Se uma exceção escapar do bloco, carteira, cartões, despesas e parcelas
+        voltam ao estado anterior e nada é gravado.
+        """
+        if self._batch_depth:
+            self._batch_depth += 1
+            try:
+                yield self
+            finally:
+                self._batch_depth -= 1
+            return
+        
+        snapshot = copy.deepcopy((self.wallet, self.cards, self.expenses, self.installments,
+                                  self.recurring, self._materialized, self._deferred_months))
+        pending_changes = len(self._changes)
+        full_save = self._full_save
+        self._batch_depth = 1
+        try:
+            yield self
+        except BaseException:
+            (self.wallet, self.cards, self.expenses, self.installments,
+             self.recurring, self._materialized, self._deferred_months) = snapshot
+            del self._changes[pending_changes:]
+            self._full_save = full_save
+            self._batch_pending = False
+            self._pending_events = []
+            self._rebuild_expense_indexes()
+            self._rebuild_card_index()
+            self.installment_schedule = InstallmentSchedule(self.installments)
+            raise
+        finally:
+            self._batch_depth = 0
+        
+        if self._batch_pending:
+            self._batch_pending = False
+            self.save_data()
+        events, self._pending_events = self._pending_events, []
+        for event in events:
+            self.events.publish(event)
+    
+    @property
+    def in_batch(self) -> bool:
+        """True dentro de batch(), enquanto os eventos de alteração estão retidos"""
+        return self._batch_depth > 0
+    
+    def subscribe(self, callback, *event_types):
+        """Inscreve um observador de alterações; sem tipos, recebe todos os eventos"""
+        return self.events.subscribe(callback, *event_types)
+    
+    def _publish(self, event: ChangeEvent):
+        # Dentro de batch() os eventos só saem se o bloco terminar sem erro
+        if self._batch_depth:
+            self._pending_events.append(event)
+        else:
+            self.events.publish(event)
+    
+    def _snapshot(self):
+        """Congela o estado e devolve a função que monta o documento completo.
+        
+        O histórico, a única parte proporcional ao número de transações, só é
+        copiado aqui (colunas em bloco); a conversão para dicionários fica para
+        quem chamar a função, na thread de gravação.
+        """
+        history = self.wallet.history.copy()
+        data = self._to_dict(include_history=False)
+        
+        def build() -> Dict[str, Any]:
+            data['wallet']['history'] = history.to_dicts()
+            return data
+        return build
+    
+    def _to_dict(self, include_history: bool = True) -> Dict[str, Any]:
+        return {
             'wallet': {
-                'balance': self.wallet.balance,
-                'history': [{
-                    'date': t.date,
-                    'type': t.type,
-                    'amount': t.amount,
-                    'description': t.description,
-                    'bank': t.bank
-                } for t in self.wallet.history],
-                'banks': [{
-                    'name': b.name,
-                    'balance': b.balance
-                } for b in self.wallet.banks]
-            },
-            'cards': [{
-                'id': c.id,
-                'name': c.name,
-                'limit': c.limit,
-                'used': c.used,
-                'due_date': c.due_date,
-                'available': c.available
-            } for c in self.cards],
-            'expenses': {
-                month: [{
-                    'description': e.description,
-                    'amount': e.amount,
-                    'due_date': e.due_date,
-                    'paid': e.paid,
-                    'recurring': e.recurring,
-                    'end_date': e.end_date
-                } for e in expenses]
-                for month, expenses in self.expenses.items()
+                'balance': float(self.wallet.balance),
+                'history': self.wallet.history.to_dicts() if include_history else None,
+                'banks': self._banks_to_list()
             },
-            'installments': [{
-                'description': i.description,
-                'total_amount': i.total_amount,
-                'installments': i.installments,
-                'current_installment': i.current_installment,
-                'installment_value': i.installment_value,
-                'purchase_date': i.purchase_date,
-                'card_name': i.card_name
-            } for i in self.installments]
+            'cards': self._cards_to_list(),
+            'expenses': {month: self._month_to_list(month) for month in self.expenses},
+            'installments': self._installments_to_list(),
+            'recurring': self._recurring_to_list()
+        }
+    
+    @staticmethod
+    def _transaction_to_dict(t: Transaction) -> Dict[str, Any]:
+        return {
+            'date': format_iso_timestamp(t.timestamp),
+            'type': t.type,
+            'amount': float(t.amount),
+            'description': t.description,
+            'bank': t.bank
         }
-        self.repository.save_data(data)
+    
+    def _banks_to_list(self) -> List[Dict[str, Any]]:
+        return [{
+            'name': b.name,
+            'balance': float(b.balance)
+        } for b in self.wallet.banks]
+    
+    def _cards_to_list(self) -> List[Dict[str, Any]]:
+        return [{
+            'id': c.id,
+            'name': c.name,
+            'limit': float(c.limit),
+            'used': float(c.used),
+            'due_date': c.due_date,
+            'available': float(c.available)
+        } for c in self.cards]
+    
+    def _month_to_list(self, month_year: str) -> List[Dict[str, Any]]:
+        return [{
+            'description': e.description,
+            'amount': float(e.amount),
+            'due_date': e.due_date,
+            'paid': e.paid,
+            'recurring': e.recurring,
+            'end_date': e.end_date
+        } for e in self.expenses.get(month_year, []) if not self._is_recurring_copy(month_year, e)]
+    
+    def _installments_to_list(self) -> List[Dict[str, Any]]:
+        return [{
+            'description': i.description,
+            'total_amount': float(i.total_amount),
+            'installments': i.installments,
+            'current_installment': i.current_installment,
+            'installment_value': float(i.installment_value),
+            'purchase_date': i.purchase_date,
+            'card_name': i.card_name,
+            'first_month': i.first_month
+        } for i in self.installments]
+    
+    def _recurring_to_list(self) -> List[Dict[str, Any]]:
+        return [{
+            'description': r.description,
+            'amount': float(r.amount),
+            'due_date': r.due_date,
+            'start_month': r.start_month,
+            'end_date': r.end_date,
+            'skipped_months': list(r.skipped_months)
+        } for r in self.recurring]
+    
+    # Registro de alterações (usado por repositórios com journal)
+    def _record(self, op: str, path: List[Any], value: Any = None):
+        change = {'op': op, 'path': path}
+        if op != 'delete':
+            change['value'] = value
+        self._changes.append(change)
+    
+    def _record_wallet_totals(self):
+        self._record('set', ['wallet', 'balance'], float(self.wallet.balance))
+        self._record_banks()
+    
+    def _record_banks(self):
+        self._record('set', ['wallet', 'banks'], self._banks_to_list())
+        self._publish(BankBalanceChanged())
+    
+    def _record_transaction_added(self, transaction: Transaction):
+        self._record('append', ['wallet', 'history'], self._transaction_to_dict(transaction))
+        self._publish(TransactionAdded(len(self.wallet.history) - 1, transaction))
+        self._record_wallet_totals()
+    
+    def _record_transaction_edited(self, index: int):
+        transaction = self.wallet.history[index]
+        self._record('set', ['wallet', 'history', index], self._transaction_to_dict(transaction))
+        self._publish(TransactionEdited(index, transaction))
+    
+    def _record_cards(self, card_name: Optional[str] = None):
+        self._record('set', ['cards'], self._cards_to_list())
+        self._publish(CardUpdated(card_name))
+    
+    def _record_month(self, month_year: str):
+        self._record('set', ['expenses', month_year], self._month_to_list(month_year))
+        self._publish(ExpenseMonthChanged(month_year))
+    
+    def _record_installments(self):
+        self._record('set', ['installments'], self._installments_to_list())
+    
+    def _record_recurring(self):
+        self._record('set', ['recurring'], self._recurring_to_list())
+        self._publish(RecurringChanged())
 
     # Wallet operations
-    def get_balance(self) -> float:
+    def get_balance(self) -> Money:
         return self.wallet.balance
     
     def add_income(self, amount: float, description: str, bank: str = "Geral") -> bool:
+        amount = Money.of(amount)
         if amount <= 0:
             return False
         
-        if bank != "Geral" and not any(b.name == bank for b in self.wallet.banks):
+        if bank != "Geral" and self.wallet.get_bank(bank) is None:
             self.add_bank(bank)
         
         transaction = Transaction(
@@ -134,10 +346,12 @@ class FinanceService:
             bank=bank
         )
         self.wallet.add_transaction(transaction)
+        self._record_transaction_added(transaction)
         self.save_data()
         return True
     
     def add_expense(self, amount: float, description: str) -> bool:
+        amount = Money.of(amount)
         if amount <= 0 or amount > self.wallet.balance:
             return False
         
@@ -149,85 +363,199 @@ class FinanceService:
             bank="Geral"
         )
         self.wallet.add_transaction(transaction)
+        self._record_transaction_added(transaction)
         self.save_data()
         return True
     
-    def get_transaction_history(self) -> List[Transaction]:
+    def add_transactions(self, transactions: Iterable[Transaction]) -> int:
+        """Acrescenta transações em lote (importação), sem checar saldo.
+        
+        Bancos desconhecidos são criados; saldos e bancos são registrados uma
+        única vez no fim. Retorna quantas transações foram incluídas.
+        """
+        count = 0
+        for transaction in transactions:
+            if transaction.bank != "Geral" and self.wallet.get_bank(transaction.bank) is None:
+                self.wallet.add_bank(transaction.bank)
+            self.wallet.add_transaction(transaction)
+            self._record('append', ['wallet', 'history'], self._transaction_to_dict(transaction))
+            self._publish(TransactionAdded(len(self.wallet.history) - 1, transaction))
+            count += 1
+        
+        if count:
+            self._record_wallet_totals()
+            self.save_data()
+        return count
+    
+    def get_transaction_history(self) -> TransactionHistory:
         return self.wallet.history
     
+    def get_transactions_between(self, start: datetime, end: datetime) -> List[Transaction]:
+        return self.wallet.history_between(start, end)
+    
+    def get_transactions_for_month(self, month_year: str) -> List[Transaction]:
+        return self.wallet.history_for_month(month_year)
+    
+    def query_history(self, start: Optional[datetime] = None, end: Optional[datetime] = None,
+                      transaction_type: Optional[str] = None, bank: Optional[str] = None,
+                      text: Optional[str] = None, sort_by: str = 'date', descending: bool = True) -> Sequence[int]:
+        """Índices do histórico filtrados e ordenados, para exibição paginada"""
+        history = self.wallet.history
+        indices = history.select(
+            to_timestamp(start) if start is not None else None,
+            to_timestamp(end) if end is not None else None,
+            transaction_type, bank, text
+        )
+        return history.sort_indices(indices, sort_by, descending)
+    
+    def get_transactions(self, indices: Iterable[int]) -> List[Transaction]:
+        history = self.wallet.history
+        return [history[i] for i in indices]
+    
     def edit_transaction(self, transaction_index: int, new_amount: float, 
                         new_description: str, new_bank: str) -> bool:
         if 0 <= transaction_index < len(self.wallet.history):
-            self.wallet.edit_transaction(transaction_index, new_amount, new_description, new_bank)
+            self.wallet.edit_transaction(transaction_index, Money.of(new_amount), new_description, new_bank)
+            self._record_transaction_edited(transaction_index)
+            self._record_wallet_totals()
+            self.save_data()
+            return True
+        return False
+    
+    def delete_transaction(self, transaction_index: int) -> bool:
+        if self.wallet.delete_transaction(transaction_index):
+            self._record('delete', ['wallet', 'history', transaction_index])
+            self._publish(TransactionRemoved(transaction_index))
+            self._record_wallet_totals()
             self.save_data()
             return True
         return False
     
+    def recompute_balances(self) -> bool:
+        """Reconcilia os saldos com o histórico; retorna True se já estavam corretos"""
+        consistent = self.wallet.recompute_balances()
+        if not consistent:
+            self._record_wallet_totals()
+            self.save_data()
+        return consistent
+    
     def reset_wallet(self):
-        self.wallet.balance = 0.0
-        self.wallet.history = []
+        self.wallet.balance = Money(0)
+        self.wallet.history.clear()
         for bank in self.wallet.banks:
-            bank.balance = 0.0
+            bank.balance = Money(0)
+        self._record('set', ['wallet', 'history'], [])
+        self._publish(HistoryCleared())
+        self._record_wallet_totals()
         self.save_data()
         return True
 
     # Banks operations
     def add_bank(self, bank_name: str) -> bool:
         self.wallet.add_bank(bank_name)
+        self._record_banks()
+        self.save_data()
+        return True
+    
+    def delete_bank(self, bank_name: str) -> bool:
+        if bank_name == "Geral" or self.wallet.get_bank(bank_name) is None:
+            return False
+        for index in self.wallet.remove_bank(bank_name):
+            self._record_transaction_edited(index)
+        self._record_banks()
+        self.save_data()
+        return True
+    
+    def set_bank_balance(self, bank_name: str, new_balance: float) -> bool:
+        bank = self.wallet.get_bank(bank_name)
+        if bank is None:
+            return False
+        bank.balance = Money.of(new_balance)
+        self.wallet.balance = sum((b.balance for b in self.wallet.banks), Money(0))
+        self._record_wallet_totals()
         self.save_data()
         return True
     
     def get_banks(self) -> List[Bank]:
         return self.wallet.banks
     
-    def get_bank_balance(self, bank_name: str) -> float:
+    def get_bank_balance(self, bank_name: str) -> Money:
         return self.wallet.get_bank_balance(bank_name)
 
     # Cards operations
+    def _rebuild_card_index(self):
+        """Mapas id -> cartão e nome -> cartão; cartões sem ID ou com ID repetido recebem um novo"""
+        self._cards_by_id = {}
+        self._cards_by_name = {}
+        for card in self.cards:
+            if not card.id or card.id in self._cards_by_id:
+                card.id = self._unique_card_id(card.name)
+            self._cards_by_id[card.id] = card
+            self._cards_by_name.setdefault(card.name, card)
+    
+    def _unique_card_id(self, name: str) -> str:
+        base = card_id(name)
+        candidate, suffix = base, 2
+        while candidate in self._cards_by_id:
+            candidate = f"{base}-{suffix}"
+            suffix += 1
+        return candidate
+    
     def get_cards(self) -> List[CreditCard]:
         return self.cards
     
+    def get_card(self, card_id: str) -> Optional[CreditCard]:
+        return self._cards_by_id.get(card_id)
+    
+    def get_card_by_name(self, name: str) -> Optional[CreditCard]:
+        return self._cards_by_name.get(name)
+    
     def add_card(self, name: str, limit: float, due_date: str) -> bool:
-        card = CreditCard(name=name, limit=limit, due_date=due_date)
+        # Faturas e parcelas referenciam o cartão pelo nome
+        if name in self._cards_by_name:
+            return False
+        card = CreditCard(name=name, limit=limit, due_date=due_date, id=self._unique_card_id(name))
         self.cards.append(card)
+        self._cards_by_id[card.id] = card
+        self._cards_by_name[card.name] = card
+        self._record_cards(card.name)
         self.save_data()
         return True
     
-    def update_card_usage(self, card_index: int, used: float, month_year: str) -> bool:
-        if 0 <= card_index < len(self.cards):
-            card = self.cards[card_index]
+    def update_card_usage(self, card_id: str, used: float, month_year: str) -> bool:
+        card = self._cards_by_id.get(card_id)
+        if card is not None:
             old_used = card.used
-            card.used = used
+            card.used = used = Money.of(used)
             
             if used > old_used and used > 0:
                 self._sync_card_to_expenses(card, month_year)
             
+            self._record_cards(card.name)
             self.save_data()
             return True
         return False
     
-    def update_card_available(self, card_index: int, new_available: float) -> bool:
-        if 0 <= card_index < len(self.cards):
-            self.cards[card_index].available = new_available
+    def update_card_available(self, card_id: str, new_available: float) -> bool:
+        card = self._cards_by_id.get(card_id)
+        if card is not None:
+            card.available = Money.of(new_available)
+            self._record_cards(card.name)
             self.save_data()
             return True
         return False
     
     def _sync_card_to_expenses(self, card: CreditCard, month_year: str):
-        if month_year not in self.expenses:
-            self.expenses[month_year] = []
+        self._ensure_month(month_year)
         
         expense_description = f"Fatura {card.name}"
+        expense = self._expense_index.get(month_year, {}).get(expense_description)
         
-        existing_expense_index = None
-        for i, expense in enumerate(self.expenses[month_year]):
-            if expense.description == expense_description:
-                existing_expense_index = i
-                break
-        
-        if existing_expense_index is not None:
-            self.expenses[month_year][existing_expense_index].amount = card.used
-            self.expenses[month_year][existing_expense_index].due_date = card.due_date
+        if expense is not None:
+            self._adjust_summary(month_year, expense, -1)
+            expense.amount = card.used
+            expense.due_date = card.due_date
+            self._adjust_summary(month_year, expense, 1)
         else:
             expense = MonthlyExpense(
                 description=expense_description,
@@ -235,12 +563,12 @@ class FinanceService:
                 due_date=card.due_date,
                 paid=False
             )
-            self.expenses[month_year].append(expense)
+            self._append_expense(month_year, expense)
+        self._record_month(month_year)
     
-    def pay_card_invoice(self, card_index: int) -> bool:
-        if 0 <= card_index < len(self.cards):
-            card = self.cards[card_index]
-            
+    def pay_card_invoice(self, card_id: str) -> bool:
+        card = self._cards_by_id.get(card_id)
+        if card is not None:
             if card.used > 0:
                 transaction = Transaction(
                     date=datetime.now().strftime("%d/%m/%Y %H:%M"),
@@ -253,8 +581,10 @@ class FinanceService:
                     return False
                 
                 self.wallet.add_transaction(transaction)
-                card.used = 0.0
+                self._record_transaction_added(transaction)
+                card.used = Money(0)
                 card.available = card.limit
+                self._record_cards(card.name)
                 
                 self._remove_card_expense(card.name)
                 
@@ -264,28 +594,46 @@ class FinanceService:
     
     def _remove_card_expense(self, card_name: str):
         expense_description = f"Fatura {card_name}"
-        for month in self.expenses:
+        if self._deferred_months:
+            for month in self.repository.find_deferred_months(expense_description):
+                self._ensure_month(month)
+        for month in sorted(self._invoice_months.get(card_name, ())):
+            removed = [e for e in self.expenses[month] if e.description == expense_description]
             self.expenses[month] = [e for e in self.expenses[month] if e.description != expense_description]
+            for expense in removed:
+                self._untrack_expense(month, expense)
+            self._record_month(month)
     
-    def update_card_limit(self, card_index: int, new_limit: float) -> bool:
-        if 0 <= card_index < len(self.cards):
-            self.cards[card_index].limit = new_limit
+    def update_card_limit(self, card_id: str, new_limit: float) -> bool:
+        card = self._cards_by_id.get(card_id)
+        if card is not None:
+            card.limit = Money.of(new_limit)
+            self._record_cards(card.name)
             self.save_data()
             return True
         return False
     
-    def update_card_due_date(self, card_index: int, new_due_date: str) -> bool:
-        if 0 <= card_index < len(self.cards):
-            self.cards[card_index].due_date = new_due_date
+    def update_card_due_date(self, card_id: str, new_due_date: str) -> bool:
+        card = self._cards_by_id.get(card_id)
+        if card is not None:
+            card.due_date = new_due_date
+            self._record_cards(card.name)
             self.save_data()
             return True
         return False
     
-    def delete_card(self, card_index: int) -> bool:
-        if 0 <= card_index < len(self.cards):
-            card_name = self.cards[card_index].name
-            self._remove_card_expense(card_name)
-            del self.cards[card_index]
+    def delete_card(self, card_id: str) -> bool:
+        card = self._cards_by_id.pop(card_id, None)
+        if card is not None:
+            self._remove_card_expense(card.name)
+            self.cards.remove(card)
+            del self._cards_by_name[card.name]
+            # Outro cartão antigo com o mesmo nome passa a responder pelo nome
+            for other in self.cards:
+                if other.name == card.name:
+                    self._cards_by_name[card.name] = other
+                    break
+            self._record_cards()
             self.save_data()
             return True
         return False
@@ -296,8 +644,11 @@ class FinanceService:
         if purchase_date is None:
             purchase_date = datetime.now().strftime("%d/%m/%Y")
         
-        installment_value = total_amount / installments
+        # Divisão exata em centavos; a sobra da divisão vai para as primeiras parcelas
+        total_amount = Money.of(total_amount)
+        installment_value = total_amount.split(installments)[0]
         
+        # A 1ª parcela entra no limite usado agora; as demais nos meses seguintes
         installment = Installment(
             description=description,
             total_amount=total_amount,
@@ -305,106 +656,271 @@ class FinanceService:
             current_installment=1,
             installment_value=installment_value,
             purchase_date=purchase_date,
-            card_name=card_name
+            card_name=card_name,
+            first_month=datetime.now().strftime("%Y-%m")
         )
         
         self.installments.append(installment)
+        self.installment_schedule.add(installment)
         
-        for card in self.cards:
-            if card.name == card_name:
-                card.used += installment_value
-                self._sync_card_to_expenses(card, datetime.now().strftime("%Y-%m"))
-                break
+        card = self._cards_by_name.get(card_name)
+        if card is not None:
+            card.used += installment_value
+            self._sync_card_to_expenses(card, datetime.now().strftime("%Y-%m"))
         
+        self._record_installments()
+        self._record_cards()
         self.save_data()
         return True
     
-    def process_installments(self, month_year: str):
+    def get_card_installments(self, card_name: str, month_year: str) -> List[Installment]:
+        """Compras com parcela no cartão no mês (consulta direta ao índice)"""
+        return [installment for installment, _ in self.installment_schedule.charges(card_name, month_year)]
+    
+    def process_installments(self, month_year: Optional[str] = None) -> int:
+        """Lança no limite usado todas as parcelas vencidas até o mês (padrão: o atual).
+        
+        Recupera de uma vez quantos meses tiverem passado sem processamento e
+        grava uma única vez no fim. Retorna o número de parcelas lançadas.
+        """
         current_month = datetime.now().strftime("%Y-%m")
-        if month_year != current_month:
-            return
+        if month_year is None:
+            month_year = current_month
+        if month_year > current_month:
+            return 0
         
-        for installment in self.installments[:]:
-            if installment.current_installment < installment.installments:
-                installment.current_installment += 1
+        charged_cards = {}
+        finished = []
+        charged = 0
+        for installment in self.installments:
+            due = installment.due_by(month_year)
+            if due > installment.current_installment:
+                amount = sum((installment.value_of(number)
+                              for number in range(installment.current_installment + 1, due + 1)), Money(0))
+                charged += due - installment.current_installment
+                installment.current_installment = due
+                self._publish(InstallmentAdvanced(installment.description, installment.card_name,
+                                                  installment.current_installment, installment.installments))
                 
-                for card in self.cards:
-                    if card.name == installment.card_name:
-                        card.used += installment.installment_value
-                        self._sync_card_to_expenses(card, month_year)
-                        break
-            else:
-                self.installments.remove(installment)
+                card = self._cards_by_name.get(installment.card_name)
+                if card is not None:
+                    card.used += amount
+                    charged_cards[card.name] = card
+            if installment.current_installment >= installment.installments and month_year > installment.last_month:
+                finished.append(installment)
+        
+        if not charged and not finished:
+            return 0
         
+        for installment in finished:
+            self.installments.remove(installment)
+            self.installment_schedule.remove(installment)
+        for card in charged_cards.values():
+            self._sync_card_to_expenses(card, month_year)
+        
+        self._record_installments()
+        if charged_cards:
+            self._record_cards()
         self.save_data()
+        return charged
 
     # Expenses operations
     def get_expenses(self, month_year: str) -> List[MonthlyExpense]:
-        if month_year not in self.expenses:
-            self.expenses[month_year] = []
+        self._ensure_month(month_year)
+        self._materialize(month_year)
         return self.expenses[month_year]
     
-    def get_monthly_expenses_total(self, month_year: str) -> float:
-        if month_year not in self.expenses:
-            return 0.0
-        return sum(expense.amount for expense in self.expenses[month_year])
+    def get_planned_expenses(self, month_year: str) -> List[MonthlyExpense]:
+        """Despesas do mês incluindo as recorrentes ainda não criadas, sem criá-las.
+        
+        Um mês ainda no disco é lido sem ficar carregado no serviço.
+        """
+        if month_year in self._deferred_months:
+            expenses = [MonthlyExpense(**e) for e in self.repository.load_month(month_year)]
+            present = {e.description for e in expenses}
+        else:
+            expenses = list(self.expenses.get(month_year, []))
+            present = set(self._expense_index.get(month_year, {}))
+        if month_year not in self._materialized:
+            for rule in self.recurring:
+                if rule.applies_to(month_year) and rule.description not in present:
+                    present.add(rule.description)
+                    expenses.append(rule.create_expense())
+        return expenses
+    
+    def get_planned_months(self) -> List[str]:
+        """Meses com despesas gravadas ou previstas por regras recorrentes"""
+        months = set(self.expenses) | self._deferred_months
+        for rule in self.recurring:
+            months.update(rule.months())
+        return sorted(months)
+    
+    def iter_expenses(self) -> Iterator[Tuple[str, MonthlyExpense]]:
+        """Todas as despesas gravadas, mês a mês, com as recorrentes previstas nesses meses.
+        
+        Não cria cópias nem mantém carregados os meses que estão só no disco.
+        """
+        for month_year in self.get_expense_months():
+            for expense in self.get_planned_expenses(month_year):
+                yield month_year, expense
+    
+    def _ensure_month(self, month_year: str):
+        """Garante a lista do mês, lendo do disco se ele ainda não foi carregado"""
+        if month_year in self._deferred_months:
+            self._deferred_months.discard(month_year)
+            self.expenses[month_year] = []
+            for e in self.repository.load_month(month_year):
+                self._append_expense(month_year, MonthlyExpense(**e))
+        elif month_year not in self.expenses:
+            self.expenses[month_year] = []
+    
+    def _load_all_months(self):
+        for month_year in sorted(self._deferred_months):
+            self._ensure_month(month_year)
+    
+    def get_expense_months(self) -> List[str]:
+        """Meses com despesas gravadas, inclusive os que ainda estão só no disco"""
+        return sorted(set(self.expenses) | self._deferred_months)
+    
+    def get_monthly_expenses_total(self, month_year: str) -> Money:
+        return self.get_month_summary(month_year).total
+    
+    def get_month_summary(self, month_year: str) -> MonthSummary:
+        """Totais pagos/a pagar do mês, calculados uma vez e mantidos a cada alteração"""
+        self._materialize(month_year)
+        summary = self._month_summaries.get(month_year)
+        if summary is None:
+            summary = MonthSummary()
+            for expense in self.expenses.get(month_year, []):
+                summary.include(expense)
+            self._month_summaries[month_year] = summary
+        return summary
+    
+    # Índices de despesas: descrição por mês, meses com fatura por cartão e totais
+    def _rebuild_expense_indexes(self):
+        self._month_summaries = {}
+        self._expense_index = {}
+        self._invoice_months = {}
+        self._recurring_index = {}
+        for rule in self.recurring:
+            self._recurring_index.setdefault(rule.description, []).append(rule)
+        for month_year, expenses in self.expenses.items():
+            for expense in expenses:
+                self._track_expense(month_year, expense)
+    
+    def _track_expense(self, month_year: str, expense: MonthlyExpense):
+        self._expense_index.setdefault(month_year, {}).setdefault(expense.description, expense)
+        if expense.description.startswith("Fatura "):
+            self._invoice_months.setdefault(expense.description[len("Fatura "):], set()).add(month_year)
+        self._adjust_summary(month_year, expense, 1)
+    
+    def _untrack_expense(self, month_year: str, expense: MonthlyExpense):
+        month_index = self._expense_index.get(month_year, {})
+        if month_index.get(expense.description) is expense:
+            # Descrições repetidas no mesmo mês: o índice passa para a próxima ocorrência
+            duplicate = next((e for e in self.expenses.get(month_year, [])
+                              if e.description == expense.description and e is not expense), None)
+            if duplicate is not None:
+                month_index[expense.description] = duplicate
+            else:
+                del month_index[expense.description]
+        if expense.description.startswith("Fatura ") and expense.description not in month_index:
+            self._invoice_months.get(expense.description[len("Fatura "):], set()).discard(month_year)
+        self._adjust_summary(month_year, expense, -1)
+    
+    def _adjust_summary(self, month_year: str, expense: MonthlyExpense, sign: int):
+        summary = self._month_summaries.get(month_year)
+        if summary is not None:
+            summary.include(expense, sign)
+    
+    def _expense_at(self, month_year: str, expense_index: int):
+        expenses = self.get_expenses(month_year)
+        if 0 <= expense_index < len(expenses):
+            return expenses[expense_index]
+        return None
+    
+    def _append_expense(self, month_year: str, expense: MonthlyExpense):
+        self._ensure_month(month_year)
+        self.expenses[month_year].append(expense)
+        self._track_expense(month_year, expense)
     
     def add_expense_monthly(self, month_year: str, description: str, amount: float, 
                           due_date: str, recurring: bool = False, end_date: str = None) -> bool:
-        if month_year not in self.expenses:
-            self.expenses[month_year] = []
-        
-        for expense in self.expenses[month_year]:
-            if expense.description == description and not expense.description.startswith("Fatura "):
-                return False
+        self.get_expenses(month_year)
         
-        expense = MonthlyExpense(
-            description=description,
-            amount=amount,
-            due_date=due_date,
-            recurring=recurring,
-            end_date=end_date
-        )
-        self.expenses[month_year].append(expense)
-        self.save_data()
+        if description in self._expense_index.get(month_year, {}) and not description.startswith("Fatura "):
+            return False
         
         if recurring:
             self._create_recurring_expenses(month_year, description, amount, due_date, end_date)
+        else:
+            expense = MonthlyExpense(
+                description=description,
+                amount=amount,
+                due_date=due_date,
+                end_date=end_date
+            )
+            self._append_expense(month_year, expense)
+            self._record_month(month_year)
         
+        self.save_data()
         return True
     
     def _create_recurring_expenses(self, start_month: str, description: str, amount: float, 
                                  due_date: str, end_date: str = None):
-        current_date = datetime.strptime(start_month + "-01", "%Y-%m-%d")
-        end_date_obj = datetime.strptime(end_date + "-01", "%Y-%m-%d") if end_date else current_date.replace(year=current_date.year + 1)
+        """Grava a regra uma única vez; as cópias mensais são criadas em get_expenses"""
+        rule = RecurringExpense(
+            description=description,
+            amount=amount,
+            due_date=due_date,
+            start_month=start_month,
+            end_date=end_date
+        )
+        self.recurring.append(rule)
+        self._recurring_index.setdefault(description, []).append(rule)
+        self._record_recurring()
         
-        while current_date <= end_date_obj:
-            month_year = current_date.strftime("%Y-%m")
-            if month_year != start_month and month_year not in self.expenses:
-                self.expenses[month_year] = []
-            
-            exists = any(e.description == description for e in self.expenses.get(month_year, []))
-            if not exists:
-                expense = MonthlyExpense(
-                    description=description,
-                    amount=amount,
-                    due_date=due_date,
-                    recurring=True,
-                    end_date=end_date
-                )
-                if month_year not in self.expenses:
-                    self.expenses[month_year] = []
-                self.expenses[month_year].append(expense)
-            
-            if current_date.month == 12:
-                current_date = current_date.replace(year=current_date.year + 1, month=1)
-            else:
-                current_date = current_date.replace(month=current_date.month + 1)
+        for month_year in sorted(self._materialized):
+            if rule.applies_to(month_year):
+                self._materialize_rule(rule, month_year)
+                self._publish(ExpenseMonthChanged(month_year))
+    
+    def _materialize(self, month_year: str):
+        if month_year in self._materialized:
+            return
+        # Mês ainda no disco: carrega antes de conferir as regras e de montar o resumo
+        if month_year in self._deferred_months:
+            self._ensure_month(month_year)
+        self._materialized.add(month_year)
+        for rule in self.recurring:
+            if rule.applies_to(month_year):
+                self._materialize_rule(rule, month_year)
+    
+    def _materialize_rule(self, rule: RecurringExpense, month_year: str):
+        if rule.description not in self._expense_index.get(month_year, {}):
+            self._append_expense(month_year, rule.create_expense())
+    
+    def _recurring_rule_for(self, month_year: str, expense: MonthlyExpense):
+        if expense.recurring:
+            for rule in self._recurring_index.get(expense.description, ()):
+                if rule.applies_to(month_year):
+                    return rule
+        return None
+    
+    def _is_recurring_copy(self, month_year: str, expense: MonthlyExpense) -> bool:
+        rule = self._recurring_rule_for(month_year, expense)
+        return rule is not None and rule.matches(expense)
+    
+    def _skip_recurring(self, month_year: str, expense: MonthlyExpense):
+        """Impede que a regra recrie no mês uma cópia excluída ou renomeada"""
+        rule = self._recurring_rule_for(month_year, expense)
+        if rule is not None:
+            rule.skipped_months.append(month_year)
+            self._record_recurring()
     
     def toggle_expense_paid(self, month_year: str, expense_index: int) -> bool:
-        if month_year in self.expenses and 0 <= expense_index < len(self.expenses[month_year]):
-            expense = self.expenses[month_year][expense_index]
-            
+        expense = self._expense_at(month_year, expense_index)
+        if expense is not None:
             if not expense.paid:
                 is_card_invoice = expense.description.startswith("Fatura ")
                 
@@ -420,43 +936,100 @@ class FinanceService:
                 
                 if not is_card_invoice:
                     self.wallet.add_transaction(transaction)
+                    self._record_transaction_added(transaction)
                 
                 if is_card_invoice:
                     card_name = expense.description.replace("Fatura ", "")
-                    for card in self.cards:
-                        if card.name == card_name:
-                            card.used = 0.0
-                            break
+                    card = self._cards_by_name.get(card_name)
+                    if card is not None:
+                        card.used = Money(0)
+                        self._record_cards(card.name)
             
+            self._adjust_summary(month_year, expense, -1)
             expense.paid = not expense.paid
+            self._adjust_summary(month_year, expense, 1)
+            self._record_month(month_year)
+            self.save_data()
+            return True
+        return False
+    
+    def pay_expense(self, month_year: str, expense_index: int, bank: str = "Geral") -> bool:
+        """Marca a despesa como paga registrando a saída no banco escolhido"""
+        expense = self._expense_at(month_year, expense_index)
+        if expense is not None:
+            if expense.paid or expense.amount > self.wallet.get_bank_balance(bank):
+                return False
+            
+            transaction = Transaction(
+                date=datetime.now().strftime("%d/%m/%Y %H:%M"),
+                type="Saída",
+                amount=expense.amount,
+                description=expense.description,
+                bank=bank
+            )
+            self.wallet.add_transaction(transaction)
+            self._record_transaction_added(transaction)
+            
+            self._adjust_summary(month_year, expense, -1)
+            expense.paid = True
+            self._adjust_summary(month_year, expense, 1)
+            self._record_month(month_year)
             self.save_data()
             return True
         return False
     
     def update_expense_amount(self, month_year: str, expense_index: int, new_amount: float) -> bool:
-        if month_year in self.expenses and 0 <= expense_index < len(self.expenses[month_year]):
-            self.expenses[month_year][expense_index].amount = new_amount
+        expense = self._expense_at(month_year, expense_index)
+        if expense is not None:
+            self._adjust_summary(month_year, expense, -1)
+            expense.amount = Money.of(new_amount)
+            self._adjust_summary(month_year, expense, 1)
+            self._record_month(month_year)
             self.save_data()
             return True
         return False
     
     def update_expense_due_date(self, month_year: str, expense_index: int, new_due_date: str) -> bool:
-        if month_year in self.expenses and 0 <= expense_index < len(self.expenses[month_year]):
-            self.expenses[month_year][expense_index].due_date = new_due_date
+        expense = self._expense_at(month_year, expense_index)
+        if expense is not None:
+            expense.due_date = new_due_date
+            self._record_month(month_year)
             self.save_data()
             return True
         return False
     
     def update_expense_description(self, month_year: str, expense_index: int, new_description: str) -> bool:
-        if month_year in self.expenses and 0 <= expense_index < len(self.expenses[month_year]):
-            self.expenses[month_year][expense_index].description = new_description
+        expense = self._expense_at(month_year, expense_index)
+        if expense is not None:
+            self._skip_recurring(month_year, expense)
+            self._untrack_expense(month_year, expense)
+            expense.description = new_description
+            self._track_expense(month_year, expense)
+            self._record_month(month_year)
             self.save_data()
             return True
         return False
     
     def delete_expense(self, month_year: str, expense_index: int) -> bool:
-        if month_year in self.expenses and 0 <= expense_index < len(self.expenses[month_year]):
+        expense = self._expense_at(month_year, expense_index)
+        if expense is not None:
+            self._skip_recurring(month_year, expense)
+            self._untrack_expense(month_year, expense)
             del self.expenses[month_year][expense_index]
+            self._record_month(month_year)
             self.save_data()
             return True
-        return False
\ No newline at end of file
+        return False
+
+
+def migrate_repository(source, target) -> FinanceService:
+    """Copia todos os dados de um repositório para outro (ex.: JSON -> SQLite).
+
+    O carregamento passa pelo FinanceService, então o formato antigo de cartões
+    por mês é convertido por _migrate_old_cards_format antes da gravação.
+    """
+    service = FinanceService(source)
+    service._load_all_months()
+    target.save_data(service._to_dict())
+    service.repository = target
+    return service
@@ -0,0 +1,126 @@
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from ..models.cards import add_months
+from ..models.money import Money
+from .events import (ChangeEvent, TransactionAdded, TransactionEdited, TransactionRemoved, HistoryCleared,
+                     BankBalanceChanged, CardUpdated, ExpenseMonthChanged, InstallmentAdvanced, RecurringChanged)
+
+def due_day(due_date: str) -> Optional[int]:
+    """Dia de '10/mm' ou '10'; None se o vencimento não tiver dia"""
+    day = (due_date or "").split('/')[0]
+    return int(day) if day.isdigit() else None
+
+@dataclass
+class ForecastItem:
+    description: str
+    amount: Money
+    due_day: Optional[int]
+    source: str  # 'despesa', 'recorrente', 'fatura' ou 'parcela'
+
+@dataclass
+class MonthForecast:
+    month_year: str
+    outflow: Money
+    balance: Money  # Saldo total projetado ao fim do mês
+    bank_balances: Dict[str, Money]
+    items: List[ForecastItem] = field(default_factory=list)
+
+class ForecastService:
+    """Projeção de saldos dos próximos meses a partir das obrigações conhecidas.
+
+    Considera as despesas não pagas de cada mês (inclusive as recorrentes ainda
+    não criadas) e as parcelas restantes, que entram na fatura do cartão nos
+    meses seguintes. Não há previsão de entradas. As obrigações saem do banco
+    indicado, seguindo a regra da carteira: saídas do "Geral" só reduzem o
+    saldo total.
+
+    Os resultados ficam em cache e são descartados pelos eventos de alteração
+    do FinanceService; alterações em meses fora do período projetado não
+    invalidam o cache.
+    """
+
+    _BALANCE_EVENTS = (TransactionAdded, TransactionEdited, TransactionRemoved, HistoryCleared,
+                       BankBalanceChanged, CardUpdated, InstallmentAdvanced, RecurringChanged)
+
+    def __init__(self, finance_service):
+        self.finance_service = finance_service
+        self._cache: Dict[Tuple[str, int, str], List[MonthForecast]] = {}
+        self._cache_wallet = None
+        self._months: Tuple[str, str] = ("", "")  # Meses cobertos pelo cache
+        self._unsubscribe = [
+            finance_service.subscribe(self._invalidate, *self._BALANCE_EVENTS),
+            finance_service.subscribe(self._invalidate_month, ExpenseMonthChanged),
+        ]
+
+    def close(self):
+        for unsubscribe in self._unsubscribe:
+            unsubscribe()
+
+    def _invalidate(self, event: ChangeEvent):
+        self._cache.clear()
+
+    def _invalidate_month(self, event: ExpenseMonthChanged):
+        first_month, last_month = self._months
+        if first_month <= event.month_year <= last_month:
+            self._cache.clear()
+
+    def forecast(self, months: int = 6, bank: str = "Geral") -> List[MonthForecast]:
+        """Projeção do mês atual e dos months - 1 seguintes"""
+        current_month = datetime.now().strftime("%Y-%m")
+        # Dentro de batch() os eventos ainda não saíram: o cache pode estar velho
+        if self.finance_service.in_batch:
+            return self._compute(current_month, months, bank)
+        wallet = self.finance_service.wallet
+        # Um batch() desfeito restaura a carteira sem publicar eventos
+        if self._cache_wallet is not wallet or self._months[0] != current_month:
+            self._cache.clear()
+            self._months = (current_month, current_month)
+            self._cache_wallet = wallet
+        key = (current_month, months, bank)
+        result = self._cache.get(key)
+        if result is None:
+            result = self._cache[key] = self._compute(current_month, months, bank)
+            self._months = (current_month, max(self._months[1], add_months(current_month, months - 1)))
+        return result
+
+    def _compute(self, current_month: str, months: int, bank: str) -> List[MonthForecast]:
+        service = self.finance_service
+        month_list = [add_months(current_month, i) for i in range(months)]
+        items: List[List[ForecastItem]] = [[] for _ in month_list]
+
+        for position, month_year in enumerate(month_list):
+            for expense in service.get_planned_expenses(month_year):
+                if expense.paid:
+                    continue
+                if expense.description.startswith("Fatura "):
+                    source = 'fatura'
+                else:
+                    source = 'recorrente' if expense.recurring else 'despesa'
+                items[position].append(ForecastItem(expense.description, expense.amount,
+                                                    due_day(expense.due_date), source))
+
+        # Parcelas até current_installment já estão no limite usado (fatura do mês)
+        schedule = service.installment_schedule
+        for card_name in schedule.card_names():
+            card = service.get_card_by_name(card_name)
+            day = due_day(card.due_date) if card is not None else None
+            for position, month_year in enumerate(month_list):
+                for installment, number in schedule.charges(card_name, month_year):
+                    if number > installment.current_installment:
+                        items[position].append(ForecastItem(
+                            f"{installment.description} ({number}/{installment.installments}) - {card_name}",
+                            installment.value_of(number), day, 'parcela'))
+
+        balance = service.get_balance()
+        bank_balances = {b.name: b.balance for b in service.get_banks()}
+        result = []
+        for month_year, month_items in zip(month_list, items):
+            month_items.sort(key=lambda item: (item.due_day is None, item.due_day or 0))
+            outflow = sum((item.amount for item in month_items), Money(0))
+            balance -= outflow
+            if bank != "Geral" and bank in bank_balances:
+                bank_balances[bank] -= outflow
+            result.append(MonthForecast(month_year, outflow, balance, dict(bank_balances), month_items))
+        return result
@@ -0,0 +1,315 @@
+import csv
+import io
+import os
+import re
+import unicodedata
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from functools import lru_cache
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+from ..models.money import Money
+from ..models.wallet import Transaction, to_timestamp
+
+# Linha normalizada: (timestamp, tipo, centavos, descrição, banco)
+Row = Tuple[int, str, int, str, str]
+
+_DATE_FORMATS = ("%d/%m/%Y %H:%M:%S", "%d/%m/%Y %H:%M", "%d/%m/%Y", "%d/%m/%y",
+                 "%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M", "%Y-%m-%d", "%d-%m-%Y", "%d.%m.%Y")
+_OFX_DATE = re.compile(r'(\d{8})(\d{4})?(\d{2})?')
+_OFX_TAG = re.compile(r'<(/?)([A-Za-z0-9.]+)>([^<]*)')
+_OFX_CHARSET = re.compile(r'CHARSET:\s*(\S+)|encoding="([^"]+)"', re.IGNORECASE)
+
+# Nomes de coluna aceitos no CSV (sem acentos, minúsculos)
+_CSV_COLUMNS = {
+    'date': ("data", "date", "dt", "data lancamento", "data do lancamento", "data movimento"),
+    'description': ("descricao", "description", "historico", "memo", "lancamento", "detalhe", "detalhes"),
+    'amount': ("valor", "amount", "value", "valor (r$)", "valor r$", "quantia"),
+    'type': ("tipo", "type", "natureza", "c/d", "d/c"),
+    'bank': ("banco", "bank", "conta", "instituicao"),
+}
+_INCOME_TYPES = {"entrada", "credito", "credit", "c", "cr", "receita"}
+_EXPENSE_TYPES = {"saida", "debito", "debit", "d", "db", "dr", "despesa"}
+
+def _plain(text: str) -> str:
+    """Minúsculas e sem acentos, para comparar cabeçalhos e tipos"""
+    return unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode('ascii').strip().lower()
+
+def parse_amount(text: str) -> Decimal:
+    """Aceita '1.234,56', '1,234.56', '-50,00', 'R$ 10,00' e '(10,00)' (negativo)"""
+    value = text.strip().replace("R$", "").replace(" ", "").replace(" ", "")
+    negative = value.startswith('(') and value.endswith(')')
+    value = value.strip('()')
+    if ',' in value and '.' in value:
+        # O último separador é o decimal
+        if value.rfind(',') > value.rfind('.'):
+            value = value.replace('.', '').replace(',', '.')
+        else:
+            value = value.replace(',', '')
+    elif ',' in value:
+        value = value.replace(',', '.') if re.search(r',\d{1,2}$', value) else value.replace(',', '')
+    elif re.fullmatch(r'-?\d{1,3}(\.\d{3})+', value):
+        # '1.234' no padrão brasileiro é milhar
+        value = value.replace('.', '')
+    try:
+        amount = Decimal(value)
+    except InvalidOperation:
+        raise ValueError(f"valor inválido: {text!r}")
+    return -amount if negative else amount
+
+@lru_cache(maxsize=4096)
+def parse_date(text: str) -> int:
+    """Data do extrato -> timestamp com precisão de minutos (como no histórico)"""
+    text = text.strip()
+    match = _OFX_DATE.match(text)
+    if match and len(match.group(1)) == 8 and text[:8].isdigit():
+        moment = datetime.strptime(match.group(1) + (match.group(2) or "0000"), "%Y%m%d%H%M")
+    else:
+        for date_format in _DATE_FORMATS:
+            try:
+                moment = datetime.strptime(text[:19].replace('T', ' '), date_format)
+                break
+            except ValueError:
+                continue
+        else:
+            raise ValueError(f"data inválida: {text!r}")
+    timestamp = to_timestamp(moment)
+    return timestamp - timestamp % 60
+
+def _detect_encoding(head: bytes) -> str:
+    if head.startswith(b'\xef\xbb\xbf'):
+        return 'utf-8-sig'
+    try:
+        head.decode('utf-8')
+        return 'utf-8'
+    except UnicodeDecodeError as error:
+        # Um caractere multibyte cortado no fim do trecho lido não conta
+        if error.start >= len(head) - 3:
+            return 'utf-8'
+        return 'cp1252'
+
+@dataclass
+class ImportResult:
+    imported: int = 0
+    duplicates: int = 0
+    skipped: int = 0
+    errors: List[str] = field(default_factory=list)  # Primeiras linhas rejeitadas ("linha N: motivo")
+
+class StatementImporter:
+    """Importa extratos CSV e OFX para a carteira em uma única transação.
+
+    O arquivo é lido em blocos de chunk_size linhas. Cada linha vira uma
+    transação (data, tipo pelo sinal ou coluna de tipo, valor absoluto,
+    descrição, banco). O banco escolhido (bank) vale para todas as linhas;
+    sem ele, vale o banco do arquivo (coluna de banco, ORG/BANKID no OFX),
+    traduzido por bank_map, ou "Geral". Uma linha é descartada como duplicata quando o
+    histórico já tem uma transação com mesma data, tipo, valor e descrição;
+    o índice de duplicatas cobre apenas os dias presentes no arquivo. Tudo é
+    aplicado dentro de batch(): um erro desfaz a importação inteira e o
+    sucesso grava uma única vez.
+    """
+
+    MAX_ERRORS = 100
+
+    def __init__(self, finance_service, bank: Optional[str] = None, bank_map: Optional[Dict[str, str]] = None,
+                 chunk_size: int = 5000):
+        self.finance_service = finance_service
+        self.bank = bank
+        self.bank_map = bank_map or {}
+        self.chunk_size = chunk_size
+
+    def import_file(self, path: str, file_format: Optional[str] = None) -> ImportResult:
+        """Importa o arquivo; o formato vem da extensão se não for informado ('csv' ou 'ofx')"""
+        file_format = (file_format or os.path.splitext(path)[1].lstrip('.')).lower()
+        if file_format == 'csv':
+            rows = self._iter_csv(path)
+        elif file_format in ('ofx', 'qfx'):
+            rows = self._iter_ofx(path)
+        else:
+            raise ValueError(f"Formato de extrato não suportado: {file_format}")
+
+        self._result = ImportResult()
+        service = self.finance_service
+        self._prepare_index(service.get_transaction_history())
+        with service.batch():
+            chunk: List[Row] = []
+            for row in rows:
+                chunk.append(row)
+                if len(chunk) >= self.chunk_size:
+                    self._apply(chunk)
+                    chunk = []
+            if chunk:
+                self._apply(chunk)
+        return self._result
+
+    def _apply(self, chunk: List[Row]):
+        self._index_days({timestamp // 86400 for timestamp, _, _, _, _ in chunk})
+        existing = self._existing
+        fresh = []
+        for row in chunk:
+            key = row[:4]
+            if existing[key]:
+                existing[key] -= 1
+                self._result.duplicates += 1
+            else:
+                fresh.append(row)
+        self._result.imported += self.finance_service.add_transactions(
+            Transaction("", kind, Money(cents), description, bank, timestamp)
+            for timestamp, kind, cents, description, bank in fresh
+        )
+
+    def _prepare_index(self, history):
+        """Guarda a ordem cronológica do histórico anterior à importação.
+        
+        Linhas iguais dentro do mesmo arquivo são legítimas, então só o que já
+        existia conta como duplicata. A ordem é fixada antes de incluir
+        transações com datas antigas, que tirariam o histórico de ordem.
+        """
+        columns = history.columns()
+        self._columns = columns
+        self._history_size = len(history)
+        self._indexed_days: Set[int] = set()
+        self._existing: Counter = Counter()
+        order = history.select()
+        if isinstance(order, range):
+            self._order = None
+            self._order_keys = columns['timestamps']
+        else:
+            self._order = order
+            timestamps = columns['timestamps']
+            self._order_keys = array('q', (timestamps[i] for i in order))
+
+    def _index_days(self, days: Set[int]):
+        """Inclui no índice as transações já existentes nos dias ainda não vistos"""
+        columns, keys, size = self._columns, self._order_keys, self._history_size
+        timestamps, amounts, descriptions = columns['timestamps'], columns['amounts'], columns['descriptions']
+        types, type_names = columns['types'], columns['type_names']
+        for day in days - self._indexed_days:
+            self._indexed_days.add(day)
+            start = bisect_left(keys, day * 86400, 0, size)
+            end = bisect_left(keys, (day + 1) * 86400, start, size)
+            for i in (range(start, end) if self._order is None else self._order[start:end]):
+                timestamp = timestamps[i]
+                self._existing[(timestamp - timestamp % 60, type_names[types[i]], amounts[i],
+                                descriptions[i])] += 1
+
+    def _row(self, where: str, date: str, amount: str, description: str, kind: Optional[str] = None,
+             bank: Optional[str] = None) -> Optional[Row]:
+        try:
+            timestamp = parse_date(date)
+            value = parse_amount(amount)
+            transaction_type = "Saída" if value < 0 else "Entrada"
+            if kind:
+                plain = _plain(kind)
+                if plain in _INCOME_TYPES:
+                    transaction_type = "Entrada"
+                elif plain in _EXPENSE_TYPES:
+                    transaction_type = "Saída"
+            cents = Money.of(abs(value)).cents
+            if cents == 0:
+                raise ValueError("valor zero")
+        except ValueError as error:
+            self._result.skipped += 1
+            if len(self._result.errors) < self.MAX_ERRORS:
+                self._result.errors.append(f"{where}: {error}")
+            return None
+        if self.bank:
+            bank = self.bank
+        else:
+            bank = bank.strip() if bank else ""
+            bank = self.bank_map.get(bank, bank) or "Geral"
+        return (timestamp, transaction_type, cents, " ".join(description.split()) or "Importado", bank)
+
+    def _iter_csv(self, path: str) -> Iterator[Row]:
+        with open(path, 'rb') as raw:
+            head = raw.read(1 << 16)
+        encoding = _detect_encoding(head)
+        sample = head.decode(encoding, errors='ignore')
+        try:
+            dialect = csv.Sniffer().sniff('\n'.join(sample.splitlines()[:20]), delimiters=';,\t|')
+        except csv.Error:
+            dialect = csv.excel
+
+        with open(path, 'r', encoding=encoding, newline='') as f:
+            reader = csv.reader(f, dialect)
+            header = next(reader, None)
+            if header is None:
+                return
+            positions = self._csv_positions(header)
+            date_at, amount_at = positions['date'], positions['amount']
+            description_at, type_at, bank_at = positions['description'], positions['type'], positions['bank']
+            for record in reader:
+                if not record or not any(record):
+                    continue
+                try:
+                    row = self._row(
+                        f"linha {reader.line_num}", record[date_at], record[amount_at],
+                        record[description_at] if description_at is not None else "",
+                        record[type_at] if type_at is not None else None,
+                        record[bank_at] if bank_at is not None else None
+                    )
+                except IndexError:
+                    row = self._row(f"linha {reader.line_num}", "", "", "")
+                if row is not None:
+                    yield row
+
+    @staticmethod
+    def _csv_positions(header: List[str]) -> Dict[str, Optional[int]]:
+        names = [_plain(name) for name in header]
+        positions = {}
+        for column, aliases in _CSV_COLUMNS.items():
+            positions[column] = next((i for i, name in enumerate(names) if name in aliases), None)
+        if positions['date'] is None or positions['amount'] is None:
+            raise ValueError("O CSV precisa das colunas de data e valor (ex.: 'data;descrição;valor')")
+        return positions
+
+    def _iter_ofx(self, path: str) -> Iterator[Row]:
+        with open(path, 'rb') as raw:
+            head = raw.read(4096)
+        match = _OFX_CHARSET.search(head.decode('ascii', errors='ignore'))
+        charset = (match.group(1) or match.group(2)) if match else ""
+        encoding = 'cp1252' if charset in ('1252', 'windows-1252', 'ISO-8859-1', 'latin1') else 'utf-8'
+
+        bank = ""
+        transaction: Optional[Dict[str, str]] = None
+        number = 0
+        with open(path, 'r', encoding=encoding, errors='replace') as f:
+            for closing, tag, text in self._iter_ofx_tags(f):
+                tag = tag.upper()
+                if tag == 'STMTTRN':
+                    if not closing:
+                        transaction = {}
+                        number += 1
+                    elif transaction is not None:
+                        row = self._row(f"transação {number}", transaction.get('DTPOSTED', ""), transaction.get('TRNAMT', ""),
+                                        transaction.get('MEMO') or transaction.get('NAME', ""),
+                                        None, bank)
+                        transaction = None
+                        if row is not None:
+                            yield row
+                elif closing:
+                    continue
+                elif transaction is not None:
+                    transaction[tag] = text.strip()
+                elif tag in ('ORG', 'BANKID') and text.strip() and not bank:
+                    bank = text.strip()
+
+    @staticmethod
+    def _iter_ofx_tags(f: io.TextIOBase, chunk_size: int = 1 << 16) -> Iterator[Tuple[bool, str, str]]:
+        """Percorre as tags do OFX (SGML ou XML) lendo o arquivo em blocos"""
+        buffer = ""
+        while True:
+            data = f.read(chunk_size)
+            buffer += data
+            # Só processa até o último '<': a tag seguinte pode continuar no próximo bloco
+            end = buffer.rfind('<') if data else len(buffer)
+            if end > 0:
+                for match in _OFX_TAG.finditer(buffer, 0, end):
+                    yield match.group(1) == '/', match.group(2), match.group(3)
+                buffer = buffer[end:]
+            if not data:
+                return
@@ -0,0 +1,86 @@
+import atexit
+import queue
+import threading
+from typing import Any, Callable, Dict, List, Union
+
+class PersistenceWorker:
+    """Grava os dados do FinanceService em uma thread própria, na ordem de envio.
+
+    Recebe listas de alterações ou snapshots completos (nada que o serviço
+    continue alterando). Um snapshot pode vir como função que monta o documento:
+    ela roda nesta thread, e não roda se um snapshot mais novo já estiver na
+    fila. Um snapshot torna obsoletos os anteriores ainda na fila.
+
+    Erros de gravação ficam guardados até pop_errors() e fazem o próximo envio
+    ser um snapshot completo. Até ele chegar, as listas de alterações da fila
+    são descartadas: seus caminhos por posição suporiam a alteração que falhou.
+    """
+
+    def __init__(self, repository):
+        self.repository = repository
+        self.needs_snapshot = False
+        self._queue: queue.Queue = queue.Queue()
+        self._errors: queue.Queue = queue.Queue()
+        self._generation = 0
+        # Só a thread de gravação usa: houve erro e nenhum snapshot foi gravado depois
+        self._stale = False
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="finance-persistence", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def save_changes(self, changes: List[Dict[str, Any]]):
+        if self._closed:
+            self.repository.append_changes(changes)
+            return
+        self._queue.put(('changes', changes, None))
+
+    def save_snapshot(self, data: Union[Dict[str, Any], Callable[[], Dict[str, Any]]]):
+        self.needs_snapshot = False
+        if self._closed:
+            self.repository.save_data(data() if callable(data) else data)
+            return
+        self._generation += 1
+        self._queue.put(('snapshot', data, self._generation))
+
+    def flush(self):
+        """Bloqueia até todas as gravações enviadas terminarem"""
+        self._queue.join()
+
+    def pop_errors(self) -> List[Exception]:
+        errors = []
+        while True:
+            try:
+                errors.append(self._errors.get_nowait())
+            except queue.Empty:
+                return errors
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join()
+        atexit.unregister(self.close)
+
+    def _run(self):
+        while True:
+            job = self._queue.get()
+            try:
+                if job is None:
+                    return
+                kind, payload, generation = job
+                if kind == 'snapshot':
+                    # Um snapshot mais novo já está na fila
+                    if generation < self._generation:
+                        continue
+                    self.repository.save_data(payload() if callable(payload) else payload)
+                    self._stale = False
+                elif not self._stale:
+                    self.repository.append_changes(payload)
+            except Exception as error:
+                self._stale = True
+                self.needs_snapshot = True
+                self._errors.put(error)
+            finally:
+                self._queue.task_done()
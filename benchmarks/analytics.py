@@ -0,0 +1,60 @@
+"""Benchmark dos relatórios vetorizados com 1M de transações sintéticas.
+
+Uso: python -m benchmarks.analytics [quantidade]
+"""
+import sys
+import time
+
+import numpy as np
+
+from backend.models.wallet import TransactionHistory
+from backend.services.analytics_service import TransactionFrame
+
+BANKS = ["Geral", "Nubank", "Itaú", "Caixa", "Inter"]
+
+def build_history(count: int) -> TransactionHistory:
+    rng = np.random.default_rng(42)
+    # Cinco anos de transações em ordem cronológica
+    start = 1_577_836_800  # 2020-01-01
+    timestamps = np.sort(rng.integers(start, start + 5 * 365 * 86400, count)).tolist()
+    amounts = (rng.integers(100, 500_000, count) / 100).tolist()
+    kinds = np.where(rng.random(count) < 0.3, "Entrada", "Saída").tolist()
+    banks = rng.choice(BANKS, count).tolist()
+    descriptions = [f"Categoria {n}" for n in rng.integers(0, 300, count).tolist()]
+    history = TransactionHistory()
+    history.extend_dicts({'date': timestamp, 'type': kind, 'amount': amount, 'description': description,
+                          'bank': bank}
+                         for timestamp, kind, amount, description, bank
+                         in zip(timestamps, kinds, amounts, descriptions, banks))
+    return history
+
+def timed(name: str, function):
+    started = time.perf_counter()
+    result = function()
+    print(f"{name:32s} {(time.perf_counter() - started) * 1000:8.1f} ms")
+    return result
+
+def main(count: int = 1_000_000):
+    print(f"Gerando {count:,} transações...".replace(',', '.'))
+    history = build_history(count)
+
+    started = time.perf_counter()
+    frame = timed("TransactionFrame.from_history", lambda: TransactionFrame.from_history(history))
+    flows = timed("monthly_cash_flow", frame.monthly_cash_flow)
+    banks = timed("bank_flows", frame.bank_flows)
+    timed("category_breakdown (1ª vez)", lambda: frame.category_breakdown(top=10))
+    timed("category_breakdown", lambda: frame.category_breakdown("2022-01", "2022-12", top=10))
+    timed("rolling_average(3)", lambda: frame.rolling_average(3))
+    timed("year_over_year", frame.year_over_year)
+    print(f"{'total':32s} {(time.perf_counter() - started) * 1000:8.1f} ms")
+
+    # Confere com a soma em Python puro do próprio histórico
+    totals = history.totals()
+    assert sum(flow.inflow.cents for flow in flows) == sum(
+        total.cents for (kind, _), total in totals.items() if kind == "Entrada")
+    assert {bank.bank: bank.outflow for bank in banks} == {
+        bank: total for (kind, bank), total in totals.items() if kind == "Saída"}
+    print(f"{len(flows)} meses, {len(banks)} bancos: totais conferem")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -0,0 +1,32 @@
+"""Micro-benchmark da formatação de valores em reais (custo por célula).
+
+Uso: python -m benchmarks.format_currency
+"""
+import random
+import timeit
+
+from frontend.formatting import format_brl, format_brl_column
+
+def format_chain(value: float) -> str:
+    # Formatação antiga usada em cada célula da GUI
+    return f"R$ {value:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.')
+
+def main(cells: int = 10_000, repeat: int = 5):
+    random.seed(42)
+    # Valores de uma tabela típica: poucas centenas de valores distintos, muito repetidos
+    distinct = [round(random.uniform(-5000, 50000), 2) for _ in range(300)]
+    values = [random.choice(distinct) for _ in range(cells)]
+    assert [format_chain(v) for v in values] == format_brl_column(values)
+
+    cases = {
+        "replace() encadeado": lambda: [format_chain(v) for v in values],
+        "format_brl sem cache": lambda: [format_brl.__wrapped__(v) for v in values],
+        "format_brl (cache)": lambda: [format_brl(v) for v in values],
+        "format_brl_column (cache)": lambda: format_brl_column(values),
+    }
+    for name, case in cases.items():
+        best = min(timeit.repeat(case, number=1, repeat=repeat))
+        print(f"{name:28s} {best / cells * 1e9:8.1f} ns/célula")
+
+if __name__ == "__main__":
+    main()
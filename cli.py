@@ -0,0 +1,253 @@
+"""Linha de comando do gerenciador financeiro (sem interface gráfica).
+
+Uso: python -m cli [--data arquivo] [--storage json|journal|sqlite] comando ...
+
+    add-income VALOR DESCRICAO [--bank BANCO]
+    pay-expense MES DESCRICAO [--bank BANCO]
+    process-installments [--month MES]
+    report {month,forecast,cash-flow,banks,categories,year-over-year} [opções]
+    import EXTRATO [--bank BANCO] [--format csv|ofx]
+    export [--format csv|columnar] DESTINO
+    compact
+    batch ARQUIVO        (um comando por linha; '-' lê da entrada padrão)
+
+No modo batch todos os comandos rodam no mesmo processo, dentro de um único
+batch() do FinanceService: o arquivo de dados é gravado uma vez no fim e um
+erro em qualquer linha desfaz todas.
+"""
+import argparse
+import shlex
+import sys
+from datetime import datetime
+
+from backend.services.finance_service import FinanceService
+from frontend.formatting import format_brl
+
+# Serviços opcionais (importação, exportação, relatórios com NumPy) são
+# importados pelos comandos que os usam, para a CLI iniciar rápido.
+
+class CommandError(Exception):
+    pass
+
+class _Parser(argparse.ArgumentParser):
+    # Erros de argumentos viram exceção para o modo batch indicar a linha
+    def error(self, message):
+        raise CommandError(message)
+
+def _brl(value) -> str:
+    return format_brl(float(value))
+
+def _current_month() -> str:
+    return datetime.now().strftime("%Y-%m")
+
+def cmd_add_income(service: FinanceService, args):
+    from backend.services.import_service import parse_amount
+    amount = parse_amount(args.amount)
+    if not service.add_income(amount, args.description, args.bank):
+        raise CommandError("O valor da entrada deve ser positivo")
+    print(f"Entrada de {_brl(amount)} registrada em {args.bank}")
+
+def cmd_pay_expense(service: FinanceService, args):
+    expenses = service.get_expenses(args.month)
+    for index, expense in enumerate(expenses):
+        if expense.description == args.description and not expense.paid:
+            break
+    else:
+        raise CommandError(f"Despesa não paga '{args.description}' não encontrada em {args.month}")
+    if not service.pay_expense(args.month, index, args.bank):
+        raise CommandError(f"Saldo insuficiente em {args.bank} para pagar {_brl(expense.amount)}")
+    print(f"{args.description} ({args.month}) paga: {_brl(expense.amount)}")
+
+def cmd_process_installments(service: FinanceService, args):
+    count = service.process_installments(args.month)
+    print(f"{count} parcelas lançadas")
+
+def cmd_report(service: FinanceService, args):
+    if args.kind == 'month':
+        month_year = args.month or _current_month()
+        summary = service.get_month_summary(month_year)
+        print(f"{month_year}: {summary.count} despesas")
+        print(f"  Pagas    {_brl(summary.paid):>16}")
+        print(f"  A pagar  {_brl(summary.unpaid):>16}")
+        print(f"  Faturas  {_brl(summary.card_invoices):>16}")
+        print(f"  Total    {_brl(summary.total):>16}")
+        return
+
+    if args.kind == 'forecast':
+        from backend.services.forecast_service import ForecastService
+        forecast = ForecastService(service)
+        for month in forecast.forecast(args.months, args.bank):
+            print(f"{month.month_year}  saídas {_brl(month.outflow):>16}  saldo {_brl(month.balance):>16}")
+            if args.verbose:
+                for item in month.items:
+                    day = f"{item.due_day:02d}" if item.due_day else "--"
+                    print(f"    {day}  {_brl(item.amount):>14}  {item.description}")
+        forecast.close()
+        return
+
+    try:
+        from backend.services.analytics_service import AnalyticsService
+        analytics = AnalyticsService(service)
+    except ImportError as error:
+        raise CommandError(str(error))
+    if args.kind == 'cash-flow':
+        for flow in analytics.monthly_cash_flow(args.start, args.end):
+            print(f"{flow.month_year}  entradas {_brl(flow.inflow):>16}  saídas {_brl(flow.outflow):>16}"
+                  f"  saldo {_brl(flow.net):>16}")
+    elif args.kind == 'banks':
+        for flow in analytics.bank_flows(args.start, args.end):
+            print(f"{flow.bank:20s}  entradas {_brl(flow.inflow):>16}  saídas {_brl(flow.outflow):>16}"
+                  f"  saldo {_brl(flow.net):>16}")
+    elif args.kind == 'categories':
+        for total in analytics.category_breakdown(args.start, args.end, top=args.top):
+            print(f"{total.category:30s}  {_brl(total.total):>16}  {total.count:6d}x")
+    else:
+        for row in analytics.year_over_year(args.start, args.end):
+            change = f"{row.change:+.1%}" if row.change is not None else "-"
+            print(f"{row.month_year}  saídas {_brl(row.outflow):>16}  ano anterior {_brl(row.previous_outflow):>16}"
+                  f"  {change:>8}")
+    analytics.close()
+
+def cmd_import(service: FinanceService, args):
+    from backend.services.import_service import StatementImporter
+    result = StatementImporter(service, bank=args.bank).import_file(args.path, args.format)
+    print(f"{result.imported} transações importadas, {result.duplicates} duplicadas ignoradas")
+    if result.skipped:
+        print(f"{result.skipped} linhas inválidas:", *result.errors[:10], sep="\n  ")
+
+def cmd_export(service: FinanceService, args):
+    from backend.services.export_service import Exporter
+    exporter = Exporter(service)
+    if args.format == 'columnar':
+        exporter.export_columnar(args.output)
+        print(f"Histórico exportado para {args.output} ({len(service.get_transaction_history())} transações)")
+    else:
+        for path in exporter.export_csv(args.output):
+            print(path)
+
+def cmd_compact(service: FinanceService, args):
+    service.compact()
+    print("Dados regravados por completo")
+
+def _add_commands(parser: argparse.ArgumentParser):
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    command = commands.add_parser('add-income', help="registra uma entrada na carteira")
+    command.add_argument('amount', help="valor ('1.234,56' ou '1234.56')")
+    command.add_argument('description')
+    command.add_argument('--bank', default="Geral")
+    command.set_defaults(handler=cmd_add_income)
+
+    command = commands.add_parser('pay-expense', help="paga uma despesa do mês, com saída no banco")
+    command.add_argument('month', help="mês da despesa (AAAA-MM)")
+    command.add_argument('description')
+    command.add_argument('--bank', default="Geral")
+    command.set_defaults(handler=cmd_pay_expense)
+
+    command = commands.add_parser('process-installments', help="lança as parcelas até o mês (padrão: atual)")
+    command.add_argument('--month', help="AAAA-MM")
+    command.set_defaults(handler=cmd_process_installments)
+
+    command = commands.add_parser('report', help="resumo do mês, previsão ou relatórios de gastos")
+    command.add_argument('kind', choices=('month', 'forecast', 'cash-flow', 'banks', 'categories',
+                                          'year-over-year'))
+    command.add_argument('--month', help="mês do resumo (AAAA-MM, padrão: atual)")
+    command.add_argument('--start', help="primeiro mês dos relatórios (AAAA-MM)")
+    command.add_argument('--end', help="último mês dos relatórios (AAAA-MM)")
+    command.add_argument('--months', type=int, default=6, help="meses da previsão (padrão: %(default)s)")
+    command.add_argument('--bank', default="Geral", help="banco da previsão")
+    command.add_argument('--top', type=int, default=10, help="categorias exibidas (padrão: %(default)s)")
+    command.add_argument('--verbose', '-v', action='store_true', help="lista os itens da previsão")
+    command.set_defaults(handler=cmd_report)
+
+    command = commands.add_parser('import', help="importa um extrato CSV ou OFX")
+    command.add_argument('path')
+    command.add_argument('--bank', help="banco de todas as linhas (padrão: o do arquivo, ou Geral)")
+    command.add_argument('--format', choices=('csv', 'ofx'), help="padrão: pela extensão")
+    command.set_defaults(handler=cmd_import)
+
+    command = commands.add_parser('export', help="exporta os dados em CSV ou o histórico em formato colunar")
+    command.add_argument('--format', choices=('csv', 'columnar'), default='csv')
+    command.add_argument('output', help="pasta dos CSVs ou arquivo .fcol")
+    command.set_defaults(handler=cmd_export)
+
+    command = commands.add_parser('compact', help="regrava o arquivo de dados por completo (incorpora o journal)")
+    command.set_defaults(handler=cmd_compact)
+    return commands
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = _Parser(prog="cli", description="Gerenciador financeiro pela linha de comando")
+    parser.add_argument('--data', default="data/finance_data.json", help="arquivo de dados (padrão: %(default)s)")
+    parser.add_argument('--storage', choices=('json', 'journal', 'sqlite'),
+                        help="formato do arquivo (padrão: sqlite para .db, senão json)")
+    parser.add_argument('--recent-months', type=int, default=12,
+                        help="json/sqlite: meses de despesas carregados na abertura; os mais antigos "
+                             "são lidos do disco quando usados (padrão: %(default)s)")
+    commands = _add_commands(parser)
+    batch = commands.add_parser('batch', help="executa os comandos de um arquivo, gravando uma única vez")
+    batch.add_argument('path', help="um comando por linha, '#' para comentários; '-' lê da entrada padrão")
+    return parser
+
+def open_repository(args):
+    storage = args.storage or ('sqlite' if args.data.endswith('.db') else 'json')
+    if storage == 'sqlite':
+        from backend.repositories.sqlite_repository import SQLiteRepository
+        return SQLiteRepository(args.data, recent_months=args.recent_months)
+    if storage == 'journal':
+        from backend.repositories.journal_repository import JournalRepository
+        return JournalRepository(args.data)
+    from backend.repositories.json_repository import JSONRepository
+    return JSONRepository(args.data, streaming=True, recent_months=args.recent_months)
+
+def read_batch(path: str) -> list:
+    """Lê e valida o arquivo inteiro antes de executar: [(linha, argumentos)]"""
+    parser = _Parser(prog="batch")
+    _add_commands(parser)
+    f = sys.stdin if path == '-' else open(path, encoding='utf-8')
+    try:
+        lines = []
+        for number, line in enumerate(f, 1):
+            try:
+                words = shlex.split(line, comments=True)
+                if words:
+                    lines.append((number, parser.parse_args(words)))
+            except (CommandError, ValueError) as error:
+                raise CommandError(f"linha {number}: {error}")
+        return lines
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+def run_batch(service: FinanceService, lines: list):
+    with service.batch():
+        for number, args in lines:
+            try:
+                args.handler(service, args)
+            except (CommandError, OSError, ValueError) as error:
+                raise CommandError(f"linha {number}: {error} (nenhuma alteração foi gravada)")
+
+def main(argv=None) -> int:
+    try:
+        args = build_parser().parse_args(argv)
+    except CommandError as error:
+        print(f"Erro: {error}", file=sys.stderr)
+        return 2
+
+    try:
+        lines = read_batch(args.path) if args.command == 'batch' else None
+        service = FinanceService(open_repository(args))
+        try:
+            if lines is not None:
+                run_batch(service, lines)
+            else:
+                args.handler(service, args)
+        finally:
+            service.flush()
+            service.repository.close()
+    except (CommandError, OSError, ValueError) as error:
+        print(f"Erro: {error}", file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
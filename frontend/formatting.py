@@ -0,0 +1,12 @@
+from functools import lru_cache
+from typing import Iterable, List
+
+@lru_cache(maxsize=4096)
+def format_brl(value: float) -> str:
+    """Formata um valor como 'R$ 1.234,56'"""
+    # Agrupando com '_' o milhar não colide com o ponto decimal: bastam duas trocas
+    return f"R$ {value:_.2f}".replace('.', ',').replace('_', '.')
+
+def format_brl_column(values: Iterable[float]) -> List[str]:
+    """Formata uma coluna inteira de valores de uma vez (preenchimento de tabelas)"""
+    return list(map(format_brl, values))
@@ -1,7 +1,13 @@
 import tkinter as tk
-from tkinter import ttk, messagebox, simpledialog
+from tkinter import ttk, messagebox, simpledialog, filedialog
 from datetime import datetime, timedelta
+from backend.repositories.json_repository import JSONRepository
 from backend.services.finance_service import FinanceService
+from backend.services.import_service import StatementImporter
+from backend.services.export_service import Exporter
+from frontend.formatting import format_brl, format_brl_column
+from backend.services.events import (TransactionAdded, TransactionEdited, TransactionRemoved, HistoryCleared,
+                                     BankBalanceChanged, CardUpdated, ExpenseMonthChanged, InstallmentAdvanced)
 
 class FinanceGUI:
     def __init__(self, root):
@@ -13,8 +19,38 @@ class FinanceGUI:
         self.root.lift()
         self.root.focus_force()
         
-        self.finance_service = FinanceService()
+        # Gravações em segundo plano para não travar o mainloop em disco lento; o histórico
+        # é lido em blocos e só o último ano de despesas é carregado na abertura
+        repository = JSONRepository(streaming=True, recent_months=12)
+        self.finance_service = FinanceService(repository, background_save=True)
+        # Lança as parcelas dos meses em que o programa não foi aberto
+        self.finance_service.process_installments()
+        # Linhas exibidas em cada Treeview (iid -> valores), para atualizar só o que mudou
+        self.displayed_rows = {}
+        # Abas com alterações pendentes de redesenho, atualizadas quando o Tk fica ocioso
+        self.dirty_views = set()
+        self.finance_service.subscribe(self.on_finance_changed)
         self.setup_ui()
+        
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.root.after(500, self.check_save_errors)
+    
+    def check_save_errors(self):
+        errors = self.finance_service.pop_save_errors()
+        if errors:
+            messagebox.showerror("Erro ao Salvar", f"Não foi possível gravar os dados:\n{errors[-1]}")
+        self.root.after(500, self.check_save_errors)
+    
+    def on_close(self):
+        # Espera as gravações pendentes antes de fechar
+        self.finance_service.flush()
+        errors = self.finance_service.pop_save_errors()
+        if errors and not messagebox.askyesno(
+            "Erro ao Salvar",
+            f"Não foi possível gravar os dados:\n{errors[-1]}\n\nFechar mesmo assim?"
+        ):
+            return
+        self.root.destroy()
     
     def setup_ui(self):
         self.notebook = ttk.Notebook(self.root)
@@ -58,6 +94,8 @@ class FinanceGUI:
         ttk.Button(button_frame, text="Ver Histórico", command=self.show_history).pack(side='left', padx=5)
         ttk.Button(button_frame, text="Zerar Carteira", command=self.reset_wallet).pack(side='left', padx=5)
         ttk.Button(button_frame, text="Adicionar Banco", command=self.add_bank).pack(side='left', padx=5)
+        ttk.Button(button_frame, text="Importar Extrato", command=self.import_statement).pack(side='left', padx=5)
+        ttk.Button(button_frame, text="Exportar", command=self.export_data).pack(side='left', padx=5)
         
         ttk.Label(self.wallet_frame, text="Últimas Transações:", font=('Arial', 12, 'bold')).pack(pady=(20, 5))
         
@@ -175,79 +213,114 @@ class FinanceGUI:
     def on_month_year_changed(self, event=None):
         self.update_expenses_display()
     
+    def on_finance_changed(self, event):
+        if isinstance(event, (TransactionAdded, TransactionEdited, TransactionRemoved,
+                              HistoryCleared, BankBalanceChanged)):
+            view = 'wallet'
+        elif isinstance(event, (CardUpdated, InstallmentAdvanced)):
+            view = 'cards'
+        elif isinstance(event, ExpenseMonthChanged) and event.month_year == self.get_current_month_year():
+            view = 'expenses'
+        else:
+            return
+        
+        if not self.dirty_views:
+            self.root.after_idle(self.refresh_dirty_views)
+        self.dirty_views.add(view)
+    
+    def refresh_dirty_views(self):
+        views, self.dirty_views = self.dirty_views, set()
+        if 'wallet' in views:
+            self.update_wallet_display()
+        if 'cards' in views:
+            self.update_cards_display()
+        if 'expenses' in views:
+            self.update_expenses_display()
+    
     def update_displays(self):
         self.update_wallet_display()
         self.update_cards_display()
         self.update_expenses_display()
     
+    def sync_tree(self, tree, rows):
+        """Aplica na Treeview apenas as diferenças para a lista (iid, valores) desejada"""
+        shown = self.displayed_rows.setdefault(str(tree), {})
+        wanted = dict(rows)
+        
+        stale = [iid for iid in shown if iid not in wanted]
+        if stale:
+            tree.delete(*stale)
+            for iid in stale:
+                del shown[iid]
+        
+        for position, (iid, values) in enumerate(rows):
+            if iid not in shown:
+                tree.insert('', position, iid=iid, values=values)
+            elif shown[iid] != values:
+                tree.item(iid, values=values)
+            shown[iid] = values
+        
+        # Corrige a ordem apenas se alguma linha mudou de posição
+        order = tuple(iid for iid, _ in rows)
+        if tree.get_children() != order:
+            for position, iid in enumerate(order):
+                tree.move(iid, '', position)
+    
     def update_wallet_display(self):
         balance = self.finance_service.get_balance()
-        self.balance_label.config(text=f"R$ {balance:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.'))
-        
-        for item in self.banks_tree.get_children():
-            self.banks_tree.delete(item)
+        self.balance_label.config(text=format_brl(balance))
         
         banks = self.finance_service.get_banks()
-        for bank in banks:
-            self.banks_tree.insert('', 'end', values=(
-                bank.name,
-                f"R$ {bank.balance:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.')
-            ))
-        
-        for item in self.history_tree.get_children():
-            self.history_tree.delete(item)
-        
-        history = self.finance_service.get_transaction_history()[-8:]
-        for transaction in reversed(history):
-            self.history_tree.insert('', 'end', values=(
-                transaction.date,
-                transaction.type,
-                f"R$ {transaction.amount:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.'),
-                transaction.description,
-                transaction.bank
-            ))
+        self.sync_tree(self.banks_tree, [(bank.name, (
+            bank.name,
+            format_brl(bank.balance)
+        )) for bank in banks])
+        
+        history = self.finance_service.get_transaction_history()
+        start = max(0, len(history) - 8)
+        recent = history[start:]
+        self.sync_tree(self.history_tree, [(str(start + i), (
+            transaction.date,
+            transaction.type,
+            format_brl(transaction.amount),
+            transaction.description,
+            transaction.bank
+        )) for i, transaction in reversed(list(enumerate(recent)))])
     
     def update_cards_display(self):
-        for item in self.cards_tree.get_children():
-            self.cards_tree.delete(item)
-        
         cards = self.finance_service.get_cards()
         
-        for i, card in enumerate(cards):
-            self.cards_tree.insert('', 'end', iid=i, values=(
-                card.name,
-                f"R$ {card.limit:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.'),
-                f"R$ {card.used:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.'),
-                f"R$ {card.calculated_available:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.'),
-                f"R$ {card.available:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.'),
-                card.due_date
-            ))
+        # iid = ID do cartão: excluir um cartão não muda a seleção dos outros
+        self.sync_tree(self.cards_tree, [(card.id, (
+            card.name,
+            format_brl(card.limit),
+            format_brl(card.used),
+            format_brl(card.calculated_available),
+            format_brl(card.available),
+            card.due_date
+        )) for card in cards])
     
     def update_expenses_display(self):
-        for item in self.expenses_tree.get_children():
-            self.expenses_tree.delete(item)
-        
         month_year = self.get_current_month_year()
         expenses = self.finance_service.get_expenses(month_year)
         
-        total_pagar = sum(expense.amount for expense in expenses if not expense.paid)
-        total_pago = sum(expense.amount for expense in expenses if expense.paid)
-        total_geral = total_pagar + total_pago
-        
-        self.pagar_label.config(text=f"À Pagar: R$ {total_pagar:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.'))
-        self.pago_label.config(text=f"Pago: R$ {total_pago:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.'))
-        self.total_label.config(text=f"Total: R$ {total_geral:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.'))
-        
-        for i, expense in enumerate(expenses):
-            paid = "✓" if expense.paid else "✗"
-            recurring = "✓" if expense.recurring else "✗"
-            self.expenses_tree.insert('', 'end', iid=i, values=(
-                expense.description,
-                f"R$ {expense.amount:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.'),
-                expense.due_date,
-                paid,
-                recurring
-            ))
+        summary = self.finance_service.get_month_summary(month_year)
+        total_pagar = summary.unpaid
+        total_pago = summary.paid
+        total_geral = summary.total
+        
+        self.pagar_label.config(text=f"À Pagar: {format_brl(total_pagar)}")
+        self.pago_label.config(text=f"Pago: {format_brl(total_pago)}")
+        self.total_label.config(text=f"Total: {format_brl(total_geral)}")
+        
+        amounts = format_brl_column(expense.amount for expense in expenses)
+        self.sync_tree(self.expenses_tree, [(str(i), (
+            expense.description,
+            amount,
+            expense.due_date,
+            "✓" if expense.paid else "✗",
+            "✓" if expense.recurring else "✗"
+        )) for i, (expense, amount) in enumerate(zip(expenses, amounts))])
 
     def show_banks_context_menu(self, event):
         item = self.banks_tree.identify_row(event.y)
@@ -268,16 +341,7 @@ class FinanceGUI:
             )
             
             if new_balance is not None:
-                banks = self.finance_service.get_banks()
-                for bank in banks:
-                    if bank.name == bank_name:
-                        bank.balance = new_balance
-                        break
-                
-                total_balance = sum(bank.balance for bank in banks)
-                self.finance_service.wallet.balance = total_balance
-                self.finance_service.save_data()
-                self.update_wallet_display()
+                self.finance_service.set_bank_balance(bank_name, new_balance)
                 messagebox.showinfo("Sucesso", f"Saldo do {bank_name} atualizado!")
     
     def delete_bank(self):
@@ -295,17 +359,7 @@ class FinanceGUI:
             )
             
             if confirm:
-                for transaction in self.finance_service.wallet.history:
-                    if transaction.bank == bank_name:
-                        transaction.bank = "Geral"
-                
-                self.finance_service.wallet.banks = [
-                    bank for bank in self.finance_service.wallet.banks 
-                    if bank.name != bank_name
-                ]
-                
-                self.finance_service.save_data()
-                self.update_wallet_display()
+                self.finance_service.delete_bank(bank_name)
                 messagebox.showinfo("Sucesso", f"Banco {bank_name} excluído!")
 
     def add_income(self):
@@ -330,7 +384,6 @@ class FinanceGUI:
                     bank_window.destroy()
                     success = self.finance_service.add_income(amount, description, bank)
                     if success:
-                        self.update_wallet_display()
                         messagebox.showinfo("Sucesso", "Entrada registrada com sucesso!")
                 
                 ttk.Button(bank_window, text="Confirmar", command=confirm_bank).pack(pady=10)
@@ -346,7 +399,6 @@ class FinanceGUI:
             if description:
                 success = self.finance_service.add_expense(amount, description)
                 if success:
-                    self.update_wallet_display()
                     messagebox.showinfo("Sucesso", "Saída registrada com sucesso!")
 
     def ask_float_front(self, title, prompt):
@@ -415,27 +467,165 @@ class FinanceGUI:
     def show_history(self):
         history_window = tk.Toplevel(self.root)
         history_window.title("Histórico Completo")
-        history_window.geometry("700x400")
+        history_window.geometry("760x460")
         history_window.transient(self.root)
         
+        # Filtros aplicados no serviço; a janela só busca as linhas visíveis
+        filter_frame = ttk.Frame(history_window)
+        filter_frame.pack(fill='x', padx=10, pady=(10, 0))
+        
+        ttk.Label(filter_frame, text="De:").pack(side='left')
+        start_var = tk.StringVar()
+        ttk.Entry(filter_frame, textvariable=start_var, width=11).pack(side='left', padx=(2, 8))
+        ttk.Label(filter_frame, text="Até:").pack(side='left')
+        end_var = tk.StringVar()
+        ttk.Entry(filter_frame, textvariable=end_var, width=11).pack(side='left', padx=(2, 8))
+        
+        type_var = tk.StringVar(value="Todos")
+        ttk.Combobox(filter_frame, textvariable=type_var, values=["Todos", "Entrada", "Saída"],
+                     state="readonly", width=8).pack(side='left', padx=(0, 8))
+        bank_var = tk.StringVar(value="Todos")
+        banks = ["Todos"] + [b.name for b in self.finance_service.get_banks()]
+        ttk.Combobox(filter_frame, textvariable=bank_var, values=banks,
+                     state="readonly", width=12).pack(side='left', padx=(0, 8))
+        
+        ttk.Label(filter_frame, text="Buscar:").pack(side='left')
+        text_var = tk.StringVar()
+        text_entry = ttk.Entry(filter_frame, textvariable=text_var, width=16)
+        text_entry.pack(side='left', padx=(2, 8))
+        
+        count_label = ttk.Label(history_window, text="")
+        
+        table_frame = ttk.Frame(history_window)
+        table_frame.pack(fill='both', expand=True, padx=10, pady=10)
+        
         columns = ('Data', 'Tipo', 'Valor', 'Descrição', 'Banco')
-        tree = ttk.Treeview(history_window, columns=columns, show='headings')
+        sort_keys = {'Data': 'date', 'Tipo': 'type', 'Valor': 'amount', 'Descrição': 'description', 'Banco': 'bank'}
+        tree = ttk.Treeview(table_frame, columns=columns, show='headings', selectmode='browse')
+        scrollbar = ttk.Scrollbar(table_frame, orient='vertical')
+        scrollbar.pack(side='right', fill='y')
+        tree.pack(side='left', fill='both', expand=True)
+        count_label.pack(anchor='w', padx=10, pady=(0, 10))
+        
+        row_height = int(ttk.Style().lookup('Treeview', 'rowheight') or 20)
+        state = {'indices': range(0), 'offset': 0, 'visible': 0, 'sort_by': 'date',
+                 'descending': True, 'cache': {}}
+        page_size = 100
+        
+        def row_values(position):
+            # Busca em páginas e guarda só as vizinhas da posição atual
+            page = position // page_size
+            cache = state['cache']
+            if page not in cache:
+                for old_page in [p for p in cache if abs(p - page) > 2]:
+                    del cache[old_page]
+                indices = state['indices'][page * page_size:(page + 1) * page_size]
+                transactions = self.finance_service.get_transactions(indices)
+                amounts = format_brl_column(transaction.amount for transaction in transactions)
+                cache[page] = [(
+                    transaction.date,
+                    transaction.type,
+                    amount,
+                    transaction.description,
+                    transaction.bank
+                ) for transaction, amount in zip(transactions, amounts)]
+            return cache[page][position % page_size]
+        
+        def render():
+            total = len(state['indices'])
+            visible = state['visible']
+            offset = max(0, min(state['offset'], total - visible))
+            state['offset'] = offset
+            
+            # Reaproveita os mesmos itens da Treeview, trocando apenas os valores
+            items = tree.get_children()
+            rows = min(visible, total - offset)
+            for i in range(rows):
+                values = row_values(offset + i)
+                if i < len(items):
+                    tree.item(items[i], values=values)
+                else:
+                    tree.insert('', 'end', iid=str(i), values=values)
+            if len(items) > rows:
+                tree.delete(*items[rows:])
+            
+            if total:
+                scrollbar.set(offset / total, min(1.0, (offset + visible) / total))
+            else:
+                scrollbar.set(0.0, 1.0)
+            count_label.config(text=f"{total} transações")
+        
+        def scroll_to(offset):
+            state['offset'] = int(offset)
+            render()
+        
+        def on_scrollbar(action, value, unit=None):
+            if action == 'moveto':
+                scroll_to(float(value) * len(state['indices']))
+            elif unit == 'pages':
+                scroll_to(state['offset'] + int(value) * max(1, state['visible'] - 1))
+            else:
+                scroll_to(state['offset'] + int(value))
+        
+        def on_mousewheel(event):
+            if event.num == 4 or event.delta > 0:
+                scroll_to(state['offset'] - 3)
+            else:
+                scroll_to(state['offset'] + 3)
+            return "break"
+        
+        def on_resize(event):
+            visible = max(1, (event.height - row_height) // row_height)
+            if visible != state['visible']:
+                state['visible'] = visible
+                render()
+        
+        def parse_day(text):
+            return datetime.strptime(text.strip(), "%d/%m/%Y") if text.strip() else None
+        
+        def apply_filters(event=None):
+            try:
+                start = parse_day(start_var.get())
+                end = parse_day(end_var.get())
+            except ValueError:
+                messagebox.showerror("Erro", "Data inválida! Use dd/mm/aaaa.")
+                return
+            state['indices'] = self.finance_service.query_history(
+                start=start,
+                end=end + timedelta(days=1) if end else None,
+                transaction_type=None if type_var.get() == "Todos" else type_var.get(),
+                bank=None if bank_var.get() == "Todos" else bank_var.get(),
+                text=text_var.get().strip() or None,
+                sort_by=state['sort_by'],
+                descending=state['descending']
+            )
+            state['cache'] = {}
+            state['offset'] = 0
+            render()
+        
+        def sort_by_column(col):
+            key = sort_keys[col]
+            if state['sort_by'] == key:
+                state['descending'] = not state['descending']
+            else:
+                state['sort_by'] = key
+                state['descending'] = key in ('date', 'amount')
+            apply_filters()
         
         for col in columns:
-            tree.heading(col, text=col)
+            tree.heading(col, text=col, command=lambda c=col: sort_by_column(c))
             tree.column(col, width=120)
         
-        tree.pack(fill='both', expand=True, padx=10, pady=10)
+        ttk.Button(filter_frame, text="Filtrar", command=apply_filters).pack(side='left')
+        text_entry.bind('<Return>', apply_filters)
         
-        history = self.finance_service.get_transaction_history()
-        for transaction in reversed(history):
-            tree.insert('', 'end', values=(
-                transaction.date,
-                transaction.type,
-                f"R$ {transaction.amount:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.'),
-                transaction.description,
-                transaction.bank
-            ))
+        scrollbar.config(command=on_scrollbar)
+        tree.bind('<Configure>', on_resize)
+        tree.bind('<MouseWheel>', on_mousewheel)
+        tree.bind('<Button-4>', on_mousewheel)
+        tree.bind('<Button-5>', on_mousewheel)
+        
+        apply_filters()
     
     def reset_wallet(self):
         confirm = messagebox.askyesno(
@@ -448,7 +638,6 @@ class FinanceGUI:
         if confirm:
             success = self.finance_service.reset_wallet()
             if success:
-                self.update_wallet_display()
                 messagebox.showinfo("Sucesso", "Carteira zerada com sucesso!")
     
     def add_bank(self):
@@ -456,9 +645,63 @@ class FinanceGUI:
         if bank_name:
             success = self.finance_service.add_bank(bank_name)
             if success:
-                self.update_wallet_display()
                 messagebox.showinfo("Sucesso", "Banco adicionado com sucesso!")
     
+    def import_statement(self):
+        path = filedialog.askopenfilename(
+            title="Importar Extrato",
+            filetypes=[("Extratos (CSV, OFX)", "*.csv *.ofx *.qfx"), ("Todos os arquivos", "*.*")]
+        )
+        if not path:
+            return
+        bank = self.ask_string_front("Importar Extrato", "Banco (vazio = do arquivo ou Geral):")
+        if bank is None:
+            return
+        
+        try:
+            result = StatementImporter(self.finance_service, bank=bank.strip() or None).import_file(path)
+        except (OSError, ValueError) as error:
+            messagebox.showerror("Erro", f"Não foi possível importar o extrato:\n{error}")
+            return
+        
+        message = f"{result.imported} transações importadas, {result.duplicates} duplicadas ignoradas."
+        if result.skipped:
+            message += f"\n\n{result.skipped} linhas inválidas:\n" + "\n".join(result.errors[:10])
+        messagebox.showinfo("Importação", message)
+    
+    def export_data(self):
+        columnar = messagebox.askyesnocancel(
+            "Exportar",
+            "Exportar o histórico em formato colunar (.fcol) para análise?\n\n"
+            "Não = exportar tudo em CSV (histórico, despesas, cartões e parcelas)"
+        )
+        if columnar is None:
+            return
+        
+        exporter = Exporter(self.finance_service)
+        try:
+            if columnar:
+                path = filedialog.asksaveasfilename(
+                    title="Exportar Histórico",
+                    defaultextension=".fcol",
+                    filetypes=[("Histórico colunar", "*.fcol")]
+                )
+                if not path:
+                    return
+                exporter.export_columnar(path)
+                message = f"Histórico exportado para {path}"
+            else:
+                directory = filedialog.askdirectory(title="Pasta para os CSVs")
+                if not directory:
+                    return
+                paths = exporter.export_csv(directory)
+                message = "Arquivos gerados:\n" + "\n".join(paths)
+        except OSError as error:
+            messagebox.showerror("Erro", f"Não foi possível exportar:\n{error}")
+            return
+        
+        messagebox.showinfo("Exportação", message)
+    
     def show_history_context_menu(self, event):
         item = self.history_tree.identify_row(event.y)
         if item:
@@ -517,7 +760,6 @@ class FinanceGUI:
                             )
                             
                             if success:
-                                self.update_wallet_display()
                                 edit_window.destroy()
                                 messagebox.showinfo("Sucesso", "Transação editada com sucesso!")
                         except ValueError:
@@ -548,29 +790,7 @@ class FinanceGUI:
                     )
                     
                     if confirm:
-                        del self.finance_service.wallet.history[actual_index]
-                        
-                        self.finance_service.wallet.balance = 0.0
-                        for bank in self.finance_service.wallet.banks:
-                            bank.balance = 0.0
-                        
-                        for trans in self.finance_service.wallet.history:
-                            if trans.type == "Entrada":
-                                self.finance_service.wallet.balance += trans.amount
-                                for bank in self.finance_service.wallet.banks:
-                                    if bank.name == trans.bank:
-                                        bank.balance += trans.amount
-                                        break
-                            else:
-                                self.finance_service.wallet.balance -= trans.amount
-                                if trans.bank != "Geral":
-                                    for bank in self.finance_service.wallet.banks:
-                                        if bank.name == trans.bank:
-                                            bank.balance -= trans.amount
-                                            break
-                        
-                        self.finance_service.save_data()
-                        self.update_wallet_display()
+                        self.finance_service.delete_transaction(actual_index)
                         messagebox.showinfo("Sucesso", "Transação excluída!")
                         
             except ValueError:
@@ -604,32 +824,28 @@ class FinanceGUI:
                     due_date_window.destroy()
                     success = self.finance_service.add_card(name, limit, due_date)
                     if success:
-                        self.update_cards_display()
                         messagebox.showinfo("Sucesso", "Cartão adicionado com sucesso!")
+                    else:
+                        messagebox.showerror("Erro", f"Já existe um cartão chamado {name}!")
                 
                 ttk.Button(due_date_window, text="Confirmar", command=confirm_due_date).pack(pady=10)
     
     def pay_card_invoice(self):
         selection = self.cards_tree.selection()
-        if selection:
-            card_index = int(selection[0])
-            card = self.finance_service.get_cards()[card_index]
-            
+        card = self.finance_service.get_card(selection[0]) if selection else None
+        if card is not None:
             if card.used == 0:
                 messagebox.showinfo("Info", "Não há fatura para pagar!")
                 return
             
             confirm = messagebox.askyesno(
                 "Confirmar Pagamento", 
-                f"Pagar fatura de R$ {card.used:,.2f} do cartão {card.name}?"
+                f"Pagar fatura de {format_brl(card.used)} do cartão {card.name}?"
             )
             
             if confirm:
-                success = self.finance_service.pay_card_invoice(card_index)
+                success = self.finance_service.pay_card_invoice(card.id)
                 if success:
-                    self.update_cards_display()
-                    self.update_wallet_display()
-                    self.update_expenses_display()
                     messagebox.showinfo("Sucesso", "Fatura paga com sucesso!")
                 else:
                     messagebox.showerror("Erro", "Saldo insuficiente para pagar a fatura!")
@@ -690,8 +906,6 @@ class FinanceGUI:
                 )
                 
                 if success:
-                    self.update_cards_display()
-                    self.update_expenses_display()
                     installment_window.destroy()
                     messagebox.showinfo("Sucesso", f"Compra parcelada em {installments}x adicionada!")
             except ValueError:
@@ -709,67 +923,55 @@ class FinanceGUI:
     
     def edit_card_used(self):
         if hasattr(self, 'selected_card_item'):
-            card_index = int(self.selected_card_item)
-            cards = self.finance_service.get_cards()
+            card = self.finance_service.get_card(self.selected_card_item)
             
-            if 0 <= card_index < len(cards):
-                card = cards[card_index]
+            if card is not None:
                 new_used = self.ask_float_front(
                     "Editar Limite Usado", 
                     f"Limite usado para {card.name}:"
                 )
                 if new_used is not None and new_used >= 0:
                     month_year = self.get_current_month_year()
-                    success = self.finance_service.update_card_usage(card_index, new_used, month_year)
+                    success = self.finance_service.update_card_usage(card.id, new_used, month_year)
                     if success:
-                        self.update_cards_display()
-                        self.update_expenses_display()
                         messagebox.showinfo("Sucesso", "Limite usado atualizado!")
     
     def edit_card_limit(self):
         if hasattr(self, 'selected_card_item'):
-            card_index = int(self.selected_card_item)
-            cards = self.finance_service.get_cards()
+            card = self.finance_service.get_card(self.selected_card_item)
             
-            if 0 <= card_index < len(cards):
-                card = cards[card_index]
+            if card is not None:
                 new_limit = self.ask_float_front(
                     "Editar Limite Total", 
                     f"Limite total para {card.name}:"
                 )
                 if new_limit is not None and new_limit > 0:
-                    success = self.finance_service.update_card_limit(card_index, new_limit)
+                    success = self.finance_service.update_card_limit(card.id, new_limit)
                     if success:
-                        self.update_cards_display()
                         messagebox.showinfo("Sucesso", "Limite total atualizado!")
     
     def edit_card_available(self):
         if hasattr(self, 'selected_card_item'):
-            card_index = int(self.selected_card_item)
-            cards = self.finance_service.get_cards()
+            card = self.finance_service.get_card(self.selected_card_item)
             
-            if 0 <= card_index < len(cards):
-                card = cards[card_index]
+            if card is not None:
                 new_available = self.ask_float_front(
                     "Ajustar Limite Disponível", 
                     f"Limite disponível ajustado para {card.name}:\n\n"
-                    f"Limite Total: R$ {card.limit:,.2f}\n"
-                    f"Limite Usado: R$ {card.used:,.2f}\n"
-                    f"Disponível Calculado: R$ {card.calculated_available:,.2f}"
+                    f"Limite Total: {format_brl(card.limit)}\n"
+                    f"Limite Usado: {format_brl(card.used)}\n"
+                    f"Disponível Calculado: {format_brl(card.calculated_available)}"
                 )
                 if new_available is not None and new_available >= 0:
-                    success = self.finance_service.update_card_available(card_index, new_available)
+                    success = self.finance_service.update_card_available(card.id, new_available)
                     if success:
-                        self.update_cards_display()
                         messagebox.showinfo("Sucesso", "Limite disponível ajustado!")
     
     def edit_card_due_date(self):
         if hasattr(self, 'selected_card_item'):
-            card_index = int(self.selected_card_item)
-            cards = self.finance_service.get_cards()
+            card = self.finance_service.get_card(self.selected_card_item)
             
-            if 0 <= card_index < len(cards):
-                card = cards[card_index]
+            if card is not None:
                 current_day = card.due_date.split('/')[0] if '/' in card.due_date else "10"
                 
                 due_date_window = tk.Toplevel(self.root)
@@ -793,28 +995,24 @@ class FinanceGUI:
                 def confirm_new_due_date():
                     new_due_date = f"{day_var.get()}/mm"
                     due_date_window.destroy()
-                    success = self.finance_service.update_card_due_date(card_index, new_due_date)
+                    success = self.finance_service.update_card_due_date(card.id, new_due_date)
                     if success:
-                        self.update_cards_display()
                         messagebox.showinfo("Sucesso", "Data da fatura atualizada!")
                 
                 ttk.Button(due_date_window, text="Confirmar", command=confirm_new_due_date).pack(pady=10)
     
     def delete_card(self):
         if hasattr(self, 'selected_card_item'):
-            card_index = int(self.selected_card_item)
-            cards = self.finance_service.get_cards()
+            card = self.finance_service.get_card(self.selected_card_item)
             
-            if 0 <= card_index < len(cards):
-                card = cards[card_index]
+            if card is not None:
                 confirm = messagebox.askyesno(
                     "Confirmar Exclusão", 
                     f"Tem certeza que deseja excluir o cartão {card.name}?"
                 )
                 if confirm:
-                    success = self.finance_service.delete_card(card_index)
+                    success = self.finance_service.delete_card(card.id)
                     if success:
-                        self.update_cards_display()
                         messagebox.showinfo("Sucesso", "Cartão excluído!")
 
     def add_monthly_expense(self):
@@ -872,7 +1070,6 @@ class FinanceGUI:
                         month_year, description, amount, due_date, recurring, end_date
                     )
                     if success:
-                        self.update_expenses_display()
                         messagebox.showinfo("Sucesso", "Despesa adicionada com sucesso!")
                 
                 ttk.Button(expense_window, text="Adicionar", command=confirm_expense).pack(pady=20)
@@ -919,7 +1116,7 @@ class FinanceGUI:
                     bank_window.grab_set()
                     
                     ttk.Label(bank_window, text=f"Pagando: {expense.description}").pack(pady=5)
-                    ttk.Label(bank_window, text=f"Valor: R$ {expense.amount:,.2f}").pack(pady=5)
+                    ttk.Label(bank_window, text=f"Valor: {format_brl(expense.amount)}").pack(pady=5)
                     ttk.Label(bank_window, text="Banco:").pack(pady=5)
                     
                     bank_var = tk.StringVar(value=banks[0] if banks else "Geral")
@@ -930,34 +1127,16 @@ class FinanceGUI:
                         bank = bank_var.get()
                         bank_window.destroy()
                         
-                        from backend.models.wallet import Transaction
-                        
-                        transaction = Transaction(
-                            date=datetime.now().strftime("%d/%m/%Y %H:%M"),
-                            type="Saída",
-                            amount=expense.amount,
-                            description=expense.description,
-                            bank=bank
-                        )
-                        
-                        bank_balance = self.finance_service.get_bank_balance(bank)
-                        if expense.amount > bank_balance:
+                        success = self.finance_service.pay_expense(month_year, item_index, bank)
+                        if not success:
                             messagebox.showerror("Erro", f"Saldo insuficiente no {bank}!")
                             return
                         
-                        self.finance_service.wallet.add_transaction(transaction)
-                        expense.paid = True
-                        self.finance_service.save_data()
-                        
-                        self.update_expenses_display()
-                        self.update_wallet_display()
                         messagebox.showinfo("Sucesso", "Despesa paga com sucesso!")
                     
                     ttk.Button(bank_window, text="Confirmar Pagamento", command=confirm_payment).pack(pady=10)
                 else:
-                    expense.paid = False
-                    self.finance_service.save_data()
-                    self.update_expenses_display()
+                    self.finance_service.toggle_expense_paid(month_year, item_index)
                     messagebox.showinfo("Sucesso", "Despesa marcada como não paga!")
     
     def edit_expense_amount(self):
@@ -975,7 +1154,6 @@ class FinanceGUI:
                 if new_amount is not None and new_amount > 0:
                     success = self.finance_service.update_expense_amount(month_year, item_index, new_amount)
                     if success:
-                        self.update_expenses_display()
                         messagebox.showinfo("Sucesso", "Valor da despesa atualizado!")
     
     def edit_expense_due_date(self):
@@ -1011,7 +1189,6 @@ class FinanceGUI:
                     due_date_window.destroy()
                     success = self.finance_service.update_expense_due_date(month_year, item_index, new_due_date)
                     if success:
-                        self.update_expenses_display()
                         messagebox.showinfo("Sucesso", "Data de vencimento atualizada!")
                 
                 ttk.Button(due_date_window, text="Confirmar", command=confirm_new_due_date).pack(pady=10)
@@ -1031,7 +1208,6 @@ class FinanceGUI:
                 if new_description:
                     success = self.finance_service.update_expense_description(month_year, item_index, new_description)
                     if success:
-                        self.update_expenses_display()
                         messagebox.showinfo("Sucesso", "Descrição atualizada!")
     
     def delete_expense(self):
@@ -1049,7 +1225,6 @@ class FinanceGUI:
                 if confirm:
                     success = self.finance_service.delete_expense(month_year, item_index)
                     if success:
-                        self.update_expenses_display()
                         messagebox.showinfo("Sucesso", "Despesa excluída!")
 
 def main():
@@ -0,0 +1,4 @@
+import pytest
+
+# Mensagens detalhadas também nas checagens compartilhadas entre os testes
+pytest.register_assert_rewrite("tests.invariants")
@@ -0,0 +1,243 @@
+"""Sequência de alterações do FinanceService usada pelos testes de índices.
+
+Cada índice ou agregado mantido incrementalmente tem uma checagem que o
+compara com o recálculo completo; run_mutations a aplica depois de cada
+alteração e run_rollback depois de um batch() desfeito.
+"""
+import copy
+from datetime import datetime
+
+import pytest
+
+from backend.models.expenses import MonthSummary
+from backend.models.wallet import Transaction, to_timestamp
+from backend.repositories.json_repository import JSONRepository
+from backend.services.events import (BankBalanceChanged, CardUpdated, ExpenseMonthChanged, HistoryCleared,
+                                     TransactionAdded, TransactionEdited, TransactionRemoved)
+from backend.services.finance_service import FinanceService
+
+OLD_MONTH = "2024-05"
+
+
+def open_service(tmp_path, name="data.json") -> FinanceService:
+    return FinanceService(JSONRepository(str(tmp_path / name), sync_delay=0))
+
+
+def _card(service, name):
+    return service.get_card_by_name(name).id
+
+
+def _current_month():
+    return datetime.now().strftime("%Y-%m")
+
+
+MUTATIONS = [
+    ("add_income", lambda s: s.add_income(1000, "Salário", "Geral")),
+    ("add_income com banco novo", lambda s: s.add_income(500, "Freela", "Nubank")),
+    ("add_bank", lambda s: s.add_bank("Inter")),
+    ("add_income no Inter", lambda s: s.add_income(70, "Pix", "Inter")),
+    ("add_expense", lambda s: s.add_expense(120, "Mercado")),
+    ("add_transactions fora de ordem", lambda s: s.add_transactions([
+        Transaction("01/02/2024 10:00", "Entrada", 40, "Antiga", "Caixa"),
+        Transaction("15/01/2024 09:00", "Saída", 15, "Café", "Nubank")])),
+    ("edit_transaction", lambda s: s.edit_transaction(1, 450, "Freela editado", "Inter")),
+    ("delete_transaction", lambda s: s.delete_transaction(0)),
+    ("add_card", lambda s: s.add_card("Visa", 2000, "10/mm")),
+    ("add_card com o mesmo slug", lambda s: s.add_card("VISA", 800, "20/mm")),
+    ("add_installment", lambda s: s.add_installment("TV", 600, 3, "Visa")),
+    ("update_card_usage", lambda s: s.update_card_usage(_card(s, "VISA"), 200, _current_month())),
+    ("update_card_available", lambda s: s.update_card_available(_card(s, "Visa"), 1500)),
+    ("update_card_limit", lambda s: s.update_card_limit(_card(s, "Visa"), 2500)),
+    ("update_card_due_date", lambda s: s.update_card_due_date(_card(s, "Visa"), "12/mm")),
+    ("add_expense_monthly", lambda s: s.add_expense_monthly(OLD_MONTH, "Luz", 90, "10/mm")),
+    ("add_expense_monthly fatura", lambda s: s.add_expense_monthly(OLD_MONTH, "Fatura Visa", 50, "10/mm")),
+    ("add_expense_monthly recorrente", lambda s: s.add_expense_monthly(OLD_MONTH, "Internet", 100, "15/mm",
+                                                                       recurring=True)),
+    ("toggle_expense_paid", lambda s: s.toggle_expense_paid(OLD_MONTH, 0)),
+    ("pay_expense", lambda s: s.pay_expense(OLD_MONTH, 2, "Inter")),
+    ("update_expense_amount", lambda s: s.update_expense_amount(OLD_MONTH, 1, 60)),
+    ("update_expense_due_date", lambda s: s.update_expense_due_date(OLD_MONTH, 1, "11/mm")),
+    ("update_expense_description", lambda s: s.update_expense_description(OLD_MONTH, 0, "Luz e gás")),
+    ("get_expenses de mês da regra", lambda s: s.get_expenses("2024-07")),
+    ("delete_expense", lambda s: s.delete_expense("2024-07", 0)),
+    ("process_installments", lambda s: s.process_installments()),
+    ("pay_card_invoice", lambda s: s.pay_card_invoice(_card(s, "VISA"))),
+    ("delete_bank", lambda s: s.delete_bank("Inter")),
+    ("recompute_balances", lambda s: s.recompute_balances()),
+    ("delete_card", lambda s: s.delete_card(_card(s, "Visa"))),
+    ("reset_wallet", lambda s: s.reset_wallet()),
+]
+
+
+def run_mutations(service: FinanceService, check):
+    """Aplica cada alteração e confere os índices logo depois"""
+    for name, mutate in MUTATIONS:
+        mutate(service)
+        try:
+            check(service)
+        except AssertionError as error:
+            raise AssertionError(f"depois de {name}: {error}") from error
+
+
+def run_rollback(service: FinanceService, check):
+    """Desfaz todas as alterações num batch() e confere os índices restaurados"""
+    before = service._to_dict()
+    with pytest.raises(RuntimeError):
+        with service.batch():
+            for _, mutate in MUTATIONS:
+                mutate(service)
+            raise RuntimeError("desfaz")
+    assert service._to_dict() == before
+    check(service)
+    # Os índices restaurados continuam sendo mantidos nas alterações seguintes
+    service.add_income(10, "Depois do rollback", "Nubank")
+    service.add_expense_monthly(OLD_MONTH, "Depois do rollback", 5, "01/mm")
+    check(service)
+
+
+def check_bank_index(service: FinanceService):
+    wallet = service.wallet
+    assert set(wallet._bank_index) == {bank.name for bank in wallet.banks}
+    assert all(wallet._bank_index[bank.name] is bank for bank in wallet.banks)
+
+
+def check_balances(service: FinanceService):
+    # Recalcula numa cópia: o serviço não pode ser corrigido pela própria checagem
+    wallet = copy.deepcopy(service.wallet)
+    assert wallet.recompute_balances(), "saldos diferentes do recálculo pelo histórico"
+
+
+def check_month_summaries(service: FinanceService):
+    for month_year, summary in service._month_summaries.items():
+        expected = MonthSummary()
+        for expense in service.expenses.get(month_year, []):
+            expected.include(expense)
+        assert summary == expected, f"resumo de {month_year}"
+    # Os meses ainda sem resumo passam a tê-lo, para as próximas alterações o manterem
+    for month_year in list(service.expenses):
+        service.get_month_summary(month_year)
+
+
+def check_expense_indexes(service: FinanceService):
+    expected_index, expected_invoices = {}, {}
+    for month_year, expenses in service.expenses.items():
+        for expense in expenses:
+            expected_index.setdefault(month_year, {}).setdefault(expense.description, expense)
+            if expense.description.startswith("Fatura "):
+                expected_invoices.setdefault(expense.description[len("Fatura "):], set()).add(month_year)
+
+    index = {month: entries for month, entries in service._expense_index.items() if entries}
+    assert index.keys() == expected_index.keys()
+    for month_year, entries in expected_index.items():
+        assert entries.keys() == index[month_year].keys(), f"descrições de {month_year}"
+        assert all(index[month_year][key] is expense for key, expense in entries.items()), month_year
+    invoices = {card: months for card, months in service._invoice_months.items() if months}
+    assert invoices == expected_invoices
+
+
+def _expected_between(history, start, end):
+    timestamps = history.columns()['timestamps']
+    return sorted((i for i in range(len(history)) if start <= timestamps[i] < end),
+                  key=lambda i: (timestamps[i], i))
+
+
+def check_history_order(service: FinanceService):
+    history = service.wallet.history
+    timestamps = list(history.columns()['timestamps'])
+    if history._in_order:
+        assert timestamps == sorted(timestamps), "marcado em ordem com datas fora de ordem"
+    bounds = sorted(set(timestamps)) or [0]
+    windows = [(bounds[0], bounds[-1] + 1), (bounds[0] - 1, bounds[0]), (bounds[len(bounds) // 2], bounds[-1])]
+    for start, end in windows:
+        assert list(history.indices_between(start, end)) == _expected_between(history, start, end), (start, end)
+
+
+_SORT_KEYS = {
+    'amount': lambda t: t.amount.cents,
+    'description': lambda t: t.description.casefold(),
+    'type': lambda t: t.type,
+    'bank': lambda t: t.bank.casefold(),
+}
+
+
+def expected_query(service: FinanceService, start=None, end=None, transaction_type=None, bank=None, text=None,
+                   sort_by='date', descending=True):
+    """query_history recalculado percorrendo as transações"""
+    history = list(service.get_transaction_history())
+    start = to_timestamp(start) if start is not None else None
+    end = to_timestamp(end) if end is not None else None
+    indices = [i for i in sorted(range(len(history)), key=lambda i: (history[i].timestamp, i))
+               if (start is None or history[i].timestamp >= start)
+               and (end is None or history[i].timestamp < end)
+               and (transaction_type is None or history[i].type == transaction_type)
+               and (bank is None or history[i].bank == bank)
+               and (not text or text.casefold() in history[i].description.casefold())]
+    if sort_by == 'date':
+        return indices[::-1] if descending else indices
+    return sorted(indices, key=lambda i: _SORT_KEYS[sort_by](history[i]), reverse=descending)
+
+
+QUERIES = [
+    {},
+    {'descending': False},
+    {'transaction_type': "Entrada"},
+    {'bank': "Nubank", 'sort_by': 'amount'},
+    {'text': "PIX", 'sort_by': 'description', 'descending': False},
+    {'start': datetime(2024, 1, 1), 'end': datetime(2024, 2, 1), 'sort_by': 'bank'},
+    {'transaction_type': "Saída", 'sort_by': 'type'},
+]
+
+
+def check_history_queries(service: FinanceService):
+    for query in QUERIES:
+        assert list(service.query_history(**query)) == expected_query(service, **query), query
+
+
+class EventMirror:
+    """Cópia do estado mantida só pelos eventos publicados, como faria a interface"""
+
+    def __init__(self, service: FinanceService):
+        self.service = service
+        self.history = list(service.get_transaction_history())
+        self.banks = service._banks_to_list()
+        self.cards = service._cards_to_list()
+        self.months = {}
+        self.events = []
+        self.unsubscribe = service.subscribe(self.on_event)
+
+    def on_event(self, event):
+        self.events.append(event)
+        if isinstance(event, TransactionAdded):
+            assert event.index == len(self.history)
+            self.history.append(event.transaction)
+        elif isinstance(event, TransactionEdited):
+            self.history[event.index] = event.transaction
+        elif isinstance(event, TransactionRemoved):
+            del self.history[event.index]
+        elif isinstance(event, HistoryCleared):
+            self.history = []
+        elif isinstance(event, BankBalanceChanged):
+            self.banks = self.service._banks_to_list()
+        elif isinstance(event, CardUpdated):
+            self.cards = self.service._cards_to_list()
+        elif isinstance(event, ExpenseMonthChanged):
+            self.months[event.month_year] = self.service._month_to_list(event.month_year)
+
+    def check(self, service: FinanceService):
+        assert self.history == list(service.get_transaction_history())
+        assert self.banks == service._banks_to_list()
+        assert self.cards == service._cards_to_list()
+        for month, expenses in self.months.items():
+            assert expenses == service._month_to_list(month), month
+
+
+def check_card_index(service: FinanceService):
+    ids = [card.id for card in service.cards]
+    assert all(ids) and len(set(ids)) == len(ids), ids
+    by_name = {}
+    for card in service.cards:
+        by_name.setdefault(card.name, card)
+    assert service._cards_by_id.keys() == set(ids)
+    assert all(service._cards_by_id[card.id] is card for card in service.cards)
+    assert service._cards_by_name.keys() == by_name.keys()
+    assert all(service._cards_by_name[name] is card for name, card in by_name.items())
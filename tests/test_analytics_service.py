@@ -0,0 +1,61 @@
+import json
+
+import pytest
+
+from backend.models.money import Money
+from backend.repositories.json_repository import JSONRepository
+from backend.services.finance_service import FinanceService
+
+pytest.importorskip("numpy")
+from backend.services.analytics_service import AnalyticsService  # noqa: E402
+
+
+def _write_data(path):
+    data = {
+        'wallet': {'balance': 0.0, 'history': [], 'banks': []},
+        'cards': [],
+        'expenses': {
+            "2019-01": [{'description': "Luz", 'amount': 21.0, 'due_date': "10/mm", 'paid': True}],
+        },
+        'installments': [],
+        'recurring': [
+            {'description': "Internet", 'amount': 100.0, 'due_date': "15/mm", 'start_month': "2019-01",
+             'end_date': "2019-03", 'skipped_months': ["2019-02"]},
+        ],
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+
+
+def _state(service):
+    return (sorted(service.expenses), sorted(service._materialized), sorted(service._deferred_months),
+            service._to_dict(include_history=False))
+
+
+def test_report_reads_expenses_without_side_effects(tmp_path):
+    path = str(tmp_path / "data.json")
+    _write_data(path)
+    service = FinanceService(JSONRepository(path, sync_delay=0, streaming=True, recent_months=12))
+    before = _state(service)
+    assert "2019-01" in service._deferred_months
+
+    analytics = AnalyticsService(service)
+    totals = {t.category: (t.total, t.count)
+              for t in analytics.category_breakdown("2019-01", "2019-12", source='expenses')}
+    analytics.close()
+
+    # 2019-03 só existe pela regra; 2019-02 foi pulado
+    assert totals == {"Luz": (Money.of(21), 1), "Internet": (Money.of(200), 2)}
+    assert _state(service) == before
+
+
+def test_report_follows_service_changes(tmp_path):
+    service = FinanceService(JSONRepository(str(tmp_path / "data.json"), sync_delay=0))
+    service.add_income(1000, "Salário", "Geral")
+    analytics = AnalyticsService(service)
+    assert analytics.monthly_cash_flow()[-1].inflow == Money.of(1000)
+
+    service.add_expense(250, "Mercado")
+    flow = analytics.monthly_cash_flow()[-1]
+    assert (flow.inflow, flow.outflow, flow.net) == (Money.of(1000), Money.of(250), Money.of(750))
+    analytics.close()
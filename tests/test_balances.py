@@ -0,0 +1,50 @@
+import pytest
+
+from backend.models.money import Money
+from backend.models.wallet import TransactionHistory
+
+from .invariants import check_balances, open_service, run_mutations, run_rollback
+
+
+def _service(tmp_path):
+    service = open_service(tmp_path)
+    service.add_income(1000, "Salário", "Nubank")
+    service.add_income(200, "Pix", "Geral")
+    service.add_expense(150, "Mercado")
+    return service
+
+
+def test_delete_reverses_only_that_transaction(tmp_path, monkeypatch):
+    service = _service(tmp_path)
+    # Excluir não pode recalcular pelo histórico inteiro
+    monkeypatch.setattr(TransactionHistory, 'totals', lambda self: pytest.fail("recalculou o histórico"))
+
+    assert service.delete_transaction(0)
+    assert service.get_balance() == Money.of(50)
+    assert service.get_bank_balance("Nubank") == Money(0)
+    assert service.get_bank_balance("Geral") == Money.of(200)
+    assert service.delete_transaction(1)
+    assert service.get_balance() == Money.of(200)
+    assert not service.delete_transaction(5)
+
+
+def test_recompute_repairs_drifted_balances(tmp_path):
+    service = _service(tmp_path)
+    assert service.recompute_balances()
+
+    assert service.set_bank_balance("Nubank", 999)
+    assert service.get_balance() == Money.of(1199)
+    assert service.recompute_balances() is False
+    assert service.get_bank_balance("Nubank") == Money.of(1000)
+    assert service.get_balance() == Money.of(1050)
+    assert service.recompute_balances()
+
+
+def test_balances_after_every_mutation(tmp_path):
+    run_mutations(open_service(tmp_path), check_balances)
+
+
+def test_balances_after_rollback(tmp_path):
+    service = open_service(tmp_path)
+    run_mutations(service, check_balances)
+    run_rollback(service, check_balances)
@@ -0,0 +1,46 @@
+import pytest
+
+from backend.models.money import Money
+from backend.repositories.json_repository import JSONRepository
+from backend.services.finance_service import FinanceService
+
+
+class CountingRepository(JSONRepository):
+    def __init__(self, path):
+        super().__init__(path, sync_delay=0)
+        self.saves = 0
+
+    def save_data(self, data):
+        self.saves += 1
+        super().save_data(data)
+
+
+def test_batch_saves_once(tmp_path):
+    repository = CountingRepository(str(tmp_path / "data.json"))
+    service = FinanceService(repository)
+    with service.batch():
+        service.add_income(100, "Salário", "Geral")
+        service.add_income(50, "Bônus", "Geral")
+    assert repository.saves == 1
+    assert service.wallet.balance == Money.of(150)
+
+
+def test_rollback_restores_state_and_clears_pending_save(tmp_path):
+    repository = CountingRepository(str(tmp_path / "data.json"))
+    service = FinanceService(repository)
+    service.add_income(100, "Salário", "Geral")
+    saves = repository.saves
+
+    with pytest.raises(RuntimeError):
+        with service.batch():
+            service.add_income(50, "Bônus", "Geral")
+            service.compact()
+            raise RuntimeError("falhou")
+    assert service.wallet.balance == Money.of(100)
+    assert len(service.get_transaction_history()) == 1
+
+    # O bloco desfeito não deixa gravação pendente para o próximo batch
+    with service.batch():
+        pass
+    assert repository.saves == saves
+    assert not service._full_save
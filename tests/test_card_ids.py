@@ -0,0 +1,86 @@
+import json
+
+from backend.models.cards import card_id
+
+from .invariants import check_card_index, open_service, run_mutations, run_rollback
+
+
+def test_card_id_slug():
+    assert card_id("Itaú Black") == "itau-black"
+    assert card_id("  Cartão   de Crédito!! ") == "cartao-de-credito"
+    assert card_id("Visa") == card_id("VISA") == "visa"
+    assert card_id("") == card_id("¿?") == "cartao"
+
+
+def test_slug_collisions_get_suffixes(tmp_path):
+    service = open_service(tmp_path)
+    for name in ("Visa", "VISA", "visa!", "Itaú", "Itau"):
+        assert service.add_card(name, 1000, "10/mm")
+    assert [card.id for card in service.cards] == ["visa", "visa-2", "visa-3", "itau", "itau-2"]
+    assert not service.add_card("Visa", 500, "10/mm")
+    check_card_index(service)
+
+
+def test_ids_survive_reload(tmp_path):
+    service = open_service(tmp_path)
+    service.add_card("Visa", 1000, "10/mm")
+    service.add_card("VISA", 800, "20/mm")
+    service.delete_card("visa")
+    service.flush()
+
+    reloaded = open_service(tmp_path)
+    assert [card.id for card in reloaded.cards] == ["visa-2"]
+    # Um cartão novo com o slug livre não herda o ID de outro
+    reloaded.add_card("Visa", 500, "10/mm")
+    assert reloaded.get_card_by_name("VISA").id == "visa-2"
+    assert reloaded.get_card_by_name("Visa").id == "visa"
+
+
+def _write_cards(tmp_path, cards):
+    (tmp_path / "data.json").write_text(json.dumps({'cards': cards}), encoding='utf-8')
+
+
+def test_missing_and_duplicate_ids_are_reassigned_on_load(tmp_path):
+    _write_cards(tmp_path, [
+        {'name': "Visa", 'limit': 1000, 'id': "visa"},
+        {'name': "Master", 'limit': 500, 'id': "visa"},
+        {'name': "Itaú Black", 'limit': 700},
+        {'name': "Visa", 'limit': 300, 'id': ""},
+    ])
+    service = open_service(tmp_path)
+    assert [card.id for card in service.cards] == ["visa", "master", "itau-black", "visa-2"]
+    # Nome repetido de dados antigos: o primeiro cartão responde pelo nome
+    assert service.get_card_by_name("Visa").limit == 1000
+    check_card_index(service)
+
+
+def test_renamed_card_keeps_its_id(tmp_path):
+    _write_cards(tmp_path, [{'name': "Nubank Roxinho", 'limit': 1000, 'id': "nubank"}])
+    service = open_service(tmp_path)
+    card = service.get_card("nubank")
+    assert card.name == "Nubank Roxinho"
+    assert service.get_card_by_name("Nubank Roxinho") is card
+    check_card_index(service)
+
+
+def test_delete_card_hands_name_over(tmp_path):
+    _write_cards(tmp_path, [
+        {'name': "Visa", 'limit': 1000, 'id': "visa"},
+        {'name': "Visa", 'limit': 300, 'id': "visa-antigo"},
+    ])
+    service = open_service(tmp_path)
+    assert service.delete_card("visa")
+    assert service.get_card_by_name("Visa") is service.get_card("visa-antigo")
+    assert not service.delete_card("visa")
+    check_card_index(service)
+
+
+def test_card_index_after_every_mutation(tmp_path):
+    run_mutations(open_service(tmp_path), check_card_index)
+
+
+def test_card_index_after_rollback(tmp_path):
+    service = open_service(tmp_path)
+    service.add_card("Visa", 1000, "10/mm")
+    run_rollback(service, check_card_index)
+    assert service.get_card("visa") is service.get_card_by_name("Visa")
@@ -0,0 +1,61 @@
+import json
+
+import cli
+
+
+def _balance(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)['wallet']['balance']
+
+
+def test_single_command_saves(tmp_path, capsys):
+    data = str(tmp_path / "data.json")
+    assert cli.main(["--data", data, "add-income", "1.234,56", "Salário", "--bank", "Nubank"]) == 0
+    assert "R$ 1.234,56" in capsys.readouterr().out
+    assert _balance(data) == 1234.56
+
+
+def test_batch_applies_all_lines(tmp_path):
+    data = str(tmp_path / "data.json")
+    batch = tmp_path / "comandos.txt"
+    batch.write_text("# entradas do mês\n"
+                     "add-income 100 'Salário'\n"
+                     "add-income 50,25 Bônus\n", encoding='utf-8')
+    assert cli.main(["--data", data, "batch", str(batch)]) == 0
+    assert _balance(data) == 150.25
+
+
+def test_batch_error_rolls_back_every_line(tmp_path, capsys):
+    data = str(tmp_path / "data.json")
+    assert cli.main(["--data", data, "add-income", "10", "Inicial"]) == 0
+    batch = tmp_path / "comandos.txt"
+    batch.write_text("add-income 100 Salário\n"
+                     "pay-expense 2024-01 Inexistente\n", encoding='utf-8')
+
+    assert cli.main(["--data", data, "batch", str(batch)]) == 1
+    error = capsys.readouterr().err
+    assert "linha 2" in error and "nenhuma alteração foi gravada" in error
+    assert _balance(data) == 10
+
+
+def test_invalid_batch_line_runs_nothing(tmp_path, capsys):
+    data = str(tmp_path / "data.json")
+    batch = tmp_path / "comandos.txt"
+    batch.write_text("add-income 100 Salário\n"
+                     "comando-inexistente\n", encoding='utf-8')
+    assert cli.main(["--data", data, "batch", str(batch)]) == 1
+    assert "linha 2" in capsys.readouterr().err
+    assert not (tmp_path / "data.json").exists()
+
+
+def test_usage_error_returns_2(tmp_path, capsys):
+    assert cli.main(["--data", str(tmp_path / "data.json"), "report", "semana"]) == 2
+    assert "Erro" in capsys.readouterr().err
+
+
+def test_sqlite_storage_from_extension(tmp_path, capsys):
+    data = str(tmp_path / "data.db")
+    assert cli.main(["--data", data, "add-income", "80", "Pix"]) == 0
+    assert cli.main(["--data", data, "export", "--format", "columnar", str(tmp_path / "h.fcol")]) == 0
+    assert "1 transações" in capsys.readouterr().out
+    assert not (tmp_path / "data.json").exists()
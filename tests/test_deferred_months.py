@@ -0,0 +1,73 @@
+import json
+
+from backend.models.money import Money
+from backend.repositories.json_repository import JSONRepository
+from backend.services.finance_service import FinanceService
+
+OLD_MONTH = "2019-01"
+
+
+def _write_data(path):
+    data = {
+        'wallet': {'balance': 100.0, 'history': [], 'banks': []},
+        'cards': [],
+        'expenses': {
+            OLD_MONTH: [
+                {'description': "Luz", 'amount': 21.0, 'due_date': "10/mm", 'paid': True},
+                {'description': "Água", 'amount': 30.0, 'due_date': "15/mm", 'paid': False},
+            ],
+        },
+        'installments': [],
+        'recurring': [
+            # Regra que cobre o mês antigo: a despesa gravada não pode ser duplicada
+            {'description': "Água", 'amount': 30.0, 'due_date': "15/mm", 'start_month': "2018-06",
+             'skipped_months': []},
+        ],
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+
+
+def _open(path):
+    return FinanceService(JSONRepository(path, sync_delay=0, streaming=True, recent_months=12))
+
+
+def test_old_month_stays_on_disk(tmp_path):
+    path = str(tmp_path / "data.json")
+    _write_data(path)
+    service = _open(path)
+    assert OLD_MONTH not in service.expenses
+    assert OLD_MONTH in service.get_expense_months()
+
+
+def test_month_summary_loads_deferred_month(tmp_path):
+    path = str(tmp_path / "data.json")
+    _write_data(path)
+    service = _open(path)
+
+    summary = service.get_month_summary(OLD_MONTH)
+    assert summary.count == 2
+    assert summary.paid == Money.of(21)
+    assert summary.unpaid == Money.of(30)
+    assert service.get_monthly_expenses_total(OLD_MONTH) == Money.of(51)
+    assert [e.description for e in service.get_expenses(OLD_MONTH)] == ["Luz", "Água"]
+
+
+def test_planned_and_iterated_expenses_include_deferred_month(tmp_path):
+    path = str(tmp_path / "data.json")
+    _write_data(path)
+    service = _open(path)
+
+    assert [e.description for month, e in service.iter_expenses() if month == OLD_MONTH] == ["Luz", "Água"]
+    assert len(service.get_planned_expenses(OLD_MONTH)) == 2
+
+
+def test_save_keeps_unloaded_months(tmp_path):
+    path = str(tmp_path / "data.json")
+    _write_data(path)
+    service = _open(path)
+    service.add_income(10, "Bico")
+
+    reloaded = FinanceService(JSONRepository(path, sync_delay=0))
+    assert reloaded.get_balance() == Money.of(110)
+    assert [e.description for e in reloaded.get_expenses(OLD_MONTH)] == ["Luz", "Água"]
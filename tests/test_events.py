@@ -0,0 +1,123 @@
+import pytest
+
+from backend.models.cards import add_months
+from backend.services.events import (BankBalanceChanged, CardUpdated, ChangeEvent, EventBus, ExpenseMonthChanged,
+                                     HistoryCleared, InstallmentAdvanced, RecurringChanged, TransactionAdded,
+                                     TransactionEdited, TransactionRemoved)
+
+from .invariants import OLD_MONTH, EventMirror, _card, open_service, run_mutations, run_rollback
+
+
+def _types(events):
+    return [type(event) for event in events]
+
+
+def test_mutators_publish_their_events(tmp_path):
+    service = open_service(tmp_path)
+    events = []
+    service.subscribe(events.append)
+
+    service.add_income(100, "Salário", "Geral")
+    assert _types(events) == [TransactionAdded, BankBalanceChanged]
+    assert events[0].index == 0 and events[0].transaction.description == "Salário"
+
+    events.clear()
+    service.edit_transaction(0, 80, "Salário editado", "Geral")
+    assert TransactionEdited in _types(events) and BankBalanceChanged in _types(events)
+
+    events.clear()
+    service.delete_transaction(0)
+    assert _types(events)[0] is TransactionRemoved and events[0].index == 0
+
+    events.clear()
+    service.add_card("Visa", 1000, "10/mm")
+    service.add_installment("TV", 300, 3, "Visa")
+    assert CardUpdated in _types(events)
+
+    events.clear()
+    service.add_expense_monthly(OLD_MONTH, "Internet", 100, "15/mm", recurring=True)
+    assert ExpenseMonthChanged(OLD_MONTH) in events and RecurringChanged in _types(events)
+
+    events.clear()
+    service.reset_wallet()
+    assert HistoryCleared in _types(events)
+
+
+def test_installments_publish_progress(tmp_path):
+    service = open_service(tmp_path)
+    service.add_card("Visa", 1000, "10/mm")
+    service.add_installment("TV", 300, 3, "Visa")
+    # Dois meses sem abrir o programa: as parcelas restantes entram de uma vez
+    installment = service.installments[0]
+    service.installment_schedule.remove(installment)
+    installment.first_month = add_months(installment.first_month, -2)
+    service.installment_schedule.add(installment)
+    events = []
+    service.subscribe(events.append, InstallmentAdvanced)
+    service.process_installments()
+    assert events == [InstallmentAdvanced("TV", "Visa", 3, 3)]
+
+
+def test_subscription_by_type_and_unsubscribe(tmp_path):
+    service = open_service(tmp_path)
+    cards, everything = [], []
+    unsubscribe = service.subscribe(cards.append, CardUpdated)
+    service.subscribe(everything.append)
+
+    service.add_income(10, "Pix", "Geral")
+    service.add_card("Visa", 1000, "10/mm")
+    assert _types(cards) == [CardUpdated]
+    assert len(everything) > len(cards)
+
+    unsubscribe()
+    service.update_card_limit(_card(service, "Visa"), 2000)
+    assert len(cards) == 1
+
+
+def test_batch_defers_events_until_commit(tmp_path):
+    service = open_service(tmp_path)
+    events = []
+    service.subscribe(events.append)
+    with service.batch():
+        service.add_income(10, "Pix", "Geral")
+        service.add_income(20, "Pix", "Geral")
+        assert events == []
+    assert _types(events).count(TransactionAdded) == 2
+
+
+def test_rollback_drops_events(tmp_path):
+    service = open_service(tmp_path)
+    events = []
+    service.subscribe(events.append)
+    with pytest.raises(RuntimeError):
+        with service.batch():
+            service.add_income(10, "Pix", "Geral")
+            raise RuntimeError("desfaz")
+    assert events == []
+    service.add_income(5, "Pix", "Geral")
+    assert _types(events) == [TransactionAdded, BankBalanceChanged]
+
+
+def test_bus_delivers_base_class_once():
+    bus = EventBus()
+    received = []
+    bus.subscribe(received.append, ChangeEvent)
+    bus.publish(HistoryCleared())
+    assert received == [HistoryCleared()]
+
+
+def test_events_keep_a_mirror_in_sync(tmp_path):
+    service = open_service(tmp_path)
+    mirror = EventMirror(service)
+    run_mutations(service, mirror.check)
+    assert mirror.months
+
+
+def test_events_keep_a_mirror_in_sync_after_rollback(tmp_path):
+    service = open_service(tmp_path)
+    mirror = EventMirror(service)
+    run_mutations(service, mirror.check)
+    published = len(mirror.events)
+    run_rollback(service, mirror.check)
+    # Só as duas alterações feitas depois do rollback publicaram eventos
+    assert TransactionAdded in _types(mirror.events[published:])
@@ -0,0 +1,46 @@
+from .invariants import OLD_MONTH, check_expense_indexes, open_service, run_mutations, run_rollback
+
+
+def test_duplicate_descriptions_are_rejected(tmp_path):
+    service = open_service(tmp_path)
+    assert service.add_expense_monthly(OLD_MONTH, "Luz", 90, "10/mm")
+    assert not service.add_expense_monthly(OLD_MONTH, "Luz", 95, "10/mm")
+    # Faturas podem se repetir no mês
+    assert service.add_expense_monthly(OLD_MONTH, "Fatura Visa", 50, "10/mm")
+    assert service.add_expense_monthly(OLD_MONTH, "Fatura Visa", 70, "10/mm")
+    assert [e.description for e in service.get_expenses(OLD_MONTH)] == ["Luz", "Fatura Visa", "Fatura Visa"]
+
+
+def test_index_moves_to_the_remaining_duplicate(tmp_path):
+    service = open_service(tmp_path)
+    service.add_expense_monthly(OLD_MONTH, "Fatura Visa", 50, "10/mm")
+    service.add_expense_monthly(OLD_MONTH, "Fatura Visa", 70, "10/mm")
+    service.delete_expense(OLD_MONTH, 0)
+    assert service._expense_index[OLD_MONTH]["Fatura Visa"] is service.get_expenses(OLD_MONTH)[0]
+    assert service._invoice_months["Visa"] == {OLD_MONTH}
+
+    service.update_expense_description(OLD_MONTH, 0, "Cartão antigo")
+    assert not service._invoice_months["Visa"]
+    check_expense_indexes(service)
+
+
+def test_card_invoices_are_removed_from_every_month(tmp_path):
+    service = open_service(tmp_path)
+    service.add_card("Visa", 1000, "10/mm")
+    service.add_expense_monthly("2024-01", "Fatura Visa", 50, "10/mm")
+    service.add_expense_monthly("2024-02", "Fatura Visa", 60, "10/mm")
+    service.add_expense_monthly("2024-02", "Luz", 90, "10/mm")
+    assert service.delete_card(service.get_card_by_name("Visa").id)
+    assert service.get_expenses("2024-01") == []
+    assert [e.description for e in service.get_expenses("2024-02")] == ["Luz"]
+    check_expense_indexes(service)
+
+
+def test_indexes_after_every_mutation(tmp_path):
+    run_mutations(open_service(tmp_path), check_expense_indexes)
+
+
+def test_indexes_after_rollback(tmp_path):
+    service = open_service(tmp_path)
+    run_mutations(service, check_expense_indexes)
+    run_rollback(service, check_expense_indexes)
@@ -0,0 +1,64 @@
+import csv
+
+import pytest
+
+from backend.repositories.json_repository import JSONRepository
+from backend.services.export_service import Exporter, read_columnar
+from backend.services.finance_service import FinanceService
+from backend.services.import_service import StatementImporter
+
+
+def _service(path):
+    service = FinanceService(JSONRepository(path, sync_delay=0))
+    service.add_income(1500, "Salário", "Nubank")
+    service.add_income(30.1, "Pix", "Itaú")
+    service.add_expense(0.7, "Café")
+    service.add_expense_monthly("2024-05", "Luz", 120.5, "10/mm")
+    return service
+
+
+def test_columnar_round_trip(tmp_path):
+    service = _service(str(tmp_path / "data.json"))
+    path = str(tmp_path / "historico.fcol")
+    Exporter(service).export_columnar(path)
+
+    columns = read_columnar(path)
+    history = service.get_transaction_history()
+    assert list(columns['amounts']) == [150000, 3010, 70]
+    assert list(columns['timestamps']) == list(history.columns()['timestamps'])
+    assert [columns['description_names'][code] for code in columns['descriptions']] == ["Salário", "Pix", "Café"]
+    assert [columns['bank_names'][code] for code in columns['banks']] == ["Nubank", "Itaú", "Geral"]
+    assert [columns['type_names'][code] for code in columns['types']] == ["Entrada", "Entrada", "Saída"]
+
+
+def test_columnar_rejects_other_files(tmp_path):
+    path = tmp_path / "outro.fcol"
+    path.write_bytes(b"not columnar")
+    with pytest.raises(ValueError):
+        read_columnar(str(path))
+
+
+def test_columnar_loads_into_analytics(tmp_path):
+    pytest.importorskip("numpy")
+    from backend.services.analytics_service import TransactionFrame
+
+    service = _service(str(tmp_path / "data.json"))
+    path = str(tmp_path / "historico.fcol")
+    Exporter(service).export_columnar(path)
+    frame = TransactionFrame.from_columnar(path)
+    assert list(frame.amounts) == [150000, 3010, 70]
+    assert list(frame.inflow) == [True, True, False]
+    assert frame.descriptions == ["Salário", "Pix", "Café"]
+
+
+def test_history_csv_reimports_without_duplicates(tmp_path):
+    service = _service(str(tmp_path / "data.json"))
+    paths = Exporter(service).export_csv(str(tmp_path / "export"))
+
+    with open(paths[1], encoding='utf-8', newline='') as f:
+        rows = list(csv.reader(f))
+    assert ["2024-05", "Luz", "120.50", "10/mm", "0", "0", ""] in rows
+
+    # O CSV do histórico usa as colunas da importação: reimportar não duplica nada
+    result = StatementImporter(service).import_file(paths[0])
+    assert (result.imported, result.duplicates, result.skipped) == (0, 3, 0)
@@ -0,0 +1,113 @@
+import pytest
+
+from backend.models.cards import add_months
+from backend.services.forecast_service import ForecastService
+
+from .invariants import OLD_MONTH, _current_month, open_service, run_mutations, run_rollback
+
+
+def _service(tmp_path):
+    service = open_service(tmp_path)
+    service.add_income(1000, "Salário", "Nubank")
+    service.add_expense_monthly(_current_month(), "Aluguel", 400, "05/mm")
+    return service
+
+
+def check_forecast(forecast: ForecastService):
+    """O resultado em cache é igual a uma projeção calculada do zero"""
+    def check(service):
+        fresh = ForecastService(service)
+        try:
+            for months, bank in ((6, "Geral"), (3, "Nubank")):
+                assert forecast.forecast(months, bank) == fresh.forecast(months, bank), (months, bank)
+        finally:
+            fresh.close()
+    return check
+
+
+def test_cache_is_reused(tmp_path):
+    forecast = ForecastService(_service(tmp_path))
+    first = forecast.forecast()
+    assert forecast.forecast() is first
+    assert forecast.forecast(3) is not first
+
+
+def test_balance_events_clear_cache(tmp_path):
+    service = _service(tmp_path)
+    forecast = ForecastService(service)
+    first = forecast.forecast()
+    service.add_income(50, "Pix", "Nubank")
+    second = forecast.forecast()
+    assert second is not first
+    assert second[0].balance == first[0].balance + 50
+
+
+def test_expense_month_inside_range_clears_cache(tmp_path):
+    service = _service(tmp_path)
+    forecast = ForecastService(service)
+    first = forecast.forecast(6)
+    service.add_expense_monthly(add_months(_current_month(), 5), "Seguro", 200, "10/mm")
+    second = forecast.forecast(6)
+    assert second is not first
+    assert second[-1].outflow == first[-1].outflow + 200
+
+
+def test_expense_month_outside_range_keeps_cache(tmp_path):
+    service = _service(tmp_path)
+    forecast = ForecastService(service)
+    first = forecast.forecast(6)
+    service.add_expense_monthly(OLD_MONTH, "Luz", 90, "10/mm")
+    service.add_expense_monthly(add_months(_current_month(), 6), "Seguro", 200, "10/mm")
+    assert forecast.forecast(6) is first
+
+
+def test_batch_bypasses_stale_cache(tmp_path):
+    service = _service(tmp_path)
+    forecast = ForecastService(service)
+    before = forecast.forecast()
+    with pytest.raises(RuntimeError):
+        with service.batch():
+            service.add_income(500, "Bônus", "Nubank")
+            # Calculado dentro do batch, com o saldo que será desfeito
+            inside = forecast.forecast()
+            raise RuntimeError("desfaz")
+    assert inside[0].balance == before[0].balance + 500
+    assert forecast.forecast() == before
+
+    with service.batch():
+        service.add_income(500, "Bônus", "Nubank")
+        inside = forecast.forecast()
+    assert forecast.forecast() == inside
+
+
+def test_rollback_invalidates_cache(tmp_path):
+    service = _service(tmp_path)
+    forecast = ForecastService(service)
+    before = forecast.forecast()
+    with pytest.raises(RuntimeError):
+        with service.batch():
+            service.add_income(500, "Bônus", "Nubank")
+            raise RuntimeError("desfaz")
+    after = forecast.forecast()
+    assert after is not before and after == before
+
+
+def test_close_stops_invalidation(tmp_path):
+    service = _service(tmp_path)
+    forecast = ForecastService(service)
+    first = forecast.forecast()
+    forecast.close()
+    service.add_income(50, "Pix", "Nubank")
+    assert forecast.forecast() is first
+
+
+def test_cache_matches_recomputation_after_every_mutation(tmp_path):
+    service = open_service(tmp_path)
+    run_mutations(service, check_forecast(ForecastService(service)))
+
+
+def test_cache_matches_recomputation_after_rollback(tmp_path):
+    service = open_service(tmp_path)
+    check = check_forecast(ForecastService(service))
+    run_mutations(service, check)
+    run_rollback(service, check)
@@ -0,0 +1,52 @@
+from datetime import datetime
+
+from backend.models.wallet import Transaction, TransactionHistory, to_timestamp
+
+from .invariants import check_history_order, open_service, run_mutations, run_rollback
+
+
+def _history(*dates):
+    return TransactionHistory([Transaction(date, "Entrada", 10, f"T{i}", "Geral") for i, date in enumerate(dates)])
+
+
+def test_between_uses_half_open_ranges():
+    history = _history("01/01/2024 10:00", "31/01/2024 23:59", "01/02/2024 00:00", "15/03/2024 08:30")
+    january = history.indices_between(to_timestamp(datetime(2024, 1, 1)), to_timestamp(datetime(2024, 2, 1)))
+    assert list(january) == [0, 1]
+    assert isinstance(january, range)
+
+
+def test_out_of_order_history_is_returned_chronologically():
+    history = _history("10/02/2024 10:00", "05/01/2024 10:00", "20/01/2024 10:00", "05/01/2024 10:00")
+    assert not history._in_order
+    everything = history.indices_between(0, to_timestamp(datetime(2030, 1, 1)))
+    assert list(everything) == [1, 3, 2, 0]
+
+    # O índice ordenado é refeito depois de uma alteração
+    history[0] = Transaction("01/01/2024 09:00", "Entrada", 10, "T0", "Geral")
+    assert list(history.indices_between(0, to_timestamp(datetime(2024, 1, 10)))) == [0, 1, 3]
+    del history[1]
+    assert list(history.indices_between(0, to_timestamp(datetime(2030, 1, 1)))) == [0, 2, 1]
+
+
+def test_service_period_queries(tmp_path):
+    service = open_service(tmp_path)
+    service.add_transactions([
+        Transaction("15/02/2024 10:00", "Entrada", 100, "Fevereiro", "Geral"),
+        Transaction("20/01/2024 10:00", "Saída", 30, "Janeiro", "Geral"),
+        Transaction("01/03/2024 00:00", "Entrada", 5, "Março", "Geral"),
+    ])
+    assert [t.description for t in service.get_transactions_for_month("2024-01")] == ["Janeiro"]
+    assert [t.description for t in service.get_transactions_for_month("2024-02")] == ["Fevereiro"]
+    assert [t.description for t in service.get_transactions_between(datetime(2024, 1, 1), datetime(2024, 3, 1))] \
+        == ["Janeiro", "Fevereiro"]
+
+
+def test_period_index_after_every_mutation(tmp_path):
+    run_mutations(open_service(tmp_path), check_history_order)
+
+
+def test_period_index_after_rollback(tmp_path):
+    service = open_service(tmp_path)
+    run_mutations(service, check_history_order)
+    run_rollback(service, check_history_order)
@@ -0,0 +1,62 @@
+from datetime import datetime
+
+import pytest
+
+from backend.models.wallet import Transaction
+
+from .invariants import (QUERIES, check_history_queries, expected_query, open_service, run_mutations,
+                         run_rollback)
+
+
+def _service(tmp_path):
+    service = open_service(tmp_path)
+    service.add_transactions([
+        Transaction("05/01/2024 10:00", "Entrada", 1000, "Salário", "Nubank"),
+        Transaction("06/01/2024 12:00", "Saída", 35.5, "Pix padaria", "Nubank"),
+        Transaction("03/01/2024 08:00", "Saída", 120, "mercado", "Geral"),
+        Transaction("10/02/2024 18:00", "Entrada", 35.5, "PIX recebido", "Inter"),
+        Transaction("10/02/2024 18:00", "Saída", 80, "Farmácia", "inter"),
+    ])
+    return service
+
+
+@pytest.mark.parametrize('query', QUERIES)
+def test_query_matches_full_scan(tmp_path, query):
+    service = _service(tmp_path)
+    assert list(service.query_history(**query)) == expected_query(service, **query)
+
+
+def test_filters_and_sorting(tmp_path):
+    service = _service(tmp_path)
+    history = service.get_transaction_history()
+
+    def descriptions(**query):
+        return [history[i].description for i in service.query_history(**query)]
+
+    assert descriptions(descending=False) == ["mercado", "Salário", "Pix padaria", "PIX recebido", "Farmácia"]
+    assert descriptions(text="pix") == ["PIX recebido", "Pix padaria"]
+    assert descriptions(start=datetime(2024, 1, 4), end=datetime(2024, 2, 1), descending=False) == \
+        ["Salário", "Pix padaria"]
+    assert descriptions(transaction_type="Saída", sort_by='amount') == ["mercado", "Farmácia", "Pix padaria"]
+    # Empates mantêm a ordem cronológica
+    assert descriptions(sort_by='amount', descending=False)[:2] == ["Pix padaria", "PIX recebido"]
+    assert descriptions(bank="Desconhecido") == []
+    with pytest.raises(ValueError):
+        service.query_history(sort_by='cor')
+
+
+def test_page_reads_only_requested_rows(tmp_path):
+    service = _service(tmp_path)
+    indices = service.query_history(descending=False)
+    page = service.get_transactions(indices[1:3])
+    assert [t.description for t in page] == ["Salário", "Pix padaria"]
+
+
+def test_queries_after_every_mutation(tmp_path):
+    run_mutations(open_service(tmp_path), check_history_queries)
+
+
+def test_queries_after_rollback(tmp_path):
+    service = open_service(tmp_path)
+    run_mutations(service, check_history_queries)
+    run_rollback(service, check_history_queries)
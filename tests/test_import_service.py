@@ -0,0 +1,114 @@
+from decimal import Decimal
+
+import pytest
+
+from backend.models.money import Money
+from backend.models.wallet import format_iso_timestamp
+from backend.repositories.json_repository import JSONRepository
+from backend.services.finance_service import FinanceService
+from backend.services.import_service import StatementImporter, parse_amount, parse_date
+
+OFX = """OFXHEADER:100
+DATA:OFXSGML
+CHARSET:1252
+
+<OFX>
+<SIGNONMSGSRSV1><SONRS><FI><ORG>0341</ORG></FI></SONRS></SIGNONMSGSRSV1>
+<BANKMSGSRSV1><STMTTRNRS><STMTRS><BANKTRANLIST>
+<STMTTRN><TRNTYPE>CREDIT<DTPOSTED>20240105120000[-3:BRT]<TRNAMT>1500.00<MEMO>Salário</STMTTRN>
+<STMTTRN><TRNTYPE>DEBIT<DTPOSTED>20240106<TRNAMT>-89.90<NAME>Mercado</STMTTRN>
+<STMTTRN><TRNTYPE>DEBIT<DTPOSTED>xx<TRNAMT>-1.00<MEMO>Inválida</STMTTRN>
+</BANKTRANLIST></STMTRS></STMTTRNRS></BANKMSGSRSV1>
+</OFX>
+"""
+
+CSV = """Data;Descrição;Valor;Tipo;Banco
+05/01/2024 10:00;Salário;1.500,00;Crédito;Nubank
+06/01/2024;Mercado  do  bairro;-89,90;;Inter
+07/01/2024;Estorno;10,00;Débito;
+sem data;Nada;1,00;;
+08/01/2024;Zero;0,00;;
+"""
+
+
+@pytest.fixture
+def service(tmp_path):
+    return FinanceService(JSONRepository(str(tmp_path / "data.json"), sync_delay=0))
+
+
+def _write(tmp_path, name, text, encoding='utf-8'):
+    path = tmp_path / name
+    path.write_bytes(text.encode(encoding))
+    return str(path)
+
+
+def _rows(service):
+    return [(t.type, float(t.amount), t.description, t.bank) for t in service.get_transaction_history()]
+
+
+@pytest.mark.parametrize('text, expected', [
+    ("1.234,56", "1234.56"), ("1,234.56", "1234.56"), ("-50,00", "-50.00"), ("R$ 10,00", "10.00"),
+    ("(10,00)", "-10.00"), ("1.234", "1234"), ("12.5", "12.5"), ("1,5", "1.5"),
+])
+def test_parse_amount(text, expected):
+    assert parse_amount(text) == Decimal(expected)
+
+
+def test_parse_amount_rejects_text():
+    with pytest.raises(ValueError):
+        parse_amount("abc")
+
+
+def test_parse_date_formats_round_to_minutes():
+    assert format_iso_timestamp(parse_date("05/01/2024 10:30:59")) == "2024-01-05T10:30"
+    assert format_iso_timestamp(parse_date("2024-01-05T10:30")) == "2024-01-05T10:30"
+    assert parse_date("20240105103000[-3:BRT]") == parse_date("05/01/2024 10:30")
+    with pytest.raises(ValueError):
+        parse_date("31/02/2024")
+
+
+def test_csv_import_uses_file_banks_and_types(tmp_path, service):
+    result = StatementImporter(service).import_file(_write(tmp_path, "extrato.csv", CSV))
+
+    assert (result.imported, result.duplicates, result.skipped) == (3, 0, 2)
+    assert _rows(service) == [
+        ("Entrada", 1500.0, "Salário", "Nubank"),
+        ("Saída", 89.9, "Mercado do bairro", "Inter"),
+        ("Saída", 10.0, "Estorno", "Geral"),
+    ]
+    assert service.get_bank_balance("Nubank") == Money.of(1500)
+    assert any("valor zero" in error for error in result.errors)
+
+
+def test_reimport_counts_duplicates(tmp_path, service):
+    path = _write(tmp_path, "extrato.csv", CSV)
+    StatementImporter(service).import_file(path)
+    result = StatementImporter(service).import_file(path)
+    assert (result.imported, result.duplicates) == (0, 3)
+    assert len(service.get_transaction_history()) == 3
+
+
+def test_chosen_bank_overrides_file_bank(tmp_path, service):
+    StatementImporter(service, bank="Conta PJ").import_file(_write(tmp_path, "extrato.csv", CSV))
+    assert {t.bank for t in service.get_transaction_history()} == {"Conta PJ"}
+
+
+def test_ofx_import_with_bank_map(tmp_path, service):
+    path = _write(tmp_path, "extrato.ofx", OFX, encoding='cp1252')
+    result = StatementImporter(service, bank_map={"0341": "Itaú"}).import_file(path)
+
+    assert (result.imported, result.skipped) == (2, 1)
+    assert _rows(service) == [("Entrada", 1500.0, "Salário", "Itaú"), ("Saída", 89.9, "Mercado", "Itaú")]
+
+
+def test_ofx_chosen_bank_wins_over_org(tmp_path, service):
+    path = _write(tmp_path, "extrato.ofx", OFX, encoding='cp1252')
+    StatementImporter(service, bank="Itaú").import_file(path)
+    assert {t.bank for t in service.get_transaction_history()} == {"Itaú"}
+    assert "0341" not in [bank.name for bank in service.get_banks()]
+
+
+def test_csv_without_required_columns(tmp_path, service):
+    with pytest.raises(ValueError):
+        StatementImporter(service).import_file(_write(tmp_path, "x.csv", "foo;bar\n1;2\n"))
+    assert len(service.get_transaction_history()) == 0
@@ -0,0 +1,54 @@
+from backend.models.cards import Installment, InstallmentSchedule, add_months
+from backend.models.money import Money
+from backend.repositories.json_repository import JSONRepository
+from backend.services.finance_service import FinanceService
+
+
+def _installment(**overrides):
+    values = dict(description="Notebook", total_amount=1000, installments=3, current_installment=1,
+                  installment_value=333.34, purchase_date="20/01/2024", card_name="Visa")
+    values.update(overrides)
+    return Installment(**values)
+
+
+def test_schedule_sums_to_the_total():
+    installment = _installment()
+    assert installment.first_month == "2024-01"
+    assert installment.schedule() == [("2024-01", 1, Money(33334)), ("2024-02", 2, Money(33333)),
+                                      ("2024-03", 3, Money(33333))]
+    assert installment.due_by("2023-12") == 0
+    assert installment.due_by("2024-02") == 2
+    assert installment.due_by("2030-01") == 3
+
+
+def test_schedule_index_by_card_and_month():
+    tv = _installment(description="TV", total_amount=300, first_month="2024-02")
+    schedule = InstallmentSchedule([_installment(), tv])
+    assert schedule.total("Visa", "2024-02") == Money(33333 + 10000)
+    assert [(i.description, n) for i, n in schedule.charges("Visa", "2024-04")] == [("TV", 3)]
+    assert schedule.months("Visa") == ["2024-01", "2024-02", "2024-03", "2024-04"]
+
+    schedule.remove(tv)
+    assert schedule.months("Visa") == ["2024-01", "2024-02", "2024-03"]
+    assert schedule.total("Visa", "2024-02") == Money(33333)
+
+
+def test_process_installments_catches_up_missed_months(tmp_path):
+    service = FinanceService(JSONRepository(str(tmp_path / "data.json"), sync_delay=0))
+    service.add_card("Visa", 5000, "10/mm")
+    assert service.add_installment("Geladeira", 600, 6, "Visa")
+    card = service.get_card_by_name("Visa")
+    assert card.used == Money.of(100)
+
+    # Três meses sem abrir o programa: as parcelas 2 a 4 entram de uma vez
+    installment = service.installments[0]
+    service.installment_schedule.remove(installment)
+    installment.first_month = add_months(installment.first_month, -3)
+    service.installment_schedule.add(installment)
+    assert service.process_installments() == 3
+    assert installment.current_installment == 4
+    assert card.used == Money.of(400)
+
+    # Processar de novo no mesmo mês não lança nada
+    assert service.process_installments() == 0
+    assert card.used == Money.of(400)
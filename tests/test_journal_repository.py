@@ -0,0 +1,101 @@
+import os
+
+from backend.models.money import Money
+from backend.repositories.journal_repository import JournalRepository
+from backend.services.finance_service import FinanceService
+
+
+def _populate(service):
+    service.add_income(1500, "Salário", "Nubank")
+    service.add_income(80, "Reembolso", "Nubank")
+    service.add_expense(200, "Mercado")
+    service.delete_transaction(1)
+    service.add_card("Visa", 1000, "10/mm")
+    service.add_expense_monthly("2024-11", "Aluguel", 1200, "05/mm")
+
+
+def test_journal_replay_restores_state(tmp_path):
+    path = str(tmp_path / "data.json")
+    service = FinanceService(JournalRepository(path, compact_threshold=10_000))
+    _populate(service)
+    expected = service._to_dict()
+
+    # As mutações só foram para o journal; o snapshot ainda não existe
+    assert os.path.exists(service.repository.journal_file)
+    assert not os.path.exists(path)
+
+    reloaded = FinanceService(JournalRepository(path))
+    assert reloaded._to_dict() == expected
+    assert reloaded.wallet.balance == Money.of(1300)
+
+
+def test_compaction_folds_journal_into_snapshot(tmp_path):
+    path = str(tmp_path / "data.json")
+    service = FinanceService(JournalRepository(path, compact_threshold=10_000))
+    _populate(service)
+    expected = service._to_dict()
+
+    service.compact()
+    assert not os.path.exists(service.repository.journal_file)
+    assert FinanceService(JournalRepository(path))._to_dict() == expected
+
+    # Alterações depois da compactação voltam a ir para o journal
+    service.add_income(20, "Pix", "Nubank")
+    assert FinanceService(JournalRepository(path)).wallet.balance == Money.of(1320)
+
+
+def test_background_compaction_at_threshold(tmp_path):
+    path = str(tmp_path / "data.json")
+    repository = JournalRepository(path, compact_threshold=3)
+    service = FinanceService(repository)
+    for i in range(10):
+        service.add_income(10, f"Entrada {i}", "Geral")
+    repository._wait_compaction()
+
+    assert os.path.exists(path)
+    reloaded = FinanceService(JournalRepository(path))
+    assert reloaded.wallet.balance == Money.of(100)
+    assert len(reloaded.get_transaction_history()) == 10
+
+
+def test_truncated_last_record_is_ignored(tmp_path):
+    path = str(tmp_path / "data.json")
+    service = FinanceService(JournalRepository(path, compact_threshold=10_000))
+    service.add_income(100, "Salário", "Geral")
+    with open(service.repository.journal_file, 'a', encoding='utf-8') as f:
+        f.write('{"op":"append","path":["wallet","hist')
+
+    reloaded = FinanceService(JournalRepository(path))
+    assert reloaded.wallet.balance == Money.of(100)
+
+
+def test_appends_are_fsynced(tmp_path, monkeypatch):
+    path = str(tmp_path / "data.json")
+    service = FinanceService(JournalRepository(path, compact_threshold=10_000))
+    synced = []
+    real_fsync = os.fsync
+    monkeypatch.setattr(os, 'fsync', lambda fd: synced.append(fd) or real_fsync(fd))
+
+    service.add_income(100, "Salário", "Geral")
+    with service.batch():
+        service.add_income(10, "Pix", "Geral")
+        service.add_income(20, "Pix", "Geral")
+    # Um fsync do journal por gravação (o batch grava uma vez), mais o da pasta
+    # quando o journal é criado
+    assert len(synced) == 3
+
+
+def test_closed_repositories_are_released(tmp_path):
+    import gc
+    import weakref
+    from backend.repositories import json_repository
+
+    repository = JournalRepository(str(tmp_path / "data.json"))
+    FinanceService(repository).add_income(10, "Pix", "Geral")
+    assert repository in json_repository._open_repositories
+    repository.close()
+    assert repository not in json_repository._open_repositories
+
+    reference = weakref.ref(JournalRepository(str(tmp_path / "outro.json")))
+    gc.collect()
+    assert reference() is None
@@ -0,0 +1,117 @@
+import json
+import os
+
+import pytest
+
+from backend.repositories.json_repository import JSONRepository
+from backend.services.finance_service import FinanceService
+
+DATA = {'wallet': {'balance': 10.0, 'history': [], 'banks': []}, 'cards': [], 'expenses': {}}
+
+
+def _read(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def test_service_round_trip(tmp_path):
+    path = str(tmp_path / "data.json")
+    service = FinanceService(JSONRepository(path, sync_delay=0))
+    service.add_income(1500, "Salário", "Nubank")
+    service.add_card("Visa", 1000, "10/mm")
+    service.add_installment("TV", 300, 3, "Visa")
+    service.add_expense_monthly("2024-11", "Aluguel", 1200, "05/mm", recurring=True, end_date="2025-02")
+
+    reloaded = FinanceService(JSONRepository(path, sync_delay=0))
+    assert reloaded._to_dict() == service._to_dict()
+
+
+def test_saves_are_coalesced_until_flush(tmp_path, monkeypatch):
+    path = str(tmp_path / "data.json")
+    repository = JSONRepository(path, sync_delay=60)
+    writes = []
+    write_atomic = repository._write_atomic
+    monkeypatch.setattr(repository, '_write_atomic', lambda p, payload: (writes.append(p), write_atomic(p, payload)))
+
+    for balance in (1.0, 2.0, 3.0):
+        repository.save_data(dict(DATA, wallet=dict(DATA['wallet'], balance=balance)))
+    assert not os.path.exists(path)
+
+    repository.flush()
+    assert writes == [path]
+    assert _read(path)['wallet']['balance'] == 3.0
+
+
+def test_failed_write_keeps_live_file_and_pending_data(tmp_path, monkeypatch):
+    path = str(tmp_path / "data.json")
+    repository = JSONRepository(path, sync_delay=60)
+    repository.save_data(DATA)
+    repository.flush()
+
+    repository.save_data(dict(DATA, cards=[{'name': "Visa"}]))
+
+    def fail(src, dst):
+        raise OSError("disco cheio")
+    monkeypatch.setattr(os, 'replace', fail)
+    with pytest.raises(OSError):
+        repository.flush()
+    assert _read(path) == DATA
+
+    # Os dados continuam pendentes e são gravados na próxima tentativa
+    monkeypatch.undo()
+    repository.flush()
+    assert _read(path)['cards'] == [{'name': "Visa"}]
+
+
+def test_timer_write_error_is_reported_on_next_save(tmp_path, monkeypatch):
+    path = str(tmp_path / "data.json")
+    repository = JSONRepository(path, sync_delay=60)
+    repository.save_data(DATA)
+    monkeypatch.setattr(repository, '_write_atomic', lambda p, payload: (_ for _ in ()).throw(OSError("falha")))
+    repository._flush_from_timer()
+
+    with pytest.raises(OSError):
+        repository.save_data(DATA)
+    monkeypatch.undo()
+    repository.flush()
+    assert _read(path) == DATA
+
+
+def test_corrupt_file_is_preserved(tmp_path):
+    path = tmp_path / "data.json"
+    path.write_text('{"wallet": {"balance": 1', encoding='utf-8')
+    data = JSONRepository(str(path), sync_delay=0).load_data()
+
+    assert data['wallet']['history'] == []
+    preserved = [p.name for p in tmp_path.iterdir() if p.name.startswith("data.json.corrupt-")]
+    assert len(preserved) == 1
+
+
+def _history_file(path, rows=2500, date="2024-01-05T10:00"):
+    history = [{'date': date, 'type': "Entrada", 'amount': 1.0, 'description': f"Entrada {i}",
+                'bank': "Nubank"} for i in range(rows)]
+    data = {'wallet': {'balance': float(rows), 'history': history,
+                       'banks': [{'name': "Nubank", 'balance': float(rows)}]},
+            'cards': [], 'expenses': {}}
+    path.write_text(json.dumps(data), encoding='utf-8')
+
+
+def test_truncated_file_discards_streamed_history(tmp_path):
+    path = tmp_path / "data.json"
+    _history_file(path)
+    content = path.read_text(encoding='utf-8')
+    path.write_text(content[:len(content) - 200], encoding='utf-8')
+
+    service = FinanceService(JSONRepository(str(path), sync_delay=0, streaming=True))
+    assert len(service.get_transaction_history()) == 0
+    assert service.get_balance() == 0
+    assert any(p.name.startswith("data.json.corrupt-") for p in tmp_path.iterdir())
+
+
+def test_streaming_reports_bad_records_without_preserving_file(tmp_path):
+    path = tmp_path / "data.json"
+    _history_file(path, rows=3, date="sem data")
+
+    with pytest.raises(ValueError):
+        FinanceService(JSONRepository(str(path), sync_delay=0, streaming=True))
+    assert [p.name for p in tmp_path.iterdir()] == ["data.json"]
@@ -0,0 +1,63 @@
+import io
+import json
+
+import pytest
+
+from backend.repositories.json_stream import JSONStreamReader
+
+# Vírgulas e chaves dentro de strings e de elementos aninhados não podem ser
+# tomadas como separadores do array
+ITEMS = ([{"d": "a},{b\",", "n": [1, {"x": "},"}], "v": i} for i in range(200)]
+         + [i * 1.5 for i in range(200)]
+         + ["s,}," + str(i) for i in range(200)]
+         + [{"date": "2020-01-01T10:00", "amount": -i, "tags": []} for i in range(200)])
+
+
+def _reader(document, chunk_size):
+    return JSONStreamReader(io.BytesIO(json.dumps(document, indent=2, ensure_ascii=False).encode('utf-8')),
+                            chunk_size=chunk_size)
+
+
+@pytest.mark.parametrize('chunk_size', [7, 64, 1 << 16])
+def test_iter_array_chunks_matches_json_load(chunk_size):
+    reader = _reader({"a": ITEMS, "b": "ção"}, chunk_size)
+    reader.expect('{')
+    assert reader.value() == "a"
+    reader.expect(':')
+    chunks = list(reader.iter_array_chunks(100))
+    assert [item for chunk in chunks for item in chunk] == ITEMS
+    # O cursor fica logo depois do array
+    assert reader.consume(',')
+    assert reader.value() == "b"
+    reader.expect(':')
+    assert reader.value() == "ção"
+
+
+@pytest.mark.parametrize('text', ['[]', '[ ]', '[1]', '[{"a": 1}]', '[1.5, -2e3, "x"]'])
+def test_iter_array_chunks_small_arrays(text):
+    reader = JSONStreamReader(io.BytesIO(text.encode()), chunk_size=1)
+    assert [item for chunk in reader.iter_array_chunks(5) for item in chunk] == json.loads(text)
+
+
+def test_iter_array_matches_iter_array_chunks():
+    reader = _reader(ITEMS, 64)
+    assert list(reader.iter_array()) == ITEMS
+
+
+def test_truncated_array_raises():
+    reader = JSONStreamReader(io.BytesIO(b'[{"a": 1}, {"a": 2}'), chunk_size=4)
+    with pytest.raises(ValueError):
+        list(reader.iter_array_chunks(10))
+
+
+def test_skip_value_returns_byte_range():
+    document = {"x": [1, {"y": "ç]}"}], "z": 2}
+    data = json.dumps(document, ensure_ascii=False).encode('utf-8')
+    reader = JSONStreamReader(io.BytesIO(data), chunk_size=3)
+    reader.expect('{')
+    assert reader.value() == "x"
+    reader.expect(':')
+    start, end = reader.skip_value()
+    assert json.loads(data[start:end].decode('utf-8')) == document["x"]
+    assert reader.consume(',')
+    assert reader.value() == "z"
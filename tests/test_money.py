@@ -0,0 +1,37 @@
+from decimal import Decimal
+
+from backend.models.money import Money
+
+
+def test_of_converts_to_exact_cents():
+    assert Money.of(0.1).cents == 10
+    assert Money.of(1234.56).cents == 123456
+    assert Money.of(7).cents == 700
+    assert Money.of("19.995").cents == 2000
+    assert Money.of(Decimal("-3.10")).cents == -310
+    assert Money.of(Money(5)) == Money(5)
+
+
+def test_sums_do_not_drift():
+    total = Money()
+    for _ in range(1000):
+        total += 0.1
+    assert total == Money(10000)
+    assert Money.of(0.1) + Money.of(0.2) == 0.3
+    assert 10 - Money.of(0.01) == Money(999)
+    assert Money(250) * 3 == Money(750)
+
+
+def test_split_keeps_the_total():
+    parts = Money.of(100).split(3)
+    assert [p.cents for p in parts] == [3334, 3333, 3333]
+    assert sum(parts, Money()) == Money.of(100)
+
+
+def test_compares_and_formats_like_a_number():
+    assert Money.of(12.34) == 12.34
+    assert hash(Money.of(12.34)) == hash(12.34)
+    assert Money(1) > 0 and not Money(0)
+    assert f"{Money.of(1234.5):,.2f}" == "1,234.50"
+    assert str(Money(-5)) == "-0.05"
+    assert float(Money(12345)) == 123.45
@@ -0,0 +1,38 @@
+from backend.models.money import Money
+
+from .invariants import OLD_MONTH, check_month_summaries, open_service, run_mutations, run_rollback
+
+
+def test_summary_follows_expense_changes(tmp_path):
+    service = open_service(tmp_path)
+    service.add_income(500, "Salário", "Geral")
+    service.add_expense_monthly(OLD_MONTH, "Luz", 90, "10/mm")
+    service.add_expense_monthly(OLD_MONTH, "Fatura Visa", 200, "05/mm")
+    summary = service.get_month_summary(OLD_MONTH)
+    assert (summary.count, summary.unpaid, summary.card_invoices) == (2, Money.of(290), Money.of(200))
+
+    service.pay_expense(OLD_MONTH, 0, "Geral")
+    service.update_expense_amount(OLD_MONTH, 1, 250)
+    summary = service.get_month_summary(OLD_MONTH)
+    assert (summary.paid, summary.unpaid, summary.total) == (Money.of(90), Money.of(250), Money.of(340))
+
+    service.delete_expense(OLD_MONTH, 1)
+    summary = service.get_month_summary(OLD_MONTH)
+    assert (summary.count, summary.card_invoices, summary.total) == (1, Money(0), Money.of(90))
+    assert service.get_monthly_expenses_total(OLD_MONTH) == Money.of(90)
+
+
+def test_summary_is_cached(tmp_path):
+    service = open_service(tmp_path)
+    service.add_expense_monthly(OLD_MONTH, "Luz", 90, "10/mm")
+    assert service.get_month_summary(OLD_MONTH) is service.get_month_summary(OLD_MONTH)
+
+
+def test_summaries_after_every_mutation(tmp_path):
+    run_mutations(open_service(tmp_path), check_month_summaries)
+
+
+def test_summaries_after_rollback(tmp_path):
+    service = open_service(tmp_path)
+    run_mutations(service, check_month_summaries)
+    run_rollback(service, check_month_summaries)
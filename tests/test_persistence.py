@@ -0,0 +1,93 @@
+import threading
+
+from backend.models.money import Money
+from backend.models.wallet import TransactionHistory, Transaction
+from backend.repositories.json_repository import JSONRepository
+from backend.services.finance_service import FinanceService
+from backend.services.persistence import PersistenceWorker
+
+
+class _RecordingRepository:
+    def __init__(self):
+        self.saved = []
+
+    def save_data(self, data):
+        self.saved.append(data)
+
+
+def test_snapshot_builder_runs_on_worker_thread():
+    repository = _RecordingRepository()
+    worker = PersistenceWorker(repository)
+    threads = []
+
+    def build():
+        threads.append(threading.current_thread().name)
+        return {'n': 1}
+
+    worker.save_snapshot(build)
+    worker.flush()
+    worker.close()
+    assert repository.saved == [{'n': 1}]
+    assert threads == ["finance-persistence"]
+
+
+def test_history_copy_is_independent():
+    history = TransactionHistory([Transaction("01/01/2024 10:00", "Entrada", 10, "A", "Nubank")])
+    clone = history.copy()
+    history.append(Transaction("02/01/2024 10:00", "Saída", 5, "B", "Inter"))
+    history[0] = Transaction("01/01/2024 10:00", "Entrada", 99, "Z", "Geral")
+
+    assert len(clone) == 1
+    assert clone[0].amount == Money.of(10)
+    assert clone[0].description == "A"
+    assert clone[0].bank == "Nubank"
+    assert clone.to_dicts() != history.to_dicts()
+
+
+def test_background_save_writes_state_at_save_time(tmp_path):
+    path = str(tmp_path / "data.json")
+    service = FinanceService(JSONRepository(path, sync_delay=0), background_save=True)
+    service.add_income(100, "Salário")
+    service.add_income(50, "Bico", "Nubank")
+    service.flush()
+
+    reloaded = FinanceService(JSONRepository(path, sync_delay=0))
+    assert reloaded._to_dict() == service._to_dict()
+    assert reloaded.get_balance() == Money.of(150)
+
+
+class _FailingOnceRepository(_RecordingRepository):
+    def __init__(self, gate):
+        super().__init__()
+        self.gate = gate
+        self.applied = []
+        self.failed = False
+
+    def append_changes(self, changes):
+        if not self.failed:
+            self.failed = True
+            self.gate.wait()
+            raise OSError("disco cheio")
+        self.applied.append(changes)
+
+
+def test_changes_queued_after_a_failure_wait_for_snapshot():
+    gate = threading.Event()
+    repository = _FailingOnceRepository(gate)
+    worker = PersistenceWorker(repository)
+    worker.save_changes([{'op': 'append', 'path': ['wallet', 'history'], 'value': 1}])
+    worker.save_changes([{'op': 'delete', 'path': ['wallet', 'history', 0]}])
+    gate.set()
+    worker.flush()
+
+    # A exclusão por posição não pode ser aplicada sem a inclusão que falhou
+    assert repository.applied == []
+    assert worker.needs_snapshot
+    assert len(worker.pop_errors()) == 1
+
+    worker.save_snapshot({'n': 1})
+    worker.save_changes([{'op': 'set', 'path': ['wallet', 'balance'], 'value': 2}])
+    worker.flush()
+    worker.close()
+    assert repository.saved == [{'n': 1}]
+    assert len(repository.applied) == 1
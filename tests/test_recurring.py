@@ -0,0 +1,58 @@
+from backend.models.money import Money
+from backend.repositories.json_repository import JSONRepository
+from backend.services.finance_service import FinanceService
+
+
+def _open(path):
+    return FinanceService(JSONRepository(path, sync_delay=0))
+
+
+def _descriptions(service, month_year):
+    return [e.description for e in service.get_expenses(month_year)]
+
+
+def test_rule_covers_its_range_lazily(tmp_path):
+    service = _open(str(tmp_path / "data.json"))
+    assert service.add_expense_monthly("2024-01", "Aluguel", 1200, "05/mm", recurring=True)
+    assert "2024-06" not in service.expenses
+
+    # Sem data final a regra vale por um ano a partir do início
+    assert _descriptions(service, "2024-06") == ["Aluguel"]
+    assert _descriptions(service, "2025-01") == ["Aluguel"]
+    assert _descriptions(service, "2025-02") == []
+    assert _descriptions(service, "2023-12") == []
+
+    # Planejar o mês não cria as cópias
+    assert [e.description for e in service.get_planned_expenses("2024-09")] == ["Aluguel"]
+    assert "2024-09" not in service.expenses
+
+
+def test_deleted_and_renamed_copies_are_not_recreated(tmp_path):
+    path = str(tmp_path / "data.json")
+    service = _open(path)
+    service.add_expense_monthly("2024-01", "Internet", 100, "10/mm", recurring=True, end_date="2024-06")
+    assert service.delete_expense("2024-03", 0)
+    assert service.update_expense_description("2024-04", 0, "Internet fibra")
+
+    reloaded = _open(path)
+    assert _descriptions(reloaded, "2024-03") == []
+    assert _descriptions(reloaded, "2024-04") == ["Internet fibra"]
+    assert _descriptions(reloaded, "2024-05") == ["Internet"]
+    assert _descriptions(reloaded, "2024-07") == []
+    assert reloaded.recurring[0].skipped_months == ["2024-03", "2024-04"]
+
+
+def test_edited_copy_overrides_the_rule(tmp_path):
+    path = str(tmp_path / "data.json")
+    service = _open(path)
+    service.add_expense_monthly("2024-01", "Academia", 90, "15/mm", recurring=True)
+    assert service.update_expense_amount("2024-02", 0, 120)
+    service.add_income(500, "Salário", "Geral")
+    assert service.pay_expense("2024-03", 0)
+
+    reloaded = _open(path)
+    assert reloaded.get_expenses("2024-02")[0].amount == Money.of(120)
+    assert reloaded.get_expenses("2024-03")[0].paid
+    assert reloaded.get_expenses("2024-04")[0].amount == Money.of(90)
+    assert not reloaded.get_expenses("2024-04")[0].paid
+    assert len(reloaded.get_expenses("2024-02")) == 1
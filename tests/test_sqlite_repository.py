@@ -0,0 +1,162 @@
+import sqlite3
+
+import pytest
+
+from backend.models.money import Money
+from backend.repositories.sqlite_repository import SQLiteRepository, _SCHEMA
+from backend.services.finance_service import FinanceService
+
+
+def _populated_service(path):
+    service = FinanceService(SQLiteRepository(path))
+    service.add_income(1500, "Salário", "Nubank")
+    service.add_expense(200, "Mercado")
+    service.add_card("Visa", 1000, "10/mm")
+    service.add_installment("TV", 300, 3, "Visa", purchase_date="01/01/2020")
+    service.add_expense_monthly("2024-11", "Aluguel", 1200, "05/mm")
+    return service
+
+
+def test_save_and_load_round_trip(tmp_path):
+    path = str(tmp_path / "data.db")
+    service = _populated_service(path)
+    expected = service._to_dict()
+    service.repository.close()
+
+    reloaded = FinanceService(SQLiteRepository(path))
+    assert reloaded._to_dict() == expected
+
+
+def test_installment_first_month_survives_reload(tmp_path):
+    path = str(tmp_path / "data.db")
+    service = _populated_service(path)
+    first_month = service.installments[0].first_month
+    used = service.get_card_by_name("Visa").used
+    service.repository.close()
+
+    # A compra é de 2020, mas a 1ª parcela foi agendada para o mês atual:
+    # reabrir não pode lançar as parcelas restantes de uma vez
+    reloaded = FinanceService(SQLiteRepository(path))
+    assert reloaded.installments[0].first_month == first_month
+    assert reloaded.process_installments() == 0
+    assert reloaded.get_card_by_name("Visa").used == used == Money.of(100)
+
+
+def test_adds_first_month_column_to_existing_database(tmp_path):
+    path = str(tmp_path / "old.db")
+    db = sqlite3.connect(path)
+    db.executescript(_SCHEMA.replace(",\n    first_month TEXT", ""))
+    db.execute("INSERT INTO installments VALUES (0, 'TV', 300, 3, 1, 100, '15/03/2024', 'Visa')")
+    db.commit()
+    db.close()
+
+    installment = SQLiteRepository(path).load_data()['installments'][0]
+    assert installment['first_month'] is None
+
+    service = FinanceService(SQLiteRepository(path))
+    assert service.installments[0].first_month == "2024-03"
+
+
+def _write_old_months(path):
+    repository = SQLiteRepository(path)
+    data = repository.load_data()
+    data['expenses'] = {
+        "2019-01": [{'description': "Fatura Visa", 'amount': 50.0, 'due_date': "10/mm", 'paid': False},
+                    {'description': "Luz", 'amount': 21.0, 'due_date': "10/mm", 'paid': True}],
+        "2019-02": [{'description': "Luz", 'amount': 22.0, 'due_date': "10/mm", 'paid': False}],
+    }
+    data['cards'] = [{'id': "visa", 'name': "Visa", 'limit': 1000.0, 'used': 50.0, 'due_date': "10/mm",
+                      'available': 950.0}]
+    repository.save_data(data)
+    repository.close()
+
+
+def test_old_months_are_read_by_month(tmp_path):
+    path = str(tmp_path / "data.db")
+    _write_old_months(path)
+
+    service = FinanceService(SQLiteRepository(path, recent_months=12))
+    assert service.expenses == {}
+    assert service.get_expense_months() == ["2019-01", "2019-02"]
+    assert [e.description for e in service.get_expenses("2019-02")] == ["Luz"]
+    assert "2019-01" not in service.expenses
+
+    # Uma gravação completa não pode apagar os meses que seguem só no banco
+    service.compact()
+    service.repository.close()
+    assert set(SQLiteRepository(path).load_data()['expenses']) == {"2019-01", "2019-02"}
+
+
+def test_deleting_card_removes_invoice_from_deferred_month(tmp_path):
+    path = str(tmp_path / "data.db")
+    _write_old_months(path)
+
+    service = FinanceService(SQLiteRepository(path, recent_months=12))
+    assert service.delete_card("visa")
+    assert "2019-02" not in service.expenses
+    service.repository.close()
+
+    expenses = SQLiteRepository(path).load_data()['expenses']
+    assert [e['description'] for e in expenses["2019-01"]] == ["Luz"]
+    assert len(expenses["2019-02"]) == 1
+
+
+def test_history_edits_by_index_after_delete(tmp_path):
+    path = str(tmp_path / "data.db")
+    service = FinanceService(SQLiteRepository(path))
+    for i in range(5):
+        service.add_income(10 + i, f"Entrada {i}", "Geral")
+    assert service.delete_transaction(1)
+    assert service.delete_transaction(1)
+    assert service.edit_transaction(1, 99, "Editada", "Geral")
+    assert service.delete_transaction(0)
+    service.add_income(50, "Nova", "Geral")
+    expected = [(t.description, t.amount) for t in service.get_transaction_history()]
+    service.repository.close()
+
+    reloaded = FinanceService(SQLiteRepository(path))
+    assert [(t.description, t.amount) for t in reloaded.get_transaction_history()] == expected
+    assert [d for d, _ in expected] == ["Editada", "Entrada 4", "Nova"]
+
+
+def test_history_writes_use_the_row_key(tmp_path):
+    path = str(tmp_path / "data.db")
+    service = FinanceService(SQLiteRepository(path))
+    service.add_bank("Inter")
+    for i in range(6):
+        service.add_income(10, f"Entrada {i}", "Inter" if i % 2 else "Geral")
+    service.repository.close()
+
+    service = FinanceService(SQLiteRepository(path))
+    statements = []
+    service.repository.connection.set_trace_callback(statements.append)
+    assert service.delete_transaction(2)
+    assert service.delete_bank("Inter")
+    assert service.edit_transaction(0, 15, "Editada", "Geral")
+
+    # Nenhuma escrita por posição varre ou renumera a tabela de transações
+    history_writes = [s for s in statements if "transactions" in s]
+    assert history_writes and all("ORDER BY" not in s and "pos - 1" not in s for s in history_writes)
+    expected = [(t.description, t.amount, t.bank) for t in service.get_transaction_history()]
+    service.repository.close()
+
+    reloaded = FinanceService(SQLiteRepository(path))
+    assert [(t.description, t.amount, t.bank) for t in reloaded.get_transaction_history()] == expected
+    assert {bank for _, _, bank in expected} == {"Geral"}
+
+
+def test_failed_change_list_keeps_positions_consistent(tmp_path):
+    path = str(tmp_path / "data.db")
+    service = FinanceService(SQLiteRepository(path))
+    for i in range(3):
+        service.add_income(10, f"Entrada {i}", "Geral")
+    repository = service.repository
+
+    with pytest.raises(ValueError):
+        repository.append_changes([{'op': 'delete', 'path': ['wallet', 'history', 0]},
+                                   {'op': 'set', 'path': ['desconhecido'], 'value': 1}])
+    repository.append_changes([{'op': 'delete', 'path': ['wallet', 'history', 1]}])
+    repository.close()
+
+    history = SQLiteRepository(path).load_data()['wallet']['history']
+    assert [t['description'] for t in history] == ["Entrada 0", "Entrada 2"]
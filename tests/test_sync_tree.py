@@ -0,0 +1,88 @@
+import random
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("tkinter")
+
+from frontend.gui import FinanceGUI
+
+
+class FakeTree:
+    """Treeview mínima que registra as chamadas feitas por sync_tree"""
+
+    def __init__(self, name="tree"):
+        self.name = name
+        self.order = []
+        self.values = {}
+        self.calls = []
+
+    def __str__(self):
+        return self.name
+
+    def insert(self, parent, position, iid, values):
+        self.calls.append(('insert', iid))
+        self.order.insert(position, iid)
+        self.values[iid] = values
+
+    def item(self, iid, values):
+        self.calls.append(('item', iid))
+        self.values[iid] = values
+
+    def delete(self, *iids):
+        self.calls.append(('delete',) + iids)
+        for iid in iids:
+            self.order.remove(iid)
+            del self.values[iid]
+
+    def move(self, iid, parent, position):
+        self.calls.append(('move', iid))
+        self.order.remove(iid)
+        self.order.insert(position, iid)
+
+    def get_children(self):
+        return tuple(self.order)
+
+    def rows(self):
+        return [(iid, self.values[iid]) for iid in self.order]
+
+
+def _sync(gui, tree, rows):
+    tree.calls.clear()
+    FinanceGUI.sync_tree(gui, tree, rows)
+    assert tree.rows() == rows
+    assert gui.displayed_rows[str(tree)] == dict(rows)
+    return tree.calls
+
+
+def test_only_differences_are_applied():
+    gui, tree = SimpleNamespace(displayed_rows={}), FakeTree()
+    rows = [("a", (1,)), ("b", (2,)), ("c", (3,))]
+    assert _sync(gui, tree, rows) == [('insert', "a"), ('insert', "b"), ('insert', "c")]
+
+    assert _sync(gui, tree, rows) == []
+    assert _sync(gui, tree, [("a", (1,)), ("b", (20,)), ("c", (3,))]) == [('item', "b")]
+    assert _sync(gui, tree, [("a", (1,)), ("c", (3,))]) == [('delete', "b")]
+    assert _sync(gui, tree, [("d", (4,)), ("a", (1,)), ("c", (3,))]) == [('insert', "d")]
+
+
+def test_reorders_only_when_needed():
+    gui, tree = SimpleNamespace(displayed_rows={}), FakeTree()
+    _sync(gui, tree, [("a", (1,)), ("b", (2,)), ("c", (3,))])
+    calls = _sync(gui, tree, [("c", (3,)), ("a", (1,)), ("b", (2,))])
+    assert calls and all(call[0] == 'move' for call in calls)
+
+
+def test_trees_are_tracked_separately():
+    gui = SimpleNamespace(displayed_rows={})
+    first, second = FakeTree("first"), FakeTree("second")
+    _sync(gui, first, [("a", (1,))])
+    assert _sync(gui, second, [("a", (1,))]) == [('insert', "a")]
+
+
+def test_random_updates_match_full_redraw():
+    rng = random.Random(7)
+    gui, tree = SimpleNamespace(displayed_rows={}), FakeTree()
+    for _ in range(200):
+        iids = rng.sample("abcdefghij", rng.randint(0, 10))
+        _sync(gui, tree, [(iid, (iid, rng.randint(0, 2))) for iid in iids])
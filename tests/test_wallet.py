@@ -0,0 +1,55 @@
+from backend.models.money import Money
+from backend.models.wallet import Bank, Transaction, Wallet
+
+from .invariants import check_bank_index, open_service, run_mutations, run_rollback
+
+
+def test_bank_lookup_by_name():
+    wallet = Wallet(banks=[Bank("Geral"), Bank("Nubank", 30)])
+    assert wallet.get_bank("Nubank") is wallet.banks[1]
+    assert wallet.get_bank_balance("Nubank") == Money.of(30)
+    assert wallet.get_bank("Inter") is None
+    assert wallet.get_bank_balance("Inter") == Money(0)
+
+    wallet.add_bank("Nubank")
+    assert len(wallet.banks) == 2
+    wallet.add_bank("Inter")
+    assert wallet.get_bank("Inter") is wallet.banks[2]
+
+
+def test_rename_and_remove_bank_keep_index():
+    wallet = Wallet(banks=[Bank("Geral"), Bank("Nubank"), Bank("Inter")])
+    wallet.rename_bank("Nubank", "Roxinho")
+    assert wallet.get_bank("Nubank") is None
+    assert wallet.get_bank("Roxinho").name == "Roxinho"
+    assert wallet.rename_bank("Roxinho", "Inter") == []
+
+    wallet.remove_bank("Inter")
+    assert wallet.get_bank("Inter") is None
+    assert [bank.name for bank in wallet.banks] == ["Geral", "Roxinho"]
+    assert set(wallet._bank_index) == {"Geral", "Roxinho"}
+
+
+def test_bank_index_after_every_mutation(tmp_path):
+    run_mutations(open_service(tmp_path), check_bank_index)
+
+
+def test_bank_index_after_rollback(tmp_path):
+    service = open_service(tmp_path)
+    run_mutations(service, check_bank_index)
+    run_rollback(service, check_bank_index)
+
+
+def test_delete_bank_moves_incomes_to_general(tmp_path):
+    service = open_service(tmp_path)
+    service.add_income(100, "Salário", "Geral")
+    service.add_transactions([Transaction("01/01/2024 10:00", "Entrada", 300, "Freela", "Inter"),
+                              Transaction("02/01/2024 10:00", "Saída", 50, "Conta", "Inter")])
+
+    assert service.delete_bank("Inter")
+    assert service.wallet.get_bank("Inter") is None
+    assert {t.bank for t in service.get_transaction_history()} == {"Geral"}
+    # A entrada de 300 passa a contar no Geral; a saída de 50 só reduz o total
+    assert service.get_bank_balance("Geral") == Money.of(400)
+    assert service.get_balance() == Money.of(350)
+    assert service.recompute_balances()